@@ -14,9 +14,33 @@ bl_info = {
 }
 
 import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import re
+import fnmatch
+import struct
+import argparse
+import hashlib
+import subprocess
+import threading
+import uuid
+import http.client
+import urllib.parse
+from array import array
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from math import tan, radians, ceil
+import numpy as np
 import bpy
+import bmesh
+import addon_utils
+from mathutils import Matrix, Vector, Quaternion
+from mathutils.bvhtree import BVHTree
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import BoolProperty, StringProperty, EnumProperty, IntProperty
+from bpy.props import BoolProperty, StringProperty, EnumProperty, IntProperty, FloatProperty, PointerProperty, CollectionProperty
 
 # Node type options
 NODE_NONE = 'none'
@@ -30,139 +54,5713 @@ TYPE_STATIC = 'static'
 TYPE_KINEMATIC = 'kinematic'
 TYPE_DYNAMIC = 'dynamic'
 
+# Texture format and mesh quantization options, for the export settings and each tier
+TEXTURE_FORMATS = [
+    ('WEBP', "WEBP", "WEBP textures only"),
+    ('KTX2', "WEBP + KTX2", "Also embed GPU compressed KTX2/Basis textures (KHR_texture_basisu), keeping WEBP as a fallback. Requires toktx"),
+]
+MESH_QUANTIZATIONS = [
+    ('NONE', "Off", "Keep 32-bit floats"),
+    ('ATTRIBUTES', "Normals + UVs", "8-bit normals and tangents, 16-bit UVs in the 0-1 range"),
+    ('ALL', "All", "Also 16-bit positions. The scale and offset move onto the mesh node, so scripts see a different node scale. Collider, splatmap, wind, skinned and animated meshes keep float positions"),
+]
+
+class HyperfyIndex:
+    """Index of objects tagged with a node type or exp_splatmap
+
+    Kept up to date incrementally from depsgraph updates and rebuilt after
+    loading a file or undo/redo, so lookups don't need to scan every object
+    in the scene. Only names are stored (object references don't survive
+    undo), and results are checked against the object's current properties.
+    """
+
+    by_node = {}
+    splatmaps = set()
+    classified = {}
+    dirty = True
+    stale = False
+
+    @staticmethod
+    def classify(obj):
+        node = obj.get("node", NODE_NONE)
+        splatmap = obj.type == 'MESH' and obj.get("exp_splatmap") == True
+        return node, splatmap
+
+    @staticmethod
+    def update(obj):
+        """Re-index a single object"""
+        name = obj.name
+        previous = HyperfyIndex.classified.get(name)
+        current = HyperfyIndex.classify(obj)
+        if previous == current:
+            return
+        if previous:
+            HyperfyIndex.by_node.get(previous[0], set()).discard(name)
+            HyperfyIndex.splatmaps.discard(name)
+        if current[0] != NODE_NONE:
+            HyperfyIndex.by_node.setdefault(current[0], set()).add(name)
+        if current[1]:
+            HyperfyIndex.splatmaps.add(name)
+        if current == (NODE_NONE, False):
+            HyperfyIndex.classified.pop(name, None)
+        else:
+            HyperfyIndex.classified[name] = current
+
+    @staticmethod
+    def rebuild():
+        HyperfyIndex.by_node = {}
+        HyperfyIndex.splatmaps = set()
+        HyperfyIndex.classified = {}
+        for obj in bpy.data.objects:
+            if "node" in obj or "exp_splatmap" in obj:
+                HyperfyIndex.update(obj)
+        HyperfyIndex.dirty = False
+        HyperfyIndex.stale = False
+
+    @staticmethod
+    def prune():
+        """Drop names of objects that were deleted or renamed"""
+        existing = set(bpy.data.objects.keys())
+        for name in list(HyperfyIndex.classified):
+            if name not in existing:
+                node, splatmap = HyperfyIndex.classified.pop(name)
+                HyperfyIndex.by_node.get(node, set()).discard(name)
+                HyperfyIndex.splatmaps.discard(name)
+        HyperfyIndex.stale = False
+
+    @staticmethod
+    def resolve(names, scene, check):
+        """Objects for the indexed names that still exist, are in the scene and still match"""
+        if HyperfyIndex.dirty:
+            HyperfyIndex.rebuild()
+        objects = []
+        for name in list(names):
+            obj = bpy.data.objects.get(name)
+            if obj is None or not check(obj):
+                # Deleted, renamed or changed without us hearing about it
+                names.discard(name)
+                HyperfyIndex.classified.pop(name, None)
+                if obj is not None:
+                    HyperfyIndex.update(obj)
+                continue
+            if scene is None or obj.name in scene.objects:
+                objects.append(obj)
+        return objects
+
+    @staticmethod
+    def get_objects(node_type, scene=None):
+        """Objects with the given node custom property"""
+        if HyperfyIndex.dirty:
+            HyperfyIndex.rebuild()
+        names = HyperfyIndex.by_node.get(node_type, set())
+        return HyperfyIndex.resolve(names, scene, lambda obj: obj.get("node") == node_type)
+
+    @staticmethod
+    def get_splatmap_objects(scene=None):
+        """Mesh objects with exp_splatmap=true"""
+        if HyperfyIndex.dirty:
+            HyperfyIndex.rebuild()
+        return HyperfyIndex.resolve(HyperfyIndex.splatmaps, scene, lambda obj: HyperfyIndex.classify(obj)[1])
+
+    @staticmethod
+    def get_counts():
+        """Number of objects per node type in the file, cheap enough to call on every redraw"""
+        if HyperfyIndex.dirty:
+            HyperfyIndex.rebuild()
+        elif HyperfyIndex.stale:
+            HyperfyIndex.prune()
+        return {node_type: len(names) for node_type, names in HyperfyIndex.by_node.items()}
+
 class SplatmapProcessor:
     """Helper class to handle splatmap export processing"""
     
     @staticmethod
-    def find_splatmap_objects():
-        """Find all mesh objects with splatmap=true"""
-        return [obj for obj in bpy.context.scene.objects 
-            if obj.type == 'MESH' and "exp_splatmap" in obj and obj["exp_splatmap"] == True and not obj.hide_get()]
-    
+    def find_splatmap_objects():
+        """Find all mesh objects with splatmap=true"""
+        return [obj for obj in HyperfyIndex.get_splatmap_objects(bpy.context.scene) if not obj.hide_get()]
+
+    @staticmethod
+    def find_splatmap_objects_in(root):
+        """Find all splatmap mesh objects in a root object's hierarchy"""
+        splatmap_objects = []
+        for obj in HyperfyIndex.get_splatmap_objects():
+            top = obj
+            while top.parent:
+                top = top.parent
+            if top == root:
+                splatmap_objects.append(obj)
+        return splatmap_objects
+    
+    # Image node labels and the principled inputs they are packed into
+    CONNECTIONS = {
+        'SPLAT': 'Base Color',
+        'RED': 'Specular IOR Level',
+        'GREEN': 'Emission Color',
+        'BLUE': 'Normal',
+        'ALPHA': 'Transmission Weight'
+    }
+
+    # Converted material name -> signature of the source it was built from.
+    # Kept outside the material since custom properties are exported as extras.
+    signatures = {}
+
+    @staticmethod
+    def read_source_material(material):
+        """Labelled image nodes and their mapping scales from a splatmap material"""
+        image_nodes = {}
+        mapping_scales = {}
+        if not material.use_nodes or not material.node_tree:
+            return image_nodes, mapping_scales
+
+        for node in material.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.label in SplatmapProcessor.CONNECTIONS:
+                image_nodes[node.label] = node
+
+                # Check if this image node has a mapping node connected to it
+                for input_socket in node.inputs:
+                    if input_socket.is_linked:
+                        for link in input_socket.links:
+                            if link.from_node.type == 'MAPPING':
+                                # Average of the X, Y, Z scale values
+                                scale = link.from_node.inputs['Scale'].default_value
+                                mapping_scales[node.label] = (scale[0] + scale[1] + scale[2]) / 3.0
+                                break
+        return image_nodes, mapping_scales
+
+    @staticmethod
+    def get_source_signature(material):
+        """Hash of the parts of a source material that the conversion reads"""
+        image_nodes, mapping_scales = SplatmapProcessor.read_source_material(material)
+        hasher = hashlib.blake2b(digest_size=16)
+        for label in sorted(image_nodes):
+            image = image_nodes[label].image
+            hasher.update(f"{label}:{image.name if image else ''}:{mapping_scales.get(label)!r}".encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def get_converted_material(original_material):
+        """Principled material for a splatmap material, shared across objects and exports
+
+        The converted material is kept in bpy.data and only rebuilt when the
+        signature of the source node tree changes (or once per session).
+        """
+        signature = SplatmapProcessor.get_source_signature(original_material)
+        name = f"{original_material.name}_splatmap_converted"
+        new_material = bpy.data.materials.get(name)
+        if new_material and SplatmapProcessor.signatures.get(name) == signature:
+            return new_material
+
+        if not new_material:
+            new_material = bpy.data.materials.new(name=name)
+        new_material.use_nodes = True
+
+        # Clear existing nodes
+        new_material.node_tree.nodes.clear()
+
+        # Add principled BSDF
+        principled = new_material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
+        output = new_material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
+
+        # Connect principled to output
+        new_material.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+
+        # Add and connect image nodes to principled BSDF
+        image_nodes, _ = SplatmapProcessor.read_source_material(original_material)
+        for label, socket_name in SplatmapProcessor.CONNECTIONS.items():
+            if label in image_nodes:
+                # Copy the image node
+                new_image_node = new_material.node_tree.nodes.new(type='ShaderNodeTexImage')
+                new_image_node.image = image_nodes[label].image
+                new_image_node.label = label
+
+                # Special handling for normal map
+                if label == 'BLUE' and socket_name == 'Normal':
+                    # Add normal map node for proper normal mapping
+                    normal_map = new_material.node_tree.nodes.new(type='ShaderNodeNormalMap')
+                    new_material.node_tree.links.new(new_image_node.outputs['Color'], normal_map.inputs['Color'])
+                    new_material.node_tree.links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+                else:
+                    # Direct connection for other inputs
+                    new_material.node_tree.links.new(new_image_node.outputs['Color'], principled.inputs[socket_name])
+
+        SplatmapProcessor.signatures[name] = signature
+        return new_material
+
+    @staticmethod
+    def process_splatmap_object(obj):
+        """Swap a splatmap object to its converted material for export
+
+        The mesh data is not copied, the converted material is assigned through an
+        object-linked material slot so the mesh and its other users are untouched.
+        Returns (True, state) for cleanup_splatmap_object or (False, error).
+        """
+        # Ensure object has only one material
+        if len(obj.material_slots) > 1:
+            return False, f"Splatmap object '{obj.name}' has more than one material"
+
+        if len(obj.material_slots) == 0 or not obj.material_slots[0].material:
+            return False, f"Splatmap object '{obj.name}' has no materials"
+
+        slot = obj.material_slots[0]
+        original_material = slot.material
+        new_material = SplatmapProcessor.get_converted_material(original_material)
+        _, mapping_scales = SplatmapProcessor.read_source_material(original_material)
+
+        # Remember what we change so it can be put back
+        state = {
+            "object": obj,
+            "link": slot.link,
+            "material": slot.material if slot.link == 'OBJECT' else None,
+            "properties": {}
+        }
+
+        # Replace material on the object only
+        slot.link = 'OBJECT'
+        slot.material = new_material
+
+        # Add scale values as custom properties on the mesh object
+        for label, scale in mapping_scales.items():
+            property_name = f"{label.lower()}_scale"
+            state["properties"][property_name] = obj.get(property_name)
+            obj[property_name] = scale
+
+        return True, state
+
+    @staticmethod
+    def cleanup_splatmap_object(state):
+        """Restore the material slot and custom properties changed by process_splatmap_object"""
+        obj = state["object"]
+        slot = obj.material_slots[0]
+        slot.material = state["material"]
+        slot.link = state["link"]
+        for property_name, value in state["properties"].items():
+            if value is None:
+                del obj[property_name]
+            else:
+                obj[property_name] = value
+
+class LODGenerator:
+    """Builds a lod group from a mesh object with decimated children
+
+    Switch distances come from a screen-space error budget: a level is used once
+    its geometric error projects to fewer than error_pixels on screen. Errors are
+    measured in the mesh's local space, which matches scaleAware lod groups.
+    """
+
+    # Source vertices sampled when measuring the error of a level
+    MAX_SAMPLES = 20000
+
+    @staticmethod
+    def get_coords(mesh):
+        coords = array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", coords)
+        return coords
+
+    @staticmethod
+    def count_triangles(mesh):
+        mesh.calc_loop_triangles()
+        return len(mesh.loop_triangles)
+
+    @staticmethod
+    def decimate(context, obj, ratio, name):
+        """Copy of obj with its modifiers and a collapse decimate applied to a new mesh"""
+        lod = obj.copy()
+        lod.name = name
+        for collection in obj.users_collection:
+            collection.objects.link(lod)
+        modifier = lod.modifiers.new("Decimate", 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = ratio
+        modifier.use_collapse_triangulate = True
+        depsgraph = context.evaluated_depsgraph_get()
+        mesh = bpy.data.meshes.new_from_object(lod.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+        mesh.name = name
+        lod.modifiers.clear()
+        lod.data = mesh
+        return lod
+
+    @staticmethod
+    def measure_error(coords, mesh):
+        """Largest distance from (sampled) source vertices to the decimated surface"""
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        tree = BVHTree.FromBMesh(bm)
+        count = len(coords) // 3
+        step = max(1, count // LODGenerator.MAX_SAMPLES)
+        error = 0.0
+        for i in range(0, count, step):
+            location, normal, index, distance = tree.find_nearest(coords[i * 3:i * 3 + 3])
+            if distance is not None and distance > error:
+                error = distance
+        bm.free()
+        return error
+
+    @staticmethod
+    def get_distance(size, pixels, screen_height, fov):
+        """Distance at which a length of size projects to the given number of pixels"""
+        return size * screen_height / (2 * tan(radians(fov) / 2) * pixels)
+
+    @staticmethod
+    def generate(context, obj, levels, ratio, error_pixels, cull_pixels, screen_height, fov):
+        """Turn obj into LOD0 of a new lod group and add decimated levels
+
+        Returns the group and a list of (object, triangles, error) per level.
+        """
+        depsgraph = context.evaluated_depsgraph_get()
+        evaluated = obj.evaluated_get(depsgraph)
+        source = evaluated.to_mesh()
+        coords = LODGenerator.get_coords(source)
+        chain = [(obj, LODGenerator.count_triangles(source), 0.0)]
+        evaluated.to_mesh_clear()
+
+        for level in range(1, levels + 1):
+            lod = LODGenerator.decimate(context, obj, ratio ** level, f"{obj.name}_lod{level}")
+            chain.append((lod, LODGenerator.count_triangles(lod.data), LODGenerator.measure_error(coords, lod.data)))
+
+        # Create the group where the source object was
+        group = bpy.data.objects.new(f"{obj.name}_lod", None)
+        for collection in obj.users_collection:
+            collection.objects.link(group)
+        group["node"] = NODE_LOD
+        group.parent = obj.parent
+        group.matrix_parent_inverse = obj.matrix_parent_inverse.copy()
+        group.matrix_basis = obj.matrix_basis.copy()
+        group.empty_display_size = max(obj.dimensions) / 2 or 1
+
+        # Level i is shown until level i+1 is within the error budget, the last
+        # level until the whole object is smaller than cull_pixels
+        size = max(max(corner[i] for corner in obj.bound_box) - min(corner[i] for corner in obj.bound_box) for i in range(3))
+        distance = 0
+        for index, (lod, triangles, error) in enumerate(chain):
+            if index + 1 < len(chain):
+                switch = LODGenerator.get_distance(chain[index + 1][2], error_pixels, screen_height, fov)
+            else:
+                switch = LODGenerator.get_distance(size, cull_pixels, screen_height, fov)
+            # maxDistance is a whole number and must keep increasing
+            distance = max(distance + 1, ceil(switch))
+            lod.parent = group
+            lod.matrix_parent_inverse = Matrix.Identity(4)
+            lod.matrix_basis = Matrix.Identity(4)
+            lod["maxDistance"] = distance
+            HyperfyIndex.update(lod)
+        HyperfyIndex.update(group)
+
+        return group, chain
+
+class LightmapBaker:
+    """Bakes ambient occlusion and shadows of a root's static meshes into one lightmap
+
+    The static meshes of a root get a packed second UV map and are baked together
+    in a single Cycles bake per pass. The lightmap stores occlusion in red, as
+    glTF expects, and shadows from the scene's lights in green. It is wired into
+    the glTF occlusion input through the second UV map, so it exports as
+    occlusionTexture on TEXCOORD_1, and a lightMap material property tells the
+    client to darken direct light with the green channel too.
+    Lightmaps remember a fingerprint of the meshes, transforms and lights they
+    were baked from so unchanged roots are not baked again. Other roots casting
+    shadows onto a root are not part of its fingerprint.
+    """
+
+    UV_NAME = "Lightmap"
+    NODE_NAME = "Hyperfy Lightmap"
+    UV_NODE_NAME = "Hyperfy Lightmap UV"
+    OUTPUT_GROUPS = ("glTF Material Output", "glTF Settings")
+    DIRECTORY = "lightmaps"
+
+    @staticmethod
+    def get_root(obj):
+        while obj.parent is not None:
+            obj = obj.parent
+        return obj
+
+    @staticmethod
+    def is_static(obj):
+        """Meshes that never move or deform in the client"""
+        if obj.type != 'MESH' or not obj.visible_get():
+            return False
+        # Colliders aren't rendered and splatmaps use their own shader
+        if "node" in obj or obj.get("exp_splatmap"):
+            return False
+        # Linked duplicates can't have their own lightmap uvs
+        if obj.data.users > 1 or obj.data.shape_keys or obj.find_armature():
+            return False
+        if any(slot.material and slot.material.get("wind") for slot in obj.material_slots):
+            return False
+        parent = obj
+        while parent is not None:
+            if parent.animation_data and parent.animation_data.action:
+                return False
+            if parent.get("node") == NODE_RIGIDBODY and parent.get("type", TYPE_STATIC) != TYPE_STATIC:
+                return False
+            parent = parent.parent
+        return True
+
+    @staticmethod
+    def find_bake_objects(root):
+        return [obj for obj in [root] + list(root.children_recursive) if LightmapBaker.is_static(obj)]
+
+    @staticmethod
+    def fingerprint(objects, lights, size, samples, margin):
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{size}:{samples}:{margin}".encode())
+        for obj in sorted(objects, key=lambda o: o.name):
+            hasher.update(f"object:{obj.name}".encode())
+            hasher.update(repr(ExportCache.plain(obj.matrix_world)).encode())
+            ExportCache.hash_mesh(hasher, obj.data)
+        for light in sorted(lights, key=lambda o: o.name):
+            hasher.update(f"light:{light.name}".encode())
+            hasher.update(repr(ExportCache.plain(light.matrix_world)).encode())
+            ExportCache.hash_rna(hasher, light.data)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def pack_uvs(context, objects, size):
+        """Add the lightmap uv map and pack every object into one shared layout"""
+        active_indices = []
+        for obj in objects:
+            uv_layers = obj.data.uv_layers
+            if not uv_layers:
+                uv_layers.new(name="UVMap")
+            active_indices.append(uv_layers.active_index)
+            if LightmapBaker.UV_NAME not in uv_layers:
+                uv_layers.new(name=LightmapBaker.UV_NAME, do_init=False)
+            uv_layers.active = uv_layers[LightmapBaker.UV_NAME]
+        try:
+            with context.temp_override(active_object=objects[0], object=objects[0], selected_objects=objects, selected_editable_objects=objects):
+                bpy.ops.uv.lightmap_pack(PREF_CONTEXT='ALL_FACES', PREF_PACK_IN_ONE=True, PREF_NEW_UVLAYER=False, PREF_IMG_PX_SIZE=size)
+        finally:
+            # Keep editing the original uvs
+            for obj, index in zip(objects, active_indices):
+                obj.data.uv_layers.active_index = index
+
+    @staticmethod
+    def get_output_group():
+        """Node group the glTF exporter reads the occlusion input from"""
+        for name in LightmapBaker.OUTPUT_GROUPS:
+            group = bpy.data.node_groups.get(name)
+            if group is not None:
+                return group
+        group = bpy.data.node_groups.new(LightmapBaker.OUTPUT_GROUPS[0], 'ShaderNodeTree')
+        group.interface.new_socket("Occlusion", in_out='INPUT', socket_type='NodeSocketFloat')
+        return group
+
+    @staticmethod
+    def wire_material(material, image):
+        """Feed the lightmap into the glTF occlusion input through the lightmap uvs"""
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+        node = nodes.get(LightmapBaker.NODE_NAME)
+        if node is None:
+            node = nodes.new('ShaderNodeTexImage')
+            node.name = node.label = LightmapBaker.NODE_NAME
+        node.image = image
+        uv = nodes.get(LightmapBaker.UV_NODE_NAME)
+        if uv is None:
+            uv = nodes.new('ShaderNodeUVMap')
+            uv.name = uv.label = LightmapBaker.UV_NODE_NAME
+        uv.uv_map = LightmapBaker.UV_NAME
+        links.new(uv.outputs["UV"], node.inputs["Vector"])
+        output = next((n for n in nodes if n.type == 'GROUP' and n.node_tree and n.node_tree.name in LightmapBaker.OUTPUT_GROUPS), None)
+        if output is None:
+            output = nodes.new('ShaderNodeGroup')
+            output.node_tree = LightmapBaker.get_output_group()
+        links.new(node.outputs["Color"], output.inputs["Occlusion"])
+        material["lightMap"] = True
+        # Cycles bakes into the active image node
+        nodes.active = node
+
+    @staticmethod
+    def prepare_materials(name, objects, image):
+        """Give the objects lightmapped copies of their materials, shared within the root"""
+        copies = {}
+        for obj in objects:
+            if not obj.material_slots:
+                obj.data.materials.append(None)
+            for slot in obj.material_slots:
+                material = slot.material
+                if material is None:
+                    material = bpy.data.materials.get(f"{name}_lightmap")
+                    if material is None:
+                        material = bpy.data.materials.new(f"{name}_lightmap")
+                        LightmapBaker.wire_material(material, image)
+                node = material.node_tree.nodes.get(LightmapBaker.NODE_NAME) if material.node_tree else None
+                if node is None or node.image != image:
+                    # Materials shared with other roots would end up with this root's lightmap
+                    if material.name not in copies:
+                        copies[material.name] = material.copy()
+                        copies[material.name].name = f"{material.name}_{name}"
+                    material = copies[material.name]
+                slot.material = material
+                copies[material.name] = material
+        for material in set(copies.values()):
+            LightmapBaker.wire_material(material, image)
+
+    @staticmethod
+    def read_channel(image, channel):
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return pixels.reshape(-1, 4)[:, channel].copy()
+
+    @staticmethod
+    def bake(context, root, objects, lights, size, samples, margin):
+        """Bake the objects of a root into its lightmap and save it as WEBP"""
+        name = f"{root.name}_lightmap"
+        image = bpy.data.images.get(name)
+        if image is None:
+            image = bpy.data.images.new(name, size, size, alpha=False, is_data=True)
+        elif tuple(image.size) != (size, size):
+            image.scale(size, size)
+        image.colorspace_settings.name = 'Non-Color'
+
+        LightmapBaker.pack_uvs(context, objects, size)
+        LightmapBaker.prepare_materials(root.name, objects, image)
+
+        scene = context.scene
+        engine = scene.render.engine
+        scene.render.engine = 'CYCLES'
+        original_samples = scene.cycles.samples
+        scene.cycles.samples = samples
+        original_selection = context.selected_objects.copy()
+        original_active = context.view_layer.objects.active
+        try:
+            bpy.ops.object.select_all(action='DESELECT')
+            for obj in objects:
+                obj.select_set(True)
+            context.view_layer.objects.active = objects[0]
+
+            bpy.ops.object.bake(type='AO', margin=margin, use_clear=True, target='IMAGE_TEXTURES')
+            occlusion = LightmapBaker.read_channel(image, 0)
+            if lights:
+                bpy.ops.object.bake(type='SHADOW', margin=margin, use_clear=True, target='IMAGE_TEXTURES')
+                shadow = LightmapBaker.read_channel(image, 0)
+            else:
+                shadow = np.ones_like(occlusion)
+        finally:
+            scene.cycles.samples = original_samples
+            scene.render.engine = engine
+            bpy.ops.object.select_all(action='DESELECT')
+            for obj in original_selection:
+                obj.select_set(True)
+            context.view_layer.objects.active = original_active
+
+        pixels = np.empty((len(occlusion), 4), dtype=np.float32)
+        pixels[:, 0] = occlusion
+        pixels[:, 1] = shadow
+        pixels[:, 2] = occlusion * shadow
+        pixels[:, 3] = 1.0
+        image.pixels.foreach_set(pixels.ravel())
+
+        directory = os.path.join(HyperfyExporter.get_base_directory(), LightmapBaker.DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, f"{bpy.path.clean_name(name)}.webp")
+        image.filepath_raw = bpy.path.relpath(filepath) if bpy.data.filepath else filepath
+        image.file_format = 'WEBP'
+        image.save()
+
+        # Baked shadows replace realtime ones
+        for obj in objects:
+            obj["castShadow"] = False
+            obj["receiveShadow"] = False
+            obj.update_tag(refresh={'OBJECT'})
+        return image
+
+    @staticmethod
+    def bake_roots(context, roots, size, samples, margin, force=False):
+        """Bake every root that changed since its last bake, returns (baked, unchanged, objects)"""
+        lights = [obj for obj in context.scene.objects if obj.type == 'LIGHT' and obj.visible_get()]
+        baked = []
+        unchanged = []
+        count = 0
+        for root in roots:
+            objects = LightmapBaker.find_bake_objects(root)
+            if not objects:
+                continue
+            count += len(objects)
+            image = bpy.data.images.get(f"{root.name}_lightmap")
+            fingerprint = LightmapBaker.fingerprint(objects, lights, size, samples, margin)
+            if not force and image is not None and image.has_data and image.get("hyperfy_bake") == fingerprint:
+                unchanged.append(root.name)
+                continue
+            image = LightmapBaker.bake(context, root, objects, lights, size, samples, margin)
+            # Packing added or changed the lightmap uvs, so fingerprint what was baked
+            image["hyperfy_bake"] = LightmapBaker.fingerprint(objects, lights, size, samples, margin)
+            baked.append(root.name)
+        return baked, unchanged, count
+
+class ColliderFitter:
+    """Replaces collider meshes with cheaper colliders while exporting
+
+    Meshes shaped like a box, sphere or capsule along their local axes are
+    exported as an empty with type/width/height/depth/radius, which glbToNodes
+    turns into a primitive collider. Other meshes can be split into a few convex
+    hulls under a triangle budget. Sizes are in world units since primitive
+    colliders ignore scale.
+    """
+
+    @staticmethod
+    def find_collider_objects_in(root):
+        """Visible collider meshes without children in a root object's hierarchy"""
+        return [
+            obj for obj in [root] + list(root.children_recursive)
+            if obj.type == 'MESH' and obj.get("node") == NODE_COLLIDER and not obj.children and obj.visible_get()
+        ]
+
+    @staticmethod
+    def find_collider_objects(scene):
+        return [
+            obj for obj in HyperfyIndex.get_objects(NODE_COLLIDER, scene)
+            if obj.type == 'MESH' and not obj.children and obj.visible_get()
+        ]
+
+    @staticmethod
+    def read_mesh(obj):
+        """Vertex positions (local axes, world scale) and triangles of the evaluated mesh"""
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        evaluated = obj.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        mesh.calc_loop_triangles()
+        coords = array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", coords)
+        indices = array('i', [0]) * (len(mesh.loop_triangles) * 3)
+        mesh.loop_triangles.foreach_get("vertices", indices)
+        evaluated.to_mesh_clear()
+        sx, sy, sz = obj.matrix_world.to_scale()
+        points = [Vector((coords[i] * sx, coords[i + 1] * sy, coords[i + 2] * sz)) for i in range(0, len(coords), 3)]
+        triangles = [tuple(indices[i:i + 3]) for i in range(0, len(indices), 3)]
+        return points, triangles
+
+    @staticmethod
+    def is_closed(triangles):
+        """Every edge is shared by exactly two triangles"""
+        edges = {}
+        for a, b, c in triangles:
+            for edge in ((a, b), (b, c), (c, a)):
+                key = (min(edge), max(edge))
+                edges[key] = edges.get(key, 0) + 1
+        return bool(edges) and all(count == 2 for count in edges.values())
+
+    @staticmethod
+    def get_volume(points, triangles, center):
+        volume = 0.0
+        for a, b, c in triangles:
+            volume += (points[a] - center).dot((points[b] - center).cross(points[c] - center))
+        return abs(volume) / 6
+
+    @staticmethod
+    def fit_primitive(points, triangles, tolerance):
+        """Detect a box, sphere or capsule, returns (props, center, axis) or None
+
+        axis is the local axis (0, 1, 2) a capsule lies along.
+        """
+        if len(points) < 4 or not ColliderFitter.is_closed(triangles):
+            return None
+        lo = Vector([min(p[i] for p in points) for i in range(3)])
+        hi = Vector([max(p[i] for p in points) for i in range(3)])
+        size = hi - lo
+        center = (lo + hi) / 2
+        extent = max(size)
+        if min(size) <= tolerance * extent:
+            return None
+        margin = tolerance * extent
+
+        # Box: a closed mesh that fills its bounds. glTF is y-up, so blender z is height
+        box_volume = size.x * size.y * size.z
+        if abs(ColliderFitter.get_volume(points, triangles, center) - box_volume) <= tolerance * box_volume:
+            return {"type": "box", "width": size.x, "height": size.z, "depth": size.y}, center, 2
+
+        # Sphere: equal extents and every vertex on the surface
+        radius = max((p - center).length for p in points)
+        if extent - min(size) <= margin and all(radius - (p - center).length <= margin for p in points):
+            return {"type": "sphere", "radius": radius}, center, 2
+
+        # Capsule: round cross section around the longest axis and every vertex
+        # at the same distance from the axis segment
+        axis = max(range(3), key=lambda i: size[i])
+        others = [size[i] for i in range(3) if i != axis]
+        radius = sum(others) / 4
+        half = extent / 2 - radius
+        if abs(others[0] - others[1]) > margin or half <= margin:
+            return None
+        direction = Vector([1.0 if i == axis else 0.0 for i in range(3)])
+        for p in points:
+            offset = p - center
+            along = max(-half, min(half, offset[axis]))
+            if abs((offset - direction * along).length - radius) > margin:
+                return None
+        return {"type": "capsule", "radius": radius, "height": extent}, center, axis
+
+    @staticmethod
+    def convex_hull(points):
+        """bmesh of the convex hull of points, the caller frees it"""
+        bm = bmesh.new()
+        verts = [bm.verts.new(p) for p in points]
+        result = bmesh.ops.convex_hull(bm, input=verts)
+        unused = result["geom_interior"] + result["geom_unused"]
+        bmesh.ops.delete(bm, geom=[v for v in unused if isinstance(v, bmesh.types.BMVert)], context='VERTS')
+        return bm
+
+    @staticmethod
+    def get_hull_volume(points):
+        if len(points) < 4:
+            return 0.0
+        bm = ColliderFitter.convex_hull(points)
+        volume = bm.calc_volume()
+        bm.free()
+        return volume
+
+    @staticmethod
+    def split_part(points, part):
+        """Split a list of triangles in two at the median of their centroids along the longest axis"""
+        centroids = [(points[a] + points[b] + points[c]) / 3 for a, b, c in part]
+        size = [max(c[i] for c in centroids) - min(c[i] for c in centroids) for i in range(3)]
+        axis = max(range(3), key=lambda i: size[i])
+        order = sorted(range(len(part)), key=lambda i: centroids[i][axis])
+        middle = len(order) // 2
+        return [part[i] for i in order[:middle]], [part[i] for i in order[middle:]]
+
+    @staticmethod
+    def get_part_points(points, part):
+        return [points[i] for i in sorted({i for triangle in part for i in triangle})]
+
+    @staticmethod
+    def decompose(points, triangles, max_hulls, tolerance):
+        """Greedy approximate convex decomposition into at most max_hulls point sets
+
+        The part whose split removes the most empty hull volume is split first,
+        until nothing removes more than tolerance of the total hull volume.
+        """
+        def evaluate(part):
+            volume = ColliderFitter.get_hull_volume(ColliderFitter.get_part_points(points, part))
+            if len(part) < 2:
+                return volume, 0.0, None
+            halves = ColliderFitter.split_part(points, part)
+            split_volume = sum(ColliderFitter.get_hull_volume(ColliderFitter.get_part_points(points, half)) for half in halves)
+            return volume, volume - split_volume, halves
+
+        parts = [(triangles,) + evaluate(triangles)]
+        total = parts[0][1]
+        while len(parts) < max_hulls:
+            index = max(range(len(parts)), key=lambda i: parts[i][2])
+            part, volume, gain, halves = parts[index]
+            if not halves or gain <= tolerance * total:
+                break
+            parts[index:index + 1] = [(half,) + evaluate(half) for half in halves]
+        return [ColliderFitter.get_part_points(points, part) for part, volume, gain, halves in parts]
+
+    @staticmethod
+    def reduce_points(points, count):
+        """Farthest point sampling, keeps the points that span the hull best"""
+        if len(points) <= count:
+            return points
+        center = sum(points, Vector()) / len(points)
+        chosen = [max(points, key=lambda p: (p - center).length)]
+        distances = [(p - chosen[0]).length for p in points]
+        while len(chosen) < count:
+            index = max(range(len(points)), key=lambda i: distances[i])
+            chosen.append(points[index])
+            for i, p in enumerate(points):
+                distances[i] = min(distances[i], (p - points[index]).length)
+        return chosen
+
+    @staticmethod
+    def build_hull_mesh(points, max_triangles, name):
+        """Mesh of the convex hull of points with at most max_triangles triangles"""
+        bm = ColliderFitter.convex_hull(points)
+        if len(bm.faces) > max_triangles:
+            # a triangulated hull with n vertices has 2n - 4 triangles
+            hull_points = [v.co.copy() for v in bm.verts]
+            bm.free()
+            bm = ColliderFitter.convex_hull(ColliderFitter.reduce_points(hull_points, max_triangles // 2 + 2))
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+        bm.free()
+        return mesh
+
+    @staticmethod
+    def process_collider_object(obj, settings, hide=True):
+        """Swap a collider mesh for fitted colliders, returns state for cleanup or None to keep it
+
+        With hide=False the collider mesh stays visible, for exports that leave it out themselves.
+        """
+        points, triangles = ColliderFitter.read_mesh(obj)
+        if not triangles:
+            return None
+        tolerance = settings.collider_tolerance
+        location, rotation, _ = obj.matrix_world.decompose()
+        properties = {}
+        for key in obj.keys():
+            value = obj[key]
+            if key.startswith("_") or key in ("type", "convex", "width", "height", "depth", "radius") or hasattr(value, "to_dict"):
+                continue
+            properties[key] = value.to_list() if hasattr(value, "to_list") else value
+        replacements = []
+
+        primitive = ColliderFitter.fit_primitive(points, triangles, tolerance) if settings.collider_primitives else None
+        if primitive:
+            props, center, axis = primitive
+            # Capsules stand along local z in blender, which is y in glTF
+            turn = {0: Quaternion((0, 1, 0), radians(90)), 1: Quaternion((1, 0, 0), radians(-90)), 2: Quaternion()}[axis]
+            empty = bpy.data.objects.new(f"{obj.name}_{props['type']}", None)
+            empty.empty_display_type = 'CUBE' if props["type"] == "box" else 'SPHERE'
+            replacements.append((empty, Matrix.Translation(location + rotation @ center) @ (rotation @ turn).to_matrix().to_4x4(), props))
+        elif settings.collider_hulls > 0:
+            for index, hull_points in enumerate(ColliderFitter.decompose(points, triangles, settings.collider_hulls, tolerance)):
+                if len(hull_points) < 4:
+                    continue
+                name = f"{obj.name}_hull{index}"
+                hull = bpy.data.objects.new(name, ColliderFitter.build_hull_mesh(hull_points, settings.collider_hull_triangles, name))
+                replacements.append((hull, Matrix.Translation(location) @ rotation.to_matrix().to_4x4(), {"convex": True}))
+        if not replacements:
+            return None
+
+        for collection in obj.users_collection:
+            for replacement, matrix, props in replacements:
+                collection.objects.link(replacement)
+        for replacement, matrix, props in replacements:
+            replacement.parent = obj.parent
+            replacement.matrix_world = matrix
+            for key, value in properties.items():
+                replacement[key] = value
+            for key, value in props.items():
+                replacement[key] = value
+            replacement.select_set(obj.select_get())
+
+        # Hidden objects are skipped by the exporter
+        if hide:
+            obj.hide_set(True)
+        return {"object": obj, "hidden": hide, "replacements": [replacement for replacement, matrix, props in replacements]}
+
+    @staticmethod
+    def cleanup_collider_object(state):
+        for replacement in state["replacements"]:
+            mesh = replacement.data
+            bpy.data.objects.remove(replacement)
+            if mesh:
+                bpy.data.meshes.remove(mesh)
+        if state["hidden"]:
+            state["object"].hide_set(False)
+
+class MeshMerger:
+    """Merges static meshes under the same parent into one object while exporting
+
+    Meshes with the same parent and shadow settings are joined. Their simple
+    opaque Principled materials (image textures or constants on base color,
+    normal, roughness/metallic and emission) are baked into one atlas material
+    with remapped UVs, other materials keep their own slot. Node-tagged objects,
+    LOD children, skinned, animated and shape key meshes are left alone. Merged
+    objects no longer exist by name in the exported file.
+    """
+
+    SHADOW_PROPERTIES = ("castShadow", "receiveShadow")
+    CHANNELS = ("base", "normal", "orm", "emission")
+    TILE_PADDING = 4
+
+    @staticmethod
+    def can_merge(obj):
+        if obj.type != 'MESH' or obj.children or not obj.visible_get():
+            return False
+        if "node" in obj or "exp_splatmap" in obj or obj.parent_type != 'OBJECT':
+            return False
+        if obj.parent and obj.parent.get("node") == NODE_LOD:
+            return False
+        # Linked duplicates are instanced rather than merged
+        if obj.data.users > 1 or obj.data.shape_keys or len(obj.data.uv_layers) > 1 or any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+            return False
+        if obj.animation_data and obj.animation_data.action:
+            return False
+        # Objects with other custom properties may be read by scripts or glbToNodes
+        for key in obj.keys():
+            if not key.startswith("_") and key not in MeshMerger.SHADOW_PROPERTIES and not hasattr(obj[key], "to_dict"):
+                return False
+        return True
+
+    @staticmethod
+    def find_groups(objects):
+        """Mergeable objects grouped by parent and shadow settings"""
+        groups = {}
+        for obj in objects:
+            if MeshMerger.can_merge(obj):
+                key = (obj.parent.name if obj.parent else "",) + tuple(obj.get(name, True) for name in MeshMerger.SHADOW_PROPERTIES)
+                groups.setdefault(key, []).append(obj)
+        return list(groups.values())
+
+    @staticmethod
+    def get_image(node):
+        """Image of an image texture node sampled with the default UV map"""
+        if node.type == 'TEX_IMAGE' and node.image and node.image.size[0] and not node.inputs['Vector'].is_linked:
+            return node.image
+        return None
+
+    @staticmethod
+    def read_principled(material):
+        """Inputs of a simple opaque Principled material, or None if it can't be atlased"""
+        if not material or not material.use_nodes or not material.node_tree:
+            return None
+        if getattr(material, "blend_method", 'OPAQUE') != 'OPAQUE':
+            return None
+        output = next((node for node in material.node_tree.nodes if node.type == 'OUTPUT_MATERIAL' and node.is_active_output), None)
+        if not output or not output.inputs['Surface'].is_linked:
+            return None
+        bsdf = output.inputs['Surface'].links[0].from_node
+        if bsdf.type != 'BSDF_PRINCIPLED' or bsdf.inputs['Alpha'].is_linked or bsdf.inputs['Alpha'].default_value < 1:
+            return None
+
+        info = {
+            "base": None,
+            "normal": None,
+            "orm": None,
+            "emission": None,
+            "color": tuple(bsdf.inputs['Base Color'].default_value),
+            "roughness": bsdf.inputs['Roughness'].default_value,
+            "metallic": bsdf.inputs['Metallic'].default_value,
+            "emission_color": tuple(bsdf.inputs['Emission Color'].default_value),
+            "strength": bsdf.inputs['Emission Strength'].default_value,
+            "backface": material.use_backface_culling,
+        }
+        for socket in bsdf.inputs:
+            if not socket.is_linked:
+                continue
+            link = socket.links[0]
+            node = link.from_node
+            if socket.name in ('Base Color', 'Emission Color') and MeshMerger.get_image(node):
+                info["base" if socket.name == 'Base Color' else "emission"] = node.image
+            elif socket.name == 'Normal' and node.type == 'NORMAL_MAP' and node.inputs['Strength'].default_value == 1 and node.inputs['Color'].is_linked:
+                image = MeshMerger.get_image(node.inputs['Color'].links[0].from_node)
+                if not image:
+                    return None
+                info["normal"] = image
+            elif socket.name in ('Roughness', 'Metallic') and node.type in ('SEPARATE_COLOR', 'SEPRGB') and node.inputs[0].is_linked:
+                # glTF packs roughness in green and metallic in blue
+                expected = ('Green', 'G') if socket.name == 'Roughness' else ('Blue', 'B')
+                image = MeshMerger.get_image(node.inputs[0].links[0].from_node)
+                if not image or link.from_socket.name not in expected or info["orm"] not in (None, image):
+                    return None
+                info["orm"] = image
+            else:
+                return None
+        return info
+
+    @staticmethod
+    def is_emissive(info):
+        return info["strength"] > 0 and (info["emission"] or any(info["emission_color"][:3]))
+
+    @staticmethod
+    def to_srgb(color):
+        return [c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055 for c in color[:3]]
+
+    @staticmethod
+    def read_pixels(image, width, height):
+        """RGBA pixels of an image at width x height, rows from the bottom"""
+        copy = None
+        if tuple(image.size) != (width, height):
+            image = copy = image.copy()
+            copy.scale(width, height)
+        pixels = np.empty(width * height * 4, np.float32)
+        image.pixels.foreach_get(pixels)
+        if copy:
+            bpy.data.images.remove(copy)
+        return pixels.reshape(height, width, 4)
+
+    @staticmethod
+    def get_tile(info, channel, width, height):
+        """Pixels of one material channel, constants fill the whole tile"""
+        if info[channel]:
+            tile = MeshMerger.read_pixels(info[channel], width, height)
+            tile[:, :, 3] = 1
+            return tile
+        if channel == "base":
+            color = MeshMerger.to_srgb(info["color"])
+        elif channel == "normal":
+            color = (0.5, 0.5, 1.0)
+        elif channel == "orm":
+            color = (1.0, info["roughness"], info["metallic"])
+        else:
+            color = MeshMerger.to_srgb(info["emission_color"]) if MeshMerger.is_emissive(info) else (0.0, 0.0, 0.0)
+        tile = np.empty((height, width, 4), np.float32)
+        tile[:, :] = list(color) + [1.0]
+        return tile
+
+    @staticmethod
+    def get_tile_size(info):
+        for channel in MeshMerger.CHANNELS:
+            if info[channel]:
+                return tuple(info[channel].size)
+        return 4, 4
+
+    @staticmethod
+    def shelf_pack(tiles, size):
+        """Tile positions on a size x size atlas or None, tallest tiles first"""
+        pad = MeshMerger.TILE_PADDING
+        positions = [None] * len(tiles)
+        x = y = shelf = 0
+        for i in sorted(range(len(tiles)), key=lambda i: -tiles[i][1]):
+            width, height = tiles[i][0] + 2 * pad, tiles[i][1] + 2 * pad
+            if x + width > size:
+                x, y, shelf = 0, y + shelf, 0
+            if width > size or y + height > size:
+                return None
+            positions[i] = (x + pad, y + pad)
+            x += width
+            shelf = max(shelf, height)
+        return positions
+
+    @staticmethod
+    def pack(sizes, max_size):
+        """(atlas size, positions, tile sizes), tiles are halved until they fit, or None"""
+        scale = 1.0
+        while True:
+            tiles = [(max(4, int(width * scale)), max(4, int(height * scale))) for width, height in sizes]
+            size = 64
+            while size <= max_size:
+                positions = MeshMerger.shelf_pack(tiles, size)
+                if positions:
+                    return size, positions, tiles
+                size *= 2
+            if all(tile == (4, 4) for tile in tiles):
+                return None
+            scale /= 2
+
+    @staticmethod
+    def build_atlas(name, infos, max_size, state):
+        """Atlas material for the given materials, returns it and each material's UV rect"""
+        channels = [channel for channel in MeshMerger.CHANNELS if channel == "base" or any(info[channel] for info in infos)]
+        if "orm" not in channels and len({(round(info["roughness"], 3), round(info["metallic"], 3)) for info in infos}) > 1:
+            channels.append("orm")
+        emissive = [info for info in infos if MeshMerger.is_emissive(info)]
+        if "emission" not in channels and len({tuple(round(c, 3) for c in info["emission_color"][:3]) for info in emissive} | ({(0, 0, 0)} if len(emissive) < len(infos) else set())) > 1:
+            channels.append("emission")
+
+        packed = MeshMerger.pack([MeshMerger.get_tile_size(info) for info in infos], max_size)
+        if not packed:
+            return None, None
+        size, positions, tiles = packed
+        pad = MeshMerger.TILE_PADDING
+        images = {}
+        for channel in channels:
+            pixels = np.zeros((size, size, 4), np.float32)
+            for info, (x, y), (width, height) in zip(infos, positions, tiles):
+                tile = MeshMerger.get_tile(info, channel, width, height)
+                pixels[y - pad:y + height + pad, x - pad:x + width + pad] = np.pad(tile, ((pad, pad), (pad, pad), (0, 0)), mode='edge')
+            image = bpy.data.images.new(f"{name}_{channel}", size, size)
+            if channel in ("normal", "orm"):
+                image.colorspace_settings.name = 'Non-Color'
+            image.pixels.foreach_set(pixels.ravel())
+            state["images"].append(image)
+            images[channel] = image
+
+        # Principled material reading the atlas
+        material = bpy.data.materials.new(name)
+        state["materials"].append(material)
+        material.use_nodes = True
+        material.use_backface_culling = infos[0]["backface"]
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+        bsdf = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+        bsdf.inputs['Roughness'].default_value = infos[0]["roughness"]
+        bsdf.inputs['Metallic'].default_value = infos[0]["metallic"]
+        if emissive:
+            bsdf.inputs['Emission Color'].default_value = emissive[0]["emission_color"]
+            bsdf.inputs['Emission Strength'].default_value = emissive[0]["strength"]
+        for channel, image in images.items():
+            texture = nodes.new('ShaderNodeTexImage')
+            texture.image = image
+            if channel == "base":
+                links.new(texture.outputs['Color'], bsdf.inputs['Base Color'])
+            elif channel == "normal":
+                normal_map = nodes.new('ShaderNodeNormalMap')
+                links.new(texture.outputs['Color'], normal_map.inputs['Color'])
+                links.new(normal_map.outputs['Normal'], bsdf.inputs['Normal'])
+            elif channel == "orm":
+                separate = nodes.new('ShaderNodeSeparateColor')
+                links.new(texture.outputs['Color'], separate.inputs['Color'])
+                links.new(separate.outputs['Green'], bsdf.inputs['Roughness'])
+                links.new(separate.outputs['Blue'], bsdf.inputs['Metallic'])
+            else:
+                links.new(texture.outputs['Color'], bsdf.inputs['Emission Color'])
+                bsdf.inputs['Emission Strength'].default_value = emissive[0]["strength"] if emissive else 1.0
+
+        rects = [
+            (np.array((x, y), np.float32) / size, np.array((width, height), np.float32) / size)
+            for (x, y), (width, height) in zip(positions, tiles)
+        ]
+        return material, rects
+
+    @staticmethod
+    def get_loop_materials(mesh):
+        """Material index of every loop"""
+        count = len(mesh.polygons)
+        loop_starts = np.empty(count, np.int32)
+        loop_totals = np.empty(count, np.int32)
+        material_indices = np.empty(count, np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        order = np.argsort(loop_starts)
+        return np.repeat(material_indices[order], loop_totals[order])
+
+    @staticmethod
+    def atlas_materials(obj, name, max_size, state):
+        """Replace the atlasable materials of a merged mesh with atlas materials"""
+        mesh = obj.data
+        if not len(mesh.polygons) or not mesh.uv_layers:
+            return
+        uv = np.empty(len(mesh.loops) * 2, np.float32)
+        mesh.uv_layers[0].data.foreach_get("uv", uv)
+        uv = uv.reshape(-1, 2)
+        loop_materials = MeshMerger.get_loop_materials(mesh)
+
+        # Materials that can share an atlas, textured ones need UVs inside 0-1
+        candidates = {}
+        for slot_index, material in enumerate(mesh.materials):
+            info = MeshMerger.read_principled(material)
+            mask = loop_materials == slot_index
+            if not info or not mask.any():
+                continue
+            info["mask"] = mask
+            info["textured"] = any(info[channel] for channel in MeshMerger.CHANNELS)
+            if info["textured"] and (uv[mask].min() < -0.001 or uv[mask].max() > 1.001):
+                continue
+            key = (info["backface"], info["strength"] if MeshMerger.is_emissive(info) else 0.0)
+            candidates.setdefault(key, []).append((slot_index, info))
+
+        for index, entries in enumerate(candidates.values()):
+            if len(entries) < 2:
+                continue
+            infos = [info for slot_index, info in entries]
+            material, rects = MeshMerger.build_atlas(f"{name}_atlas{index}", infos, max_size, state)
+            if not material:
+                continue
+            for (slot_index, info), (offset, size) in zip(entries, rects):
+                if info["textured"]:
+                    uv[info["mask"]] = offset + np.clip(uv[info["mask"]], 0, 1) * size
+                else:
+                    uv[info["mask"]] = offset + size / 2
+                mesh.materials[slot_index] = material
+        mesh.uv_layers[0].data.foreach_set("uv", uv.ravel())
+
+    @staticmethod
+    def dedupe_slots(mesh):
+        """One material slot per material, so each material is one primitive"""
+        materials = list(mesh.materials)
+        if len(materials) < 2:
+            return
+        indices = np.empty(len(mesh.polygons), np.int32)
+        mesh.polygons.foreach_get("material_index", indices)
+        unique = []
+        remap = np.zeros(len(materials), np.int32)
+        for index, material in enumerate(materials):
+            if material not in unique:
+                unique.append(material)
+            remap[index] = unique.index(material)
+        mesh.materials.clear()
+        for material in unique:
+            mesh.materials.append(material)
+        mesh.polygons.foreach_set("material_index", remap[np.clip(indices, 0, len(materials) - 1)])
+
+    @staticmethod
+    def prepare_join(obj):
+        """Move object linked materials onto the mesh and name the first UV map, so join keeps both"""
+        mesh = obj.data
+        for index, slot in enumerate(obj.material_slots):
+            if slot.link == 'OBJECT':
+                mesh.materials[index] = slot.material
+                slot.material = None
+                slot.link = 'DATA'
+        if not mesh.uv_layers:
+            mesh.uv_layers.new(name="UVMap")
+        mesh.uv_layers[0].name = "UVMap"
+
+    @staticmethod
+    def join(context, objects, name):
+        """Join objects into the first one and return it, the others are removed"""
+        target = objects[0]
+        target.name = name
+        joined_meshes = [obj.data for obj in objects[1:]]
+        with context.temp_override(active_object=target, object=target, selected_objects=objects, selected_editable_objects=objects):
+            bpy.ops.object.join()
+        # Join removes the other objects but leaves their meshes behind
+        for mesh in joined_meshes:
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        return target
+
+    @staticmethod
+    def merge_group(context, objects, name, settings, state, hide=True):
+        """Join evaluated copies of objects into one object and atlas its materials"""
+        depsgraph = context.evaluated_depsgraph_get()
+        copies = []
+        for obj in objects:
+            mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+            copy = obj.copy()
+            copy.data = mesh
+            copy.modifiers.clear()
+            MeshMerger.prepare_join(copy)
+            context.scene.collection.objects.link(copy)
+            copies.append(copy)
+
+        target = MeshMerger.join(context, copies, name)
+        state["objects"].append(target)
+
+        MeshMerger.atlas_materials(target, name, settings.atlas_size, state)
+        MeshMerger.dedupe_slots(target.data)
+        target.select_set(any(obj.select_get() for obj in objects))
+        state["replaced"].extend(objects)
+        if hide:
+            for obj in objects:
+                obj.hide_set(True)
+                state["hidden"].append(obj)
+
+    @staticmethod
+    def process_objects(context, objects, settings, hide=True):
+        """Merge the mergeable objects among the given ones, returns state for cleanup
+
+        The merged objects are listed in state["replaced"], with hide=False they stay visible.
+        """
+        state = {"objects": [], "materials": [], "images": [], "replaced": [], "hidden": []}
+        for index, group in enumerate(MeshMerger.find_groups(objects)):
+            materials = HyperfyExporter.get_materials(group)
+            if len(group) < 2 and len(materials) < 2:
+                continue
+            parent = group[0].parent
+            MeshMerger.merge_group(context, group, f"{parent.name if parent else group[0].name}_merged{index}", settings, state, hide)
+        return state
+
+    @staticmethod
+    def cleanup_objects(state):
+        for obj in state["objects"]:
+            mesh = obj.data
+            bpy.data.objects.remove(obj)
+            bpy.data.meshes.remove(mesh)
+        for material in state["materials"]:
+            bpy.data.materials.remove(material)
+        for image in state["images"]:
+            bpy.data.images.remove(image)
+        for obj in state["hidden"]:
+            obj.hide_set(False)
+
+
+class AvatarExporter:
+    """Exports armature roots as VRM avatars that stay cheap when many players are visible
+
+    Works on temporary copies of the armature and its meshes. Skinned meshes
+    are joined into one mesh with one primitive per material, and their simple
+    opaque materials are atlased like merged static meshes. Leaf bones that the
+    VRM humanoid, spring bones and bone parented meshes don't reference are
+    collapsed into their parents until the bone limit is met, every vertex keeps
+    at most the given number of influences, and the largest textures are halved
+    until they fit the texture budget. The VRM add-on writes the file, which is
+    then checked for what createVRMFactory needs: the hips, head and upper arm
+    humanoid bones and one skeleton shared by every skinned mesh.
+    """
+
+    REQUIRED_BONES = ("hips", "head", "leftUpperArm", "rightUpperArm")
+    MIN_TEXTURE_SIZE = 64
+
+    # VRM add-on properties that reference bones and mesh objects by name
+    BONE_PROPERTY = "bone_name"
+    MESH_PROPERTY = "mesh_object_name"
+
+    @staticmethod
+    def is_available():
+        """The VRM add-on registers export_scene.vrm"""
+        try:
+            bpy.ops.export_scene.vrm.get_rna_type()
+            return True
+        except (AttributeError, KeyError):
+            return False
+
+    @staticmethod
+    def get_addon_module():
+        """Module name of the enabled add-on that registers export_scene.vrm, or None"""
+        if not AvatarExporter.is_available():
+            return None
+        cls = bpy.types.Operator.bl_rna_get_subclass_py("EXPORT_SCENE_OT_vrm")
+        if cls is None:
+            return None
+        for name in bpy.context.preferences.addons.keys():
+            if cls.__module__ == name or cls.__module__.startswith(name + "."):
+                return name
+        return None
+
+    @staticmethod
+    def is_avatar(obj):
+        """Armatures that deform at least one of their child meshes"""
+        if obj.type != 'ARMATURE':
+            return False
+        return any(child.type == 'MESH' and child.find_armature() == obj for child in obj.children_recursive)
+
+    @staticmethod
+    def find_references(rna, identifier):
+        """Property groups below rna with a string property of the given name"""
+        found = []
+        seen = set()
+        stack = [rna]
+        while stack:
+            item = stack.pop()
+            if item.as_pointer() in seen:
+                continue
+            seen.add(item.as_pointer())
+            for prop in item.bl_rna.properties:
+                if prop.identifier == "rna_type":
+                    continue
+                if prop.type == 'STRING' and prop.identifier == identifier:
+                    found.append(item)
+                elif prop.type == 'POINTER':
+                    value = getattr(item, prop.identifier, None)
+                    # Datablocks are referenced, not owned
+                    if value is not None and not isinstance(value, bpy.types.ID):
+                        stack.append(value)
+                elif prop.type == 'COLLECTION':
+                    stack.extend(getattr(item, prop.identifier, ()))
+        return found
+
+    @staticmethod
+    def update_references(armature, names):
+        """Point the VRM add-on's mesh references at the copies, returns the bone names it references"""
+        extension = getattr(armature.data, "vrm_addon_extension", None)
+        if extension is None:
+            return set()
+        for item in AvatarExporter.find_references(extension, AvatarExporter.MESH_PROPERTY):
+            name = getattr(item, AvatarExporter.MESH_PROPERTY)
+            if name in names:
+                setattr(item, AvatarExporter.MESH_PROPERTY, names[name])
+        bones = {getattr(item, AvatarExporter.BONE_PROPERTY) for item in AvatarExporter.find_references(extension, AvatarExporter.BONE_PROPERTY)}
+        bones.discard("")
+        return bones
+
+    @staticmethod
+    def copy_hierarchy(context, root, state):
+        """Copy the armature to the origin with its visible meshes, returns the armature and the mesh copies by original name"""
+        armature = root.copy()
+        armature.data = root.data.copy()
+        armature.location = (0.0, 0.0, 0.0)
+        context.scene.collection.objects.link(armature)
+        state["objects"].append(armature)
+
+        copies = {}
+        for obj in root.children_recursive:
+            if obj.type != 'MESH' or not obj.visible_get():
+                continue
+            copy = obj.copy()
+            copy.data = obj.data.copy()
+            for modifier in copy.modifiers:
+                if modifier.type == 'ARMATURE' and modifier.object == root:
+                    modifier.object = armature
+            context.scene.collection.objects.link(copy)
+            state["objects"].append(copy)
+            copies[obj.name] = copy
+
+        # Meshes below objects that weren't copied keep their place relative to the armature
+        context.view_layer.update()
+        offset = armature.matrix_world @ root.matrix_world.inverted()
+        for name, copy in copies.items():
+            obj = bpy.data.objects[name]
+            if obj.parent == root:
+                copy.parent = armature
+            elif obj.parent.name in copies:
+                copy.parent = copies[obj.parent.name]
+            else:
+                copy.parent = armature
+                copy.parent_type = 'OBJECT'
+                copy.matrix_parent_inverse.identity()
+                copy.matrix_world = offset @ obj.matrix_world
+        return armature, copies
+
+    @staticmethod
+    def join_skinned(context, armature, copies, name, settings, state):
+        """Join the meshes deformed only by the armature and atlas their materials, returns the remaining meshes"""
+        meshes = list(copies.values())
+        skinned = [
+            copy for copy in meshes
+            if copy.find_armature() == armature and copy.parent_type != 'BONE' and not copy.children
+            and copy.modifiers and all(modifier.type == 'ARMATURE' for modifier in copy.modifiers)
+        ]
+        if not skinned:
+            return meshes
+        joined = [original for original, copy in copies.items() if copy in skinned]
+        others = [copy for copy in meshes if copy not in skinned]
+        # The mesh with the most shape keys is joined into, so none are lost
+        skinned.sort(key=lambda copy: -len(copy.data.shape_keys.key_blocks) if copy.data.shape_keys else 0)
+        for copy in skinned:
+            MeshMerger.prepare_join(copy)
+        target = skinned[0]
+        if len(skinned) > 1:
+            for copy in skinned[1:]:
+                state["objects"].remove(copy)
+            MeshMerger.join(context, skinned, name)
+        for original in joined:
+            copies[original] = target
+
+        MeshMerger.atlas_materials(target, name, settings.atlas_size, state)
+        MeshMerger.dedupe_slots(target.data)
+        return [target] + others
+
+    @staticmethod
+    def read_weights(obj):
+        """Vertex indices and weights of each vertex group, by group name"""
+        names = {group.index: group.name for group in obj.vertex_groups}
+        weights = {}
+        for vertex in obj.data.vertices:
+            for element in vertex.groups:
+                indices, values = weights.setdefault(names[element.group], ([], []))
+                indices.append(vertex.index)
+                values.append(element.weight)
+        return weights
+
+    @staticmethod
+    def get_deform_parent(bone, deform):
+        parent = bone.parent
+        while parent and parent.name not in deform:
+            parent = parent.parent
+        return parent.name if parent else None
+
+    @staticmethod
+    def collapse_bones(context, armature, meshes, protected, max_bones):
+        """Merge the weights of unreferenced leaf bones into their parents until max_bones deform
+
+        The least weighted leaf goes first. Returns the names of the removed bones.
+        """
+        bones = armature.data.bones
+        deform = {bone.name for bone in bones if bone.use_deform}
+        if len(deform) <= max_bones:
+            return []
+        weights = [AvatarExporter.read_weights(obj) for obj in meshes]
+        totals = {}
+        for groups in weights:
+            for name, (indices, values) in groups.items():
+                totals[name] = totals.get(name, 0.0) + sum(values)
+
+        removed = []
+        while len(deform) > max_bones:
+            candidates = []
+            for name in deform:
+                bone = bones[name]
+                if name in protected or any(child.name in deform for child in bone.children):
+                    continue
+                target = AvatarExporter.get_deform_parent(bone, deform)
+                if target:
+                    candidates.append((totals.get(name, 0.0), name, target))
+            if not candidates:
+                break
+            total, name, target = min(candidates)
+            for obj, groups in zip(meshes, weights):
+                if name not in groups:
+                    continue
+                indices, values = groups.pop(name)
+                group = obj.vertex_groups.get(target) or obj.vertex_groups.new(name=target)
+                for index, value in zip(indices, values):
+                    group.add([index], value, 'ADD')
+                obj.vertex_groups.remove(obj.vertex_groups[name])
+                merged = groups.setdefault(target, ([], []))
+                merged[0].extend(indices)
+                merged[1].extend(values)
+            totals[target] = totals.get(target, 0.0) + total
+            deform.discard(name)
+            removed.append(name)
+
+        if removed:
+            context.view_layer.objects.active = armature
+            bpy.ops.object.mode_set(mode='EDIT')
+            edit_bones = armature.data.edit_bones
+            for name in removed:
+                edit_bones.remove(edit_bones[name])
+            bpy.ops.object.mode_set(mode='OBJECT')
+        return removed
+
+    @staticmethod
+    def limit_influences(context, meshes, limit):
+        """Keep the strongest bone weights of each vertex and normalize them"""
+        for obj in meshes:
+            if not obj.vertex_groups or obj.find_armature() is None:
+                continue
+            with context.temp_override(active_object=obj, object=obj):
+                bpy.ops.object.vertex_group_limit_total(group_select_mode='BONE_DEFORM', limit=limit)
+                bpy.ops.object.vertex_group_normalize_all(group_select_mode='BONE_DEFORM', lock_active=False)
+
+    @staticmethod
+    def fit_textures(materials, budget, state):
+        """Halve the largest images until their estimated memory fits the budget
+
+        Images are scaled in place, their original pixels are kept in
+        state["textures"] for restore_textures().
+        """
+        images = {}
+        for node_tree in TextureCache.get_node_trees(materials):
+            for node in node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image and node.image.size[0]:
+                    images[node.image.as_pointer()] = node.image
+        images = list(images.values())
+        temporary = {image.as_pointer() for image in state["images"]}
+        saved = set()
+        while sum(image.size[0] * image.size[1] * 4 for image in images) > budget:
+            scalable = [image for image in images if not image.library and max(image.size) > AvatarExporter.MIN_TEXTURE_SIZE]
+            if not scalable:
+                break
+            image = max(scalable, key=lambda image: image.size[0] * image.size[1])
+            width, height = image.size
+            pointer = image.as_pointer()
+            if pointer not in temporary and pointer not in saved:
+                saved.add(pointer)
+                pixels = None
+                # Unmodified files are reloaded from disk, anything else keeps a copy of its pixels
+                if image.source != 'FILE' or image.packed_file or image.is_dirty:
+                    pixels = np.empty(width * height * 4, np.float32)
+                    image.pixels.foreach_get(pixels)
+                state["textures"].append((image, (width, height), pixels))
+            image.scale(max(1, width // 2), max(1, height // 2))
+
+    @staticmethod
+    def restore_textures(state):
+        for image, size, pixels in reversed(state["textures"]):
+            if pixels is None:
+                image.reload()
+            else:
+                image.scale(*size)
+                image.pixels.foreach_set(pixels)
+        state["textures"].clear()
+
+    @staticmethod
+    def export_vrm(filepath, armature):
+        """Run the VRM add-on's exporter on the selected armature copy"""
+        params = {
+            'filepath': filepath,
+            'armature_object_name': armature.name,
+            'export_only_selections': True,
+            'ignore_warning': True,
+        }
+        while True:
+            try:
+                result = bpy.ops.export_scene.vrm(**params)
+                break
+            except TypeError as e:
+                # Options from other add-on versions are dropped one at a time
+                match = re.search(r'keyword "(\w+)" unrecognized', str(e))
+                if match and match.group(1) in params:
+                    del params[match.group(1)]
+                    continue
+                raise e
+        if 'FINISHED' not in result:
+            raise RuntimeError("The VRM add-on cancelled the export, check its validation messages")
+
+    @staticmethod
+    def check_file(filepath):
+        """Problems that would stop createVRMFactory from loading an exported avatar"""
+        gltf = GLBFile.load(filepath).gltf
+        name = os.path.basename(filepath)
+        extensions = gltf.get("extensions", {})
+        if "VRMC_vrm" in extensions:
+            bones = set(extensions["VRMC_vrm"].get("humanoid", {}).get("humanBones", {}))
+        elif "VRM" in extensions:
+            bones = {bone.get("bone") for bone in extensions["VRM"].get("humanoid", {}).get("humanBones", [])}
+        else:
+            return [f"'{name}' has no VRM humanoid"]
+
+        errors = []
+        missing = [bone for bone in AvatarExporter.REQUIRED_BONES if bone not in bones]
+        if missing:
+            errors.append(f"'{name}' is missing the humanoid bones {', '.join(missing)}")
+        skins = gltf.get("skins", [])
+        skeletons = {tuple(skins[node["skin"]]["joints"]) for node in gltf.get("nodes", []) if "skin" in node and "mesh" in node}
+        if not skeletons:
+            errors.append(f"'{name}' has no skinned meshes")
+        elif len(skeletons) > 1:
+            errors.append(f"'{name}' has {len(skeletons)} skeletons, the client animates every skinned mesh with the first one")
+        return errors
+
+    @staticmethod
+    def get_stats(root, context):
+        stats = BudgetValidator.measure(root, context.evaluated_depsgraph_get(), {})
+        return {key: stats[key] for key in ("triangles", "draw_calls", "texture_bytes", "bones")}
+
+    @staticmethod
+    def export_root(context, root, export_directory, settings):
+        """Optimize an armature root and export it to <export_directory>/<name>.vrm
+
+        Returns the profiled report entry and a list of non-fatal errors.
+        """
+        if not AvatarExporter.is_available():
+            raise RuntimeError("Avatar export needs the VRM add-on (VRM Add-on for Blender)")
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        errors = []
+        profiler = ExportProfiler()
+        filepath = os.path.join(export_directory, f"{root.name}.vrm")
+        state = {"objects": [], "materials": [], "images": [], "textures": [], "hidden": []}
+        original_selection = context.selected_objects.copy()
+        original_active = context.view_layer.objects.active
+        before = AvatarExporter.get_stats(root, context)
+        try:
+            with profiler.stage("avatar"):
+                armature, copies = AvatarExporter.copy_hierarchy(context, root, state)
+                meshes = AvatarExporter.join_skinned(context, armature, copies, f"{root.name}_merged", settings, state)
+                protected = AvatarExporter.update_references(armature, {name: copy.name for name, copy in copies.items()})
+                protected.update(copy.parent_bone for copy in meshes if copy.parent_type == 'BONE')
+                removed = AvatarExporter.collapse_bones(context, armature, meshes, protected, settings.avatar_bones)
+                AvatarExporter.limit_influences(context, meshes, settings.avatar_influences)
+                AvatarExporter.fit_textures(HyperfyExporter.get_materials(meshes), settings.avatar_texture_mb * 1024 * 1024, state)
+                after = AvatarExporter.get_stats(armature, context)
+
+            # Only the copies are visible and selected while the add-on exports
+            with profiler.stage("vrm"):
+                for obj in [root] + list(root.children_recursive):
+                    if obj.visible_get():
+                        obj.hide_set(True)
+                        state["hidden"].append(obj)
+                bpy.ops.object.select_all(action='DESELECT')
+                for obj in [armature] + meshes:
+                    obj.select_set(True)
+                context.view_layer.objects.active = armature
+                AvatarExporter.export_vrm(filepath, armature)
+
+        finally:
+            with profiler.stage("cleanup"):
+                AvatarExporter.cleanup(state)
+                bpy.ops.object.select_all(action='DESELECT')
+                for obj in original_selection:
+                    obj.select_set(True)
+                context.view_layer.objects.active = original_active
+
+        if after["bones"] > settings.avatar_bones:
+            errors.append(f"Avatar '{root.name}' still has {after['bones']} bones, the rest are used by the humanoid, spring bones or attached meshes")
+        if after["texture_bytes"] > settings.avatar_texture_mb * 1024 * 1024:
+            errors.append(f"Avatar '{root.name}' textures are still over {settings.avatar_texture_mb} MB")
+        errors.extend(AvatarExporter.check_file(filepath))
+        profiler.avatar = {"before": before, "after": after, "removed_bones": len(removed)}
+        return profiler.describe(root.name, filepath), errors
+
+    @staticmethod
+    def cleanup(state):
+        AvatarExporter.restore_textures(state)
+        for obj in state["objects"]:
+            data = obj.data
+            datablocks = bpy.data.armatures if obj.type == 'ARMATURE' else bpy.data.meshes
+            bpy.data.objects.remove(obj)
+            if data.users == 0:
+                datablocks.remove(data)
+        for material in state["materials"]:
+            bpy.data.materials.remove(material)
+        for image in state["images"]:
+            bpy.data.images.remove(image)
+        for obj in state["hidden"]:
+            obj.hide_set(False)
+
+
+class SceneTiler:
+    """Splits root objects into a grid of spatial cells for tiled exports
+
+    Cells are cubes in glTF space (Y up) aligned to the origin, the same grid
+    LooseOctree nodes of that width sit on. Each root goes whole into the cell
+    holding the center of its bounds, so like a loose octree a tile's bounds
+    can be bigger than its cell.
+    """
+
+    INDEX_FILENAME = "tiles.json"
+
+    @staticmethod
+    def get_bounds(root):
+        """World bounds of a root's visible hierarchy in glTF space, as (min, max) arrays"""
+        points = []
+        for obj in [root] + list(root.children_recursive):
+            if not obj.visible_get():
+                continue
+            matrix = np.array(obj.matrix_world, dtype=np.float64)
+            if obj.type in ('MESH', 'CURVE', 'SURFACE', 'FONT', 'META'):
+                corners = np.array(obj.bound_box, dtype=np.float64)
+                points.append(corners @ matrix[:3, :3].T + matrix[:3, 3])
+            else:
+                points.append(matrix[:3, 3][None])
+        points = np.concatenate(points)
+        # Blender (x, y, z) is glTF (x, z, -y)
+        points = np.stack((points[:, 0], points[:, 2], -points[:, 1]), axis=1)
+        return points.min(axis=0), points.max(axis=0)
+
+    @staticmethod
+    def assign(roots, size):
+        """Cell index -> (roots, min, max) for the cells that have roots"""
+        cells = {}
+        for root in roots:
+            low, high = SceneTiler.get_bounds(root)
+            key = tuple(int(i) for i in np.floor((low + high) / 2 / size))
+            if key in cells:
+                objects, cell_low, cell_high = cells[key]
+                objects.append(root)
+                cells[key] = (objects, np.minimum(cell_low, low), np.maximum(cell_high, high))
+            else:
+                cells[key] = ([root], low, high)
+        return cells
+
+    @staticmethod
+    def write_index(directory, size, tiles):
+        """Write the tile index clients stream tiles from"""
+        filepath = os.path.join(directory, SceneTiler.INDEX_FILENAME)
+        with open(filepath, "w") as f:
+            json.dump({"cellSize": size, "up": "y", "tiles": tiles}, f, indent=2)
+        return filepath
+
+class HyperfyExportSettings(PropertyGroup):
+    """Scene level export settings shared by the export operators and background workers"""
+
+    parallel: BoolProperty(
+        name="Parallel",
+        description="Export root objects in background Blender processes instead of one at a time",
+        default=False
+    )
+
+    parallel_workers: IntProperty(
+        name="Workers",
+        description="Number of background Blender processes (0 = one per core)",
+        default=0,
+        min=0
+    )
+
+    incremental: BoolProperty(
+        name="Incremental",
+        description="Only re-export root objects that changed since the last individual export",
+        default=False
+    )
+
+    watch: BoolProperty(
+        name="Watch",
+        description="Re-export changed root objects in a background Blender process after each save",
+        default=False
+    )
+
+    watch_directory: StringProperty(
+        name="Watch Directory",
+        description="Where watch exports are written, eg. a local world's assets folder (empty = exported_glbs next to the blend file)",
+        default="",
+        subtype='DIR_PATH'
+    )
+
+    watch_delay: FloatProperty(
+        name="Delay",
+        description="Seconds to wait after a save before exporting, further saves restart the wait",
+        default=2.0,
+        min=0.0,
+        max=60.0
+    )
+
+    texture_quality: IntProperty(
+        name="Texture Quality",
+        description="Quality of WEBP encoded textures",
+        default=75,
+        min=0,
+        max=100
+    )
+
+    texture_cache: BoolProperty(
+        name="Texture Cache",
+        description="Reuse previously encoded textures instead of encoding every image on every export",
+        default=False
+    )
+
+    texture_cache_directory: StringProperty(
+        name="Cache Directory",
+        description="Where encoded textures are cached (empty = ~/.cache/hyperfy/textures)",
+        default="",
+        subtype='DIR_PATH'
+    )
+
+    budget_mode: EnumProperty(
+        name="Budgets",
+        description="What to do when a root object is over one of the performance budgets",
+        items=[
+            ('OFF', "Off", "Don't check budgets"),
+            ('WARN', "Warn", "Export anyway and report the roots that are over budget"),
+            ('BLOCK', "Block", "Don't export roots that are over budget"),
+        ],
+        default='WARN'
+    )
+
+    budget_triangles: IntProperty(
+        name="Triangles",
+        description="Maximum triangles per root object",
+        default=100000,
+        min=0
+    )
+
+    budget_draw_calls: IntProperty(
+        name="Draw Calls",
+        description="Maximum draw calls (meshes x materials) per root object",
+        default=64,
+        min=0
+    )
+
+    budget_texture_mb: IntProperty(
+        name="Texture Memory (MB)",
+        description="Maximum estimated GPU texture memory per root object (width x height x 4 per image)",
+        default=64,
+        min=0
+    )
+
+    budget_bones: IntProperty(
+        name="Bones",
+        description="Maximum deforming bones per root object",
+        default=128,
+        min=0
+    )
+
+    texture_cache_size: IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used textures are removed once the cache grows past this size",
+        default=2048,
+        min=64
+    )
+
+    texture_format: EnumProperty(
+        name="Textures",
+        description="Texture formats embedded in exported files",
+        items=TEXTURE_FORMATS,
+        default='WEBP'
+    )
+
+    texture_tiers: EnumProperty(
+        name="Tiers",
+        description="Also write lower tiers of every file for smaller devices, with a tiers.json listing each asset's files. The main file is the desktop tier",
+        items=[
+            ('MOBILE', "Mobile", "Textures, meshes and compression from the Mobile tier settings (1024px WEBP textures, optimized meshes with quantized normals and UVs by default)"),
+            ('LOW', "Low", "Textures, meshes and compression from the Low tier settings (512px WEBP textures, optimized meshes with quantized normals and UVs by default)"),
+        ],
+        options={'ENUM_FLAG'},
+        default=set()
+    )
+
+    tier_mobile_texture_size: IntProperty(
+        name="Mobile Texture Size",
+        description="Largest texture size of the mobile tier, larger textures are halved until they fit",
+        default=1024,
+        min=64,
+        max=8192
+    )
+
+    tier_mobile_texture_quality: IntProperty(
+        name="Mobile Texture Quality",
+        description="Quality of the textures re-encoded for the mobile tier",
+        default=75,
+        min=0,
+        max=100
+    )
+
+    tier_mobile_texture_format: EnumProperty(
+        name="Mobile Textures",
+        description="Texture formats embedded in the mobile tier",
+        items=TEXTURE_FORMATS,
+        default='WEBP'
+    )
+
+    tier_mobile_mesh_optimize: BoolProperty(
+        name="Mobile Optimize Meshes",
+        description="Optimize the meshes of the mobile tier, like Optimize Meshes",
+        default=True
+    )
+
+    tier_mobile_mesh_quantize: EnumProperty(
+        name="Mobile Quantize",
+        description="Mesh quantization of the mobile tier (KHR_mesh_quantization)",
+        items=MESH_QUANTIZATIONS,
+        default='ATTRIBUTES'
+    )
+
+    tier_low_texture_size: IntProperty(
+        name="Low Texture Size",
+        description="Largest texture size of the low tier, larger textures are halved until they fit",
+        default=512,
+        min=64,
+        max=8192
+    )
+
+    tier_low_texture_quality: IntProperty(
+        name="Low Texture Quality",
+        description="Quality of the textures re-encoded for the low tier",
+        default=60,
+        min=0,
+        max=100
+    )
+
+    tier_low_texture_format: EnumProperty(
+        name="Low Textures",
+        description="Texture formats embedded in the low tier",
+        items=TEXTURE_FORMATS,
+        default='WEBP'
+    )
+
+    tier_low_mesh_optimize: BoolProperty(
+        name="Low Optimize Meshes",
+        description="Optimize the meshes of the low tier, like Optimize Meshes",
+        default=True
+    )
+
+    tier_low_mesh_quantize: EnumProperty(
+        name="Low Quantize",
+        description="Mesh quantization of the low tier (KHR_mesh_quantization)",
+        items=MESH_QUANTIZATIONS,
+        default='ATTRIBUTES'
+    )
+
+    ktx2_encoding: EnumProperty(
+        name="KTX2 Encoding",
+        description="Basis encoding for color textures, normal maps always use UASTC",
+        items=[
+            ('ETC1S', "ETC1S", "Smallest files and lowest quality"),
+            ('UASTC', "UASTC", "Larger files and higher quality"),
+        ],
+        default='ETC1S'
+    )
+
+    toktx_path: StringProperty(
+        name="toktx",
+        description="Path to the toktx executable from KTX-Software (empty = search PATH)",
+        default="",
+        subtype='FILE_PATH'
+    )
+
+    mesh_optimize: BoolProperty(
+        name="Optimize Meshes",
+        description="Drop UVs, tangents and vertex colors no material uses, weld identical vertices and reorder triangles for GPU cache locality",
+        default=False
+    )
+
+    mesh_quantize: EnumProperty(
+        name="Quantize",
+        description="Store mesh attributes as normalized integers (KHR_mesh_quantization)",
+        items=MESH_QUANTIZATIONS,
+        default='NONE'
+    )
+
+    animation_optimize: BoolProperty(
+        name="Optimize Animations",
+        description="Remove keyframes, channels and bones that don't change the animation within the tolerance",
+        default=False
+    )
+
+    animation_tolerance: FloatProperty(
+        name="Tolerance",
+        description="Largest error a removed keyframe may introduce, in meters for translation and in quaternion units for rotation",
+        default=0.0005,
+        min=0.0,
+        max=0.1,
+        precision=4,
+        step=0.01
+    )
+
+    animation_quantize: BoolProperty(
+        name="Quantize Rotations",
+        description="Store animated rotations as 16-bit integers instead of 32-bit floats",
+        default=False
+    )
+
+    tiled: BoolProperty(
+        name="Tiled",
+        description="Export All writes one GLB per spatial cell plus a tiles.json index with their bounds and sizes, so worlds can stream tiles in by distance",
+        default=False
+    )
+
+    tile_size: EnumProperty(
+        name="Tile Size",
+        description="Width of a cell in meters. LooseOctree nodes are 20m wide at the root and halve or double per level",
+        items=[
+            ('10', "10 m", ""),
+            ('20', "20 m", ""),
+            ('40', "40 m", ""),
+            ('80', "80 m", ""),
+            ('160', "160 m", ""),
+            ('320', "320 m", ""),
+        ],
+        default='40'
+    )
+
+    package_format: EnumProperty(
+        name="Package",
+        description="File written for each export",
+        items=[
+            ('GLB', "GLB", "Plain GLB model, dragged into a world as a new app"),
+            ('HYP', ".hyp App", "Ready to import app with the model stored under its content hash"),
+        ],
+        default='GLB'
+    )
+
+    push: BoolProperty(
+        name="Push to World",
+        description="Upload exported files to a world server after exporting, skipping ones it already has",
+        default=False
+    )
+
+    push_url: StringProperty(
+        name="World URL",
+        description="Address of the world server to upload to, eg. http://localhost:3000",
+        default=""
+    )
+
+    push_workers: IntProperty(
+        name="Uploads",
+        description="Number of concurrent uploads",
+        default=8,
+        min=1,
+        max=32
+    )
+
+    gpu_instancing: BoolProperty(
+        name="GPU Instancing",
+        description="Export linked duplicates that share a parent, and geometry nodes instances, once with a list of transforms (EXT_mesh_gpu_instancing)",
+        default=False
+    )
+
+    merge_meshes: BoolProperty(
+        name="Merge Meshes",
+        description="Join static meshes that share a parent and bake their simple materials into a texture atlas. Merged objects lose their names, so give objects scripts look up a custom property to keep them",
+        default=False
+    )
+
+    atlas_size: IntProperty(
+        name="Atlas Size",
+        description="Maximum width and height of a texture atlas, tiles are scaled down to fit",
+        default=2048,
+        min=256,
+        max=8192
+    )
+
+    avatar_mode: BoolProperty(
+        name="Avatars as VRM",
+        description="Export armature roots with the VRM add-on as .vrm avatars, joining their meshes and reducing bones, weights and textures to the avatar limits",
+        default=False
+    )
+
+    avatar_bones: IntProperty(
+        name="Bones",
+        description="Maximum deforming bones per avatar, humanoid and spring bones are always kept",
+        default=96,
+        min=1
+    )
+
+    avatar_influences: IntProperty(
+        name="Bone Influences",
+        description="Maximum bones deforming each vertex",
+        default=4,
+        min=1,
+        max=4
+    )
+
+    avatar_texture_mb: IntProperty(
+        name="Texture Memory (MB)",
+        description="Largest images are halved until the avatar's estimated GPU texture memory fits",
+        default=16,
+        min=1
+    )
+
+    collider_primitives: BoolProperty(
+        name="Fit Collider Primitives",
+        description="Export box, sphere and capsule shaped collider meshes as primitive colliders",
+        default=False
+    )
+
+    collider_hulls: IntProperty(
+        name="Collider Hulls",
+        description="Split other collider meshes into at most this many convex hulls (0 = keep the mesh)",
+        default=0,
+        min=0,
+        max=32
+    )
+
+    collider_hull_triangles: IntProperty(
+        name="Hull Triangles",
+        description="Maximum number of triangles per convex hull",
+        default=64,
+        min=8,
+        max=255
+    )
+
+    collider_tolerance: FloatProperty(
+        name="Collider Tolerance",
+        description="How far a collider mesh may deviate from a fitted shape, relative to its size",
+        default=0.02,
+        min=0.001,
+        max=0.5
+    )
+
+class HyperfyExporter:
+    """Helper class to handle exporting root objects, shared by the operators and background workers"""
+
+    REPORT_FILENAME = "export_report.json"
+
+    # bpy.data collections purged of unused datablocks an export created
+    TEMPORARY_DATA = ("objects", "meshes", "images", "collections")
+
+    @staticmethod
+    def get_base_directory():
+        """Directory of the blend file, or the user's Documents folder if it hasn't been saved yet"""
+        blend_filepath = bpy.data.filepath
+        if not blend_filepath:
+            return os.path.join(os.path.expanduser("~"), "Documents")
+        return os.path.dirname(blend_filepath)
+
+    @staticmethod
+    def get_export_directory():
+        """Directory that individual exports are written to"""
+        return os.path.join(HyperfyExporter.get_base_directory(), "exported_glbs")
+
+    @staticmethod
+    def get_root_objects(scene, root_names=None):
+        """Find all root objects (objects with no parent), optionally limited to the given names"""
+        root_objects = [obj for obj in scene.objects if obj.parent is None]
+        if root_names is not None:
+            root_names = set(root_names)
+            root_objects = [obj for obj in root_objects if obj.name in root_names]
+        return root_objects
+
+    @staticmethod
+    def new_report(export_directory):
+        """Empty report, filled in by the exporters"""
+        return {
+            "directory": export_directory,
+            "exported": [],
+            "failed": [],
+            "skipped": [],
+            "unchanged": [],
+            "errors": [],
+            "warnings": [],
+            "uploaded": [],
+            "existing": [],
+        }
+
+    @staticmethod
+    def export_gltf(export_params):
+        """Run the glTF exporter, dropping options this Blender version doesn't support"""
+        while True:
+            try:
+                bpy.ops.export_scene.gltf(**export_params)
+                return
+            except TypeError as e:
+                # If there's an error about WebP not being found, try without it
+                if "enum \"WEBP\" not found" in str(e) and 'export_image_format' in export_params:
+                    del export_params['export_image_format']
+                    continue
+                # Options from newer exporter versions are dropped one at a time
+                match = re.search(r'keyword "(\w+)" unrecognized', str(e))
+                if match and match.group(1) in export_params:
+                    del export_params[match.group(1)]
+                    continue
+                # If it's some other error, re-raise it
+                raise e
+
+    @staticmethod
+    def supports_collection_export():
+        """glTF exporters from Blender 4.2 can export a single collection"""
+        try:
+            return "collection" in bpy.ops.export_scene.gltf.get_rna_type().properties
+        except (AttributeError, KeyError):
+            return False
+
+    @staticmethod
+    def snapshot_datablocks():
+        """Pointers of the datablock types exports create temporary copies of"""
+        return {name: {block.as_pointer() for block in getattr(bpy.data, name)} for name in HyperfyExporter.TEMPORARY_DATA}
+
+    @staticmethod
+    def purge_datablocks(snapshot):
+        """Remove unused datablocks created since the snapshot, so repeated exports don't grow the file"""
+        for name, pointers in snapshot.items():
+            data = getattr(bpy.data, name)
+            for block in [block for block in data if block.users == 0 and block.as_pointer() not in pointers]:
+                data.remove(block)
+
+    @staticmethod
+    def move_roots(filepath, offset):
+        """Subtract a Blender space offset from the scene root nodes of a GLB"""
+        glb = GLBFile.load(filepath)
+        gltf = glb.gltf
+        # Blender (x, y, z) is glTF (x, z, -y)
+        delta = (offset[0], offset[2], -offset[1])
+        for scene in gltf.get("scenes", []):
+            for index in scene.get("nodes", []):
+                node = gltf["nodes"][index]
+                if "matrix" in node:
+                    for i in range(3):
+                        node["matrix"][12 + i] -= delta[i]
+                else:
+                    translation = node.get("translation", [0.0, 0.0, 0.0])
+                    node["translation"] = [translation[i] - delta[i] for i in range(3)]
+        glb.save(filepath)
+
+    @staticmethod
+    def get_export_params(filepath, settings, use_selection, collection=None):
+        """glTF exporter options shared by every export mode"""
+        params = {
+            'filepath': filepath,
+            'export_format': 'GLB',
+            'export_image_format': 'WEBP',
+            'export_image_quality': settings.texture_quality,
+            'export_extras': True,  # custom properties
+            'export_apply': True,   # apply modifiers
+            'export_gpu_instances': settings.gpu_instancing,
+            'export_gn_mesh': settings.gpu_instancing,  # geometry nodes instances as shared meshes
+            'use_selection': use_selection,
+            'use_visible': True  # only visible
+        }
+        if collection:
+            params['collection'] = collection
+        return params
+
+    @staticmethod
+    def get_materials(objects):
+        """Unique materials used by the given objects"""
+        materials = {}
+        for obj in objects:
+            for slot in getattr(obj, "material_slots", []):
+                if slot.material:
+                    materials[slot.material.name] = slot.material
+        return list(materials.values())
+
+    @staticmethod
+    def export_objects(objects, settings, export_params, profiler, origin=None, tiers=None):
+        """Export with the texture cache and post-processing steps enabled in settings
+
+        If origin is given the written root nodes are moved so it ends up at the origin.
+        With tiers the lower tier files are written next to the main file.
+        Returns a list of non-fatal errors.
+        """
+        errors = []
+        cache = TextureCache.from_settings(settings)
+        swaps = []
+        try:
+            if settings.texture_cache:
+                with profiler.stage("textures"):
+                    swaps = cache.apply(HyperfyExporter.get_materials(objects), settings.texture_quality)
+            with profiler.stage("gltf"):
+                HyperfyExporter.export_gltf(export_params)
+                if origin is not None and any(origin):
+                    HyperfyExporter.move_roots(export_params['filepath'], origin)
+                if tiers:
+                    tiers.copy_sources(export_params['filepath'])
+            if settings.mesh_optimize or settings.mesh_quantize != 'NONE':
+                with profiler.stage("meshes"):
+                    try:
+                        MeshOptimizer.optimize_file(export_params['filepath'], settings)
+                    except Exception as e:
+                        errors.append(f"Mesh optimization failed for '{os.path.basename(export_params['filepath'])}': {e}")
+            if settings.animation_optimize:
+                with profiler.stage("animations"):
+                    try:
+                        profiler.animations = AnimationOptimizer.optimize_file(export_params['filepath'], settings)
+                    except Exception as e:
+                        errors.append(f"Animation optimization failed for '{os.path.basename(export_params['filepath'])}': {e}")
+            if settings.texture_format == 'KTX2':
+                with profiler.stage("ktx2"):
+                    errors.extend(cache.add_ktx2(export_params['filepath'], settings))
+            if tiers:
+                with profiler.stage("tiers"):
+                    profiler.tiers, tier_errors = tiers.process(export_params['filepath'], settings, cache)
+                    errors.extend(tier_errors)
+        finally:
+            TextureCache.restore(swaps)
+            if cache:
+                cache.close()
+        return errors
+
+    @staticmethod
+    def describe_file(profiler, name, filepath, settings):
+        """Report entry for an exported GLB, packaged as a .hyp app if enabled
+
+        Stats are read from the GLB before it is replaced by the .hyp.
+        """
+        if settings.package_format != 'HYP':
+            return profiler.describe(name, filepath)
+        with profiler.stage("package"):
+            hyp_filepath = HypWriter.write_app(filepath, name)
+        entry = profiler.describe(name, filepath)
+        os.remove(filepath)
+        entry["file"] = hyp_filepath
+        entry["bytes"] = os.path.getsize(hyp_filepath)
+        return entry
+
+    @staticmethod
+    def get_export_all_filepath(directory=None):
+        """Blend filename with a .glb extension, next to the blend file unless a directory is given"""
+        blend_filepath = bpy.data.filepath
+        if not blend_filepath:
+            filename = "untitled.glb"
+        else:
+            # Use the blend filename but with .glb extension
+            filename = os.path.splitext(os.path.basename(blend_filepath))[0] + ".glb"
+        return os.path.join(directory or HyperfyExporter.get_base_directory(), filename)
+
+    @staticmethod
+    def run_steps(steps):
+        """Run a stepped export to the end and return its report"""
+        while True:
+            try:
+                progress = next(steps)
+            except StopIteration as e:
+                return e.value
+            # Interactive exports poll waiting steps from the modal timer instead
+            if progress and progress["waiting"]:
+                time.sleep(ParallelExporter.POLL_INTERVAL)
+
+    @staticmethod
+    def progress(report, done, total, label, objects, waiting=False):
+        """Progress of a stepped export, yielded before each unit of work (a root, stage or tile)
+
+        Waiting steps have no work to do yet (eg. background workers still running).
+        """
+        return {
+            "done": done,
+            "total": total,
+            "label": label,
+            "objects": objects,
+            "bytes": sum(entry.get("bytes", 0) for entry in report["exported"]),
+            "waiting": waiting,
+        }
+
+    @staticmethod
+    def export_all(context, filepath, settings):
+        """Export every visible object in the scene into a single GLB and return a report
+
+        With tiled exports enabled the tiles go to a <name>_tiles directory next to filepath.
+        """
+        return HyperfyExporter.run_steps(HyperfyExporter.iter_export_all(context, filepath, settings))
+
+    @staticmethod
+    def iter_export_all(context, filepath, settings):
+        """Stepped export_all, closing it between steps rolls back the temporary objects"""
+        if settings.tiled:
+            return (yield from HyperfyExporter.iter_export_tiles(context, os.path.splitext(filepath)[0] + "_tiles", settings))
+
+        report = HyperfyExporter.new_report(os.path.dirname(filepath))
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        profiler = ExportProfiler()
+
+        # Check budgets first, one blocked root blocks the whole file
+        roots = [obj for obj in HyperfyExporter.get_root_objects(context.scene) if obj.visible_get()]
+        if BudgetValidator.validate(context, settings, roots, report):
+            return report
+
+        # Process splatmap objects
+        splatmap_objects = SplatmapProcessor.find_splatmap_objects()
+        splatmap_states = []
+        collider_states = []
+        merge_state = None
+        tiers = ExportTiers.from_settings(settings)
+        datablocks = HyperfyExporter.snapshot_datablocks()
+        total = len(splatmap_objects) + (3 if settings.merge_meshes else 2)
+        done = 0
+
+        try:
+            # Process each splatmap object
+            for splatmap_obj in splatmap_objects:
+                yield HyperfyExporter.progress(report, done, total, f"Splatmap {splatmap_obj.name}", 0)
+                with profiler.stage("splatmap"):
+                    success, result = SplatmapProcessor.process_splatmap_object(splatmap_obj)
+                if not success:
+                    report["errors"].append(result)
+                    report["failed"].append({"name": name, "error": result})
+                    return report
+                splatmap_states.append(result)
+                done += 1
+
+            # Fit colliders
+            yield HyperfyExporter.progress(report, done, total, "Colliders", 0)
+            with profiler.stage("colliders"):
+                for collider_obj in ColliderFitter.find_collider_objects(context.scene):
+                    state = ColliderFitter.process_collider_object(collider_obj, settings)
+                    if state:
+                        collider_states.append(state)
+            done += 1
+
+            # Merge static meshes
+            if settings.merge_meshes:
+                yield HyperfyExporter.progress(report, done, total, "Merging meshes", 0)
+                with profiler.stage("merge"):
+                    merge_state = MeshMerger.process_objects(context, list(context.scene.objects), settings)
+                done += 1
+
+            # Perform the export of the entire scene
+            yield HyperfyExporter.progress(report, done, total, f"Writing {name}", 0)
+            export_params = HyperfyExporter.get_export_params(filepath, settings, False)
+            objects = [obj for obj in context.scene.objects if obj.visible_get()]
+            report["errors"].extend(HyperfyExporter.export_objects(objects, settings, export_params, profiler, tiers=tiers))
+
+        finally:
+            # Restore splatmap and collider objects
+            with profiler.stage("cleanup"):
+                if tiers:
+                    tiers.close()
+                if merge_state:
+                    MeshMerger.cleanup_objects(merge_state)
+                for state in collider_states:
+                    ColliderFitter.cleanup_collider_object(state)
+                for state in splatmap_states:
+                    SplatmapProcessor.cleanup_splatmap_object(state)
+                HyperfyExporter.purge_datablocks(datablocks)
+
+        report["exported"].append(HyperfyExporter.describe_file(profiler, name, filepath, settings))
+        ExportTiers.write_manifest(report["directory"], report, settings)
+        if settings.push:
+            yield HyperfyExporter.progress(report, total, total, "Pushing", len(objects))
+            HyperfyExporter.push_files(report, settings, [(name, report["exported"][0]["file"])] + ExportTiers.get_files(report["exported"]))
+        ExportProfiler.write(report)
+        yield HyperfyExporter.progress(report, total, total, "Finishing", len(objects))
+        return report
+
+    @staticmethod
+    def export_tiles(context, export_directory, settings):
+        """Export visible roots grouped into spatial cells, one GLB per cell, and write the tile index"""
+        return HyperfyExporter.run_steps(HyperfyExporter.iter_export_tiles(context, export_directory, settings))
+
+    @staticmethod
+    def iter_export_tiles(context, export_directory, settings):
+        """Stepped export_tiles, one tile per step"""
+        report = HyperfyExporter.new_report(export_directory)
+        os.makedirs(export_directory, exist_ok=True)
+        size = int(settings.tile_size)
+
+        # Blocked roots are left out of their tile
+        roots = [obj for obj in HyperfyExporter.get_root_objects(context.scene) if obj.visible_get()]
+        blocked = BudgetValidator.validate(context, settings, roots, report)
+        cells = SceneTiler.assign([obj for obj in roots if obj.name not in blocked], size)
+
+        original_selection = context.selected_objects.copy()
+        original_active = context.active_object
+        bpy.ops.object.select_all(action='DESELECT')
+
+        splatmap_states = []
+        collider_states = []
+        tiles = []
+        written = 0
+        total = len(cells) + 1
+        tiers = ExportTiers.from_settings(settings)
+        datablocks = HyperfyExporter.snapshot_datablocks()
+        try:
+            yield HyperfyExporter.progress(report, 0, total, "Splatmaps and colliders", written)
+            for splatmap_obj in SplatmapProcessor.find_splatmap_objects():
+                success, result = SplatmapProcessor.process_splatmap_object(splatmap_obj)
+                if not success:
+                    report["errors"].append(result)
+                    continue
+                splatmap_states.append(result)
+            for collider_obj in ColliderFitter.find_collider_objects(context.scene):
+                state = ColliderFitter.process_collider_object(collider_obj, settings)
+                if state:
+                    collider_states.append(state)
+
+            for index, (key, (cell_roots, low, high)) in enumerate(sorted(cells.items())):
+                name = "tile_" + "_".join(str(i) for i in key)
+                yield HyperfyExporter.progress(report, index + 1, total, name, written)
+                filepath = os.path.join(export_directory, f"{name}.glb")
+                profiler = ExportProfiler()
+                merge_state = None
+                objects = []
+                for root in cell_roots:
+                    objects.append(root)
+                    objects.extend(root.children_recursive)
+                # Fitted colliders share their collider's parent, so a root collider's aren't in any hierarchy
+                names = {obj.name for obj in objects}
+                for state in collider_states:
+                    if state["object"].name in names:
+                        objects.extend(replacement for replacement in state["replacements"] if replacement.name not in names)
+                try:
+                    if settings.merge_meshes:
+                        with profiler.stage("merge"):
+                            merge_state = MeshMerger.process_objects(context, objects, settings)
+                            objects.extend(merge_state["objects"])
+                    for obj in objects:
+                        obj.select_set(True)
+                    export_params = HyperfyExporter.get_export_params(filepath, settings, True)
+                    report["errors"].extend(HyperfyExporter.export_objects(objects, settings, export_params, profiler, tiers=tiers))
+                except Exception as e:
+                    report["failed"].append({"name": name, "error": str(e)})
+                    continue
+                finally:
+                    with profiler.stage("cleanup"):
+                        if merge_state:
+                            MeshMerger.cleanup_objects(merge_state)
+                        bpy.ops.object.select_all(action='DESELECT')
+                entry = HyperfyExporter.describe_file(profiler, name, filepath, settings)
+                report["exported"].append(entry)
+                written += len(objects)
+                tiles.append({
+                    "name": name,
+                    "file": os.path.basename(entry["file"]),
+                    "cell": list(key),
+                    "min": [round(float(v), 4) for v in low],
+                    "max": [round(float(v), 4) for v in high],
+                    "bytes": os.path.getsize(entry["file"]),
+                    "roots": [root.name for root in cell_roots],
+                })
+        finally:
+            if tiers:
+                tiers.close()
+            for state in collider_states:
+                ColliderFitter.cleanup_collider_object(state)
+            for state in splatmap_states:
+                SplatmapProcessor.cleanup_splatmap_object(state)
+            HyperfyExporter.purge_datablocks(datablocks)
+            for obj in original_selection:
+                obj.select_set(True)
+            if original_active:
+                context.view_layer.objects.active = original_active
+
+        SceneTiler.write_index(export_directory, size, tiles)
+        ExportTiers.write_manifest(export_directory, report, settings)
+        if settings.push:
+            yield HyperfyExporter.progress(report, total, total, "Pushing", written)
+            HyperfyExporter.push_files(report, settings, [(entry["name"], entry["file"]) for entry in report["exported"]] + ExportTiers.get_files(report["exported"]))
+        ExportProfiler.write(report)
+        yield HyperfyExporter.progress(report, total, total, "Finishing", written)
+        return report
+
+    @staticmethod
+    def export_root(context, obj, export_directory, tiers=None):
+        """Export a root object and its children to <export_directory>/<name>.glb
+
+        With glTF exporters that can export a collection (Blender 4.2+) the
+        hierarchy is linked into a temporary collection and the root's location
+        is taken off the written file, so selection, locations and hide state
+        are never touched. Older exporters fall back to moving the root to the
+        origin and exporting the selection, which expects nothing to be
+        selected and leaves nothing selected.
+        Returns the profiled report entry and a list of non-fatal errors.
+        """
+        settings = context.scene.hyperfy_export
+        if settings.avatar_mode and AvatarExporter.is_avatar(obj):
+            return AvatarExporter.export_root(context, obj, export_directory, settings)
+
+        errors = []
+        profiler = ExportProfiler()
+        isolated = HyperfyExporter.supports_collection_export()
+
+        if not isolated:
+            # Store the original location
+            original_location = obj.location.copy()
+
+            # Set object position to 0,0,0
+            obj.location = (0, 0, 0)
+
+            # Select the object and all its children
+            obj.select_set(True)
+            for child in obj.children_recursive:
+                child.select_set(True)
+
+            # Set as active object
+            context.view_layer.objects.active = obj
+
+        # Process splatmap objects in the hierarchy
+        splatmap_objects_in_selection = SplatmapProcessor.find_splatmap_objects_in(obj)
+        splatmap_states = []
+        collider_states = []
+        merge_state = None
+        collection = None
+
+        try:
+            # Process splatmap objects
+            with profiler.stage("splatmap"):
+                for splatmap_obj in splatmap_objects_in_selection:
+                    success, result = SplatmapProcessor.process_splatmap_object(splatmap_obj)
+                    if not success:
+                        errors.append(result)
+                        continue
+                    splatmap_states.append(result)
+
+            # Fit colliders, world matrices have to be current after moving the root
+            with profiler.stage("colliders"):
+                if not isolated:
+                    context.view_layer.update()
+                for collider_obj in ColliderFitter.find_collider_objects_in(obj):
+                    state = ColliderFitter.process_collider_object(collider_obj, settings, hide=not isolated)
+                    if state:
+                        collider_states.append(state)
+
+            # Merge static meshes
+            if settings.merge_meshes:
+                with profiler.stage("merge"):
+                    merge_state = MeshMerger.process_objects(context, [obj] + list(obj.children_recursive), settings, hide=not isolated)
+
+            # Define export path
+            filepath = os.path.join(export_directory, f"{obj.name}.glb")
+
+            if isolated:
+                # Export the hierarchy from a temporary collection, leaving out replaced objects
+                # Replacements and merged objects are linked whatever their parent, children_recursive may not list them yet
+                replaced = {state["object"] for state in collider_states}
+                objects = [obj] + list(obj.children_recursive)
+                objects.extend(o for state in collider_states for o in state["replacements"])
+                if merge_state:
+                    replaced.update(merge_state["replaced"])
+                    objects.extend(merge_state["objects"])
+                collection = bpy.data.collections.new(f"{obj.name}_export")
+                context.scene.collection.children.link(collection)
+                linked = set()
+                for o in objects:
+                    if o not in replaced and o.name not in linked:
+                        collection.objects.link(o)
+                        linked.add(o.name)
+                export_params = HyperfyExporter.get_export_params(filepath, settings, False, collection.name)
+                errors.extend(HyperfyExporter.export_objects(objects, settings, export_params, profiler, origin=obj.location, tiers=tiers))
+            else:
+                # Export only selected objects
+                export_params = HyperfyExporter.get_export_params(filepath, settings, True)
+                errors.extend(HyperfyExporter.export_objects(context.selected_objects, settings, export_params, profiler, tiers=tiers))
+
+        finally:
+            with profiler.stage("cleanup"):
+                if collection:
+                    bpy.data.collections.remove(collection)
+
+                # Restore merged, splatmap and collider objects
+                if merge_state:
+                    MeshMerger.cleanup_objects(merge_state)
+                for state in collider_states:
+                    ColliderFitter.cleanup_collider_object(state)
+                for state in splatmap_states:
+                    SplatmapProcessor.cleanup_splatmap_object(state)
+
+                if not isolated:
+                    # Move object back to original position
+                    obj.location = original_location
+
+                    # Deselect all objects for the next root
+                    bpy.ops.object.select_all(action='DESELECT')
+
+        return HyperfyExporter.describe_file(profiler, obj.name, filepath, settings), errors
+
+    @staticmethod
+    def export_individual(context, export_directory, root_names=None):
+        """Export each visible root object to its own GLB and return a report
+
+        If root_names is given only those roots are exported (used by background workers).
+        """
+        return HyperfyExporter.run_steps(HyperfyExporter.iter_export_individual(context, export_directory, root_names))
+
+    @staticmethod
+    def iter_export_individual(context, export_directory, root_names=None):
+        """Stepped export_individual, one root per step"""
+        report = HyperfyExporter.new_report(export_directory)
+
+        # Create the directory if it doesn't exist
+        if not os.path.exists(export_directory):
+            os.makedirs(export_directory)
+
+        # Store original selection, only the selection export path changes it
+        isolated = HyperfyExporter.supports_collection_export()
+        if not isolated:
+            original_selection = context.selected_objects.copy()
+            original_active = context.active_object
+
+            # Deselect all objects
+            bpy.ops.object.select_all(action='DESELECT')
+
+        roots = HyperfyExporter.get_root_objects(context.scene, root_names)
+        written = 0
+        # Decoded images are shared by the tiers of every root
+        tiers = ExportTiers.from_settings(context.scene.hyperfy_export)
+        datablocks = HyperfyExporter.snapshot_datablocks()
+        try:
+            for index, obj in enumerate(roots):
+                # Skip if the root object is hidden in viewport
+                if obj.hide_get():
+                    report["skipped"].append(obj.name)
+                    continue
+
+                yield HyperfyExporter.progress(report, index, len(roots), obj.name, written)
+                try:
+                    entry, errors = HyperfyExporter.export_root(context, obj, export_directory, tiers)
+                    report["exported"].append(entry)
+                    report["errors"].extend(errors)
+                    written += 1 + len(obj.children_recursive)
+                except Exception as e:
+                    report["failed"].append({"name": obj.name, "error": str(e)})
+        finally:
+            if tiers:
+                tiers.close()
+            HyperfyExporter.purge_datablocks(datablocks)
+
+            if not isolated:
+                # Restore original selection
+                for obj in original_selection:
+                    obj.select_set(True)
+                if original_active:
+                    context.view_layer.objects.active = original_active
+
+        yield HyperfyExporter.progress(report, len(roots), len(roots), "Finishing", written)
+        return report
+
+    @staticmethod
+    def run_individual(context, export_directory, settings):
+        """Export root objects individually using the scene's export settings and write the report
+
+        With incremental exports enabled, roots whose fingerprint matches the
+        manifest in the export directory are not exported again.
+        """
+        return HyperfyExporter.run_steps(HyperfyExporter.iter_run_individual(context, export_directory, settings))
+
+    @staticmethod
+    def iter_run_individual(context, export_directory, settings):
+        """Stepped run_individual, the manifest and report are only written when it runs to the end"""
+        root_names = None
+        fingerprints = {}
+        manifest = None
+        if settings.incremental:
+            manifest = ExportCache.load_manifest(export_directory)
+            root_names, fingerprints, unchanged = ExportCache.find_changed(context.scene, manifest, export_directory, settings)
+
+        # Check budgets of the roots about to be exported, avatars are reduced to their own limits instead
+        budget_report = HyperfyExporter.new_report(export_directory)
+        roots = [obj for obj in HyperfyExporter.get_root_objects(context.scene, root_names) if obj.visible_get()]
+        if settings.avatar_mode:
+            roots = [obj for obj in roots if not AvatarExporter.is_avatar(obj)]
+        blocked = BudgetValidator.validate(context, settings, roots, budget_report)
+        if blocked:
+            root_names = [obj.name for obj in HyperfyExporter.get_root_objects(context.scene, root_names) if obj.name not in blocked]
+
+        if settings.parallel and ParallelExporter.is_available():
+            report = yield from ParallelExporter.iter_export_individual(context, export_directory, settings.parallel_workers, root_names)
+        else:
+            report = yield from HyperfyExporter.iter_export_individual(context, export_directory, root_names)
+        report["failed"].extend(budget_report["failed"])
+        report["warnings"].extend(budget_report["warnings"])
+
+        ExportTiers.write_manifest(export_directory, report, settings)
+        if settings.push:
+            files = [(entry["name"], entry["file"]) for entry in report["exported"]] + ExportTiers.get_files(report["exported"])
+            if manifest is not None:
+                files += [(name, os.path.join(export_directory, manifest["roots"][name]["file"])) for name in unchanged]
+            HyperfyExporter.push_files(report, settings, files)
+
+        if manifest is not None:
+            report["unchanged"] = unchanged
+            for exported in report["exported"]:
+                manifest["roots"][exported["name"]] = {
+                    "fingerprint": fingerprints[exported["name"]],
+                    "file": os.path.basename(exported["file"]),
+                }
+            for failure in report["failed"]:
+                manifest["roots"].pop(failure["name"], None)
+            ExportCache.save_manifest(export_directory, manifest)
+
+        HyperfyExporter.write_report(export_directory, report)
+        ExportProfiler.write(report)
+        return report
+
+    @staticmethod
+    def push_files(report, settings, files):
+        """Upload (root name, filepath) pairs to the world server and record the results in report"""
+        try:
+            uploader = AssetUploader(settings.push_url, settings.push_workers)
+            assets = AssetUploader.collect(files)
+        except (OSError, ValueError) as e:
+            report["failed"].append({"name": "push", "error": f"Push failed: {e}"})
+            return
+        uploaded, existing, failed = uploader.push(assets)
+        report["uploaded"].extend(uploaded)
+        report["existing"].extend(existing)
+        for name, error in failed:
+            report["failed"].append({"name": name, "error": error})
+
+    @staticmethod
+    def write_report(export_directory, report):
+        """Write a machine readable report next to the exported files"""
+        filepath = os.path.join(export_directory, HyperfyExporter.REPORT_FILENAME)
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+        return filepath
+
+class BudgetValidator:
+    """Checks root objects against the performance budgets in the export settings
+
+    Mesh statistics are read with foreach_get into numpy arrays so large scenes
+    are measured without per-vertex Python loops. Texture memory is estimated the
+    same way as the client (width x height x 4 per unique image).
+    """
+
+    # Results of the last check, shown in the panel
+    last_results = None
+
+    @staticmethod
+    def get_mesh_stats(mesh):
+        """(triangles, materials used) of a mesh"""
+        count = len(mesh.polygons)
+        if not count:
+            return 0, 0
+        loop_totals = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        material_indices = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        return int(loop_totals.sum()) - 2 * count, len(np.unique(material_indices))
+
+    @staticmethod
+    def get_texture_bytes(materials):
+        images = {}
+        for node_tree in TextureCache.get_node_trees(materials):
+            for node in node_tree.nodes:
+                image = getattr(node, "image", None) if node.type == 'TEX_IMAGE' else None
+                if image:
+                    images[image.as_pointer()] = image
+        return sum(image.size[0] * image.size[1] * 4 for image in images.values())
+
+    @staticmethod
+    def measure(root, depsgraph, mesh_cache):
+        """Triangles, draw calls, texture bytes and deforming bones of a root object's hierarchy"""
+        triangles = 0
+        draw_calls = 0
+        bones = 0
+        instanced = set()
+        objects = [root] + list(root.children_recursive)
+        for obj in objects:
+            if not obj.visible_get():
+                continue
+            if obj.type == 'MESH':
+                # Meshes without modifiers are shared by linked duplicates, which the client draws instanced
+                if obj.modifiers:
+                    stats = BudgetValidator.get_mesh_stats(obj.evaluated_get(depsgraph).data)
+                else:
+                    key = obj.data.as_pointer()
+                    if key not in mesh_cache:
+                        mesh_cache[key] = BudgetValidator.get_mesh_stats(obj.data)
+                    stats = mesh_cache[key]
+                triangles += stats[0]
+                if obj.modifiers or key not in instanced:
+                    draw_calls += max(1, min(stats[1], len(obj.material_slots)))
+                if not obj.modifiers:
+                    instanced.add(key)
+            elif obj.type == 'ARMATURE':
+                deform = np.empty(len(obj.data.bones), dtype=bool)
+                obj.data.bones.foreach_get("use_deform", deform)
+                bones += int(deform.sum())
+        return {
+            "name": root.name,
+            "triangles": triangles,
+            "draw_calls": draw_calls,
+            "texture_bytes": BudgetValidator.get_texture_bytes(HyperfyExporter.get_materials(objects)),
+            "bones": bones,
+        }
+
+    @staticmethod
+    def check(context, settings, roots):
+        """Measure roots and return their results, each with a list of exceeded budgets"""
+        depsgraph = context.evaluated_depsgraph_get()
+        mesh_cache = {}
+        budgets = (
+            ("triangles", settings.budget_triangles, "triangles"),
+            ("draw_calls", settings.budget_draw_calls, "draw calls"),
+            ("texture_bytes", settings.budget_texture_mb * 1024 * 1024, "texture memory"),
+            ("bones", settings.budget_bones, "bones"),
+        )
+        results = []
+        for root in roots:
+            result = BudgetValidator.measure(root, depsgraph, mesh_cache)
+            result["over"] = []
+            for key, budget, label in budgets:
+                if result[key] > budget:
+                    if key == "texture_bytes":
+                        value, limit = ExportProfiler.format_bytes(result[key]), ExportProfiler.format_bytes(budget)
+                    else:
+                        value, limit = f"{result[key]:,}", f"{budget:,}"
+                    result["over"].append(f"{label} {value} > {limit}")
+            results.append(result)
+        BudgetValidator.last_results = results
+        return results
+
+    @staticmethod
+    def validate(context, settings, roots, report):
+        """Check roots before an export, returns the names of roots that are blocked
+
+        Over budget roots are added to the report's warnings, or to failed when
+        budgets are set to block.
+        """
+        if settings.budget_mode == 'OFF':
+            return set()
+        blocked = set()
+        for result in BudgetValidator.check(context, settings, roots):
+            if not result["over"]:
+                continue
+            message = f"'{result['name']}' is over budget: {', '.join(result['over'])}"
+            if settings.budget_mode == 'BLOCK':
+                blocked.add(result["name"])
+                report["failed"].append({"name": result["name"], "error": message})
+            else:
+                report["warnings"].append(message)
+        return blocked
+
+class ParallelExporter:
+    """Helper class to export root objects in a pool of background Blender processes
+
+    The current scene is saved to a temporary snapshot which every worker opens,
+    so unsaved changes are exported too. Each worker exports its shard of root
+    objects with HyperfyExporter.export_individual and writes a partial report
+    which is merged back into a single report.
+    """
+
+    WORKER_FLAG = "--hyperfy-worker"
+    # Add-on the worker enables before exporting
+    ADDON_FLAG = "--hyperfy-addon"
+    POLL_INTERVAL = 0.05
+
+    @staticmethod
+    def is_available():
+        """Workers need a Blender executable (not available when running as the bpy module)"""
+        return bool(bpy.app.binary_path) and os.path.exists(bpy.app.binary_path)
+
+    @staticmethod
+    def get_worker_command(filepath, *args):
+        """Background Blender command that opens filepath and runs this file with args
+
+        Workers start with the artist's preferences rather than --factory-startup,
+        so the VRM add-on is found where this session found it, and they enable
+        it themselves in case it isn't enabled in the saved preferences.
+        """
+        command = [
+            bpy.app.binary_path,
+            "--background",
+            filepath,
+            "--python-exit-code", "1",
+            "--python", os.path.abspath(__file__),
+            "--",
+            *args,
+        ]
+        addon = AvatarExporter.get_addon_module() if bpy.context.scene.hyperfy_export.avatar_mode else None
+        if addon:
+            command.extend([ParallelExporter.ADDON_FLAG, addon])
+        return command
+
+    @staticmethod
+    def enable_addon(name):
+        """Enable an add-on inside a worker, unless the preferences already did"""
+        if name not in bpy.context.preferences.addons:
+            addon_utils.enable(name, default_set=True)
+
+    @staticmethod
+    def estimate_cost(obj):
+        """Polygon count of the whole hierarchy is a good enough proxy for export time"""
+        cost = 1
+        for o in [obj] + list(obj.children_recursive):
+            if o.type == 'MESH':
+                cost += len(o.data.polygons)
+        return cost
+
+    @staticmethod
+    def split_shards(root_objects, count):
+        """Split roots into balanced shards, largest first onto the least loaded shard"""
+        shards = [[] for _ in range(count)]
+        loads = [0] * count
+        costs = sorted(((ParallelExporter.estimate_cost(obj), obj.name) for obj in root_objects), reverse=True)
+        for cost, name in costs:
+            index = loads.index(min(loads))
+            shards[index].append(name)
+            loads[index] += cost
+        return [shard for shard in shards if shard]
+
+    @staticmethod
+    def export_individual(context, export_directory, workers=0, root_names=None):
+        """Export visible root objects across worker processes and return a merged report"""
+        return HyperfyExporter.run_steps(ParallelExporter.iter_export_individual(context, export_directory, workers, root_names))
+
+    @staticmethod
+    def iter_export_individual(context, export_directory, workers=0, root_names=None):
+        """Stepped export_individual, yields while waiting on workers and kills them when closed early"""
+        report = HyperfyExporter.new_report(export_directory)
+
+        if not os.path.exists(export_directory):
+            os.makedirs(export_directory)
+
+        root_objects = []
+        for obj in HyperfyExporter.get_root_objects(context.scene, root_names):
+            if obj.hide_get():
+                report["skipped"].append(obj.name)
+            else:
+                root_objects.append(obj)
+
+        if not root_objects:
+            return report
+
+        count = min(workers or os.cpu_count() or 1, len(root_objects))
+        shards = ParallelExporter.split_shards(root_objects, count)
+
+        work_directory = tempfile.mkdtemp(prefix="hyperfy_export_")
+        processes = []
+        try:
+            # Workers open a copy of the current state, the open file is left untouched
+            snapshot = os.path.join(work_directory, "snapshot.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True, compress=False, relative_remap=True)
+
+            for index, shard in enumerate(shards):
+                spec_path = os.path.join(work_directory, f"shard_{index}.json")
+                report_path = os.path.join(work_directory, f"shard_{index}.report.json")
+                log_path = os.path.join(work_directory, f"shard_{index}.log")
+                with open(spec_path, "w") as f:
+                    json.dump({"directory": export_directory, "roots": shard, "report": report_path}, f)
+                command = ParallelExporter.get_worker_command(snapshot, ParallelExporter.WORKER_FLAG, spec_path)
+                log = open(log_path, "w")
+                process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+                processes.append((process, log, shard, report_path, log_path))
+
+            # Wait for every worker and merge their reports
+            written = 0
+            pending = list(processes)
+            while pending:
+                finished = [job for job in pending if job[0].poll() is not None]
+                if not finished:
+                    yield HyperfyExporter.progress(report, len(processes) - len(pending), len(processes), f"{len(pending)} workers", written, waiting=True)
+                    continue
+                for job in finished:
+                    pending.remove(job)
+                    process, log, shard, report_path, log_path = job
+                    log.close()
+                    ParallelExporter.merge_report(report, process, shard, report_path, log_path)
+                    written += sum(1 + len(bpy.data.objects[name].children_recursive) for name in shard if name in bpy.data.objects)
+        finally:
+            # Workers still running were cancelled
+            for process, log, shard, report_path, log_path in processes:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                log.close()
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+        yield HyperfyExporter.progress(report, len(processes), len(processes), "Finishing", written)
+        return report
+
+    @staticmethod
+    def merge_report(report, process, shard, report_path, log_path):
+        """Merge the partial report of a finished worker"""
+        if os.path.exists(report_path):
+            with open(report_path) as f:
+                shard_report = json.load(f)
+            for key in ("exported", "failed", "skipped", "errors"):
+                report[key].extend(shard_report[key])
+        else:
+            # The worker died before writing its report, so the whole shard failed
+            error = f"Worker exited with code {process.returncode}: {ParallelExporter.read_log_tail(log_path)}"
+            for name in shard:
+                report["failed"].append({"name": name, "error": error})
+
+    @staticmethod
+    def read_log_tail(log_path, lines=5):
+        """Last few lines of a worker log, to explain why it failed"""
+        try:
+            with open(log_path) as f:
+                return " | ".join(line.strip() for line in f.readlines()[-lines:])
+        except OSError:
+            return ""
+
+    @staticmethod
+    def run_worker(spec_path):
+        """Entry point inside a background worker, returns the process exit code"""
+        with open(spec_path) as f:
+            spec = json.load(f)
+        report = HyperfyExporter.export_individual(bpy.context, spec["directory"], spec["roots"])
+        with open(spec["report"], "w") as f:
+            json.dump(report, f)
+        return 1 if report["failed"] else 0
+
+class WatchExporter:
+    """Helper class to re-export changed root objects in the background after each save
+
+    Saves arm a debounced timer, so a burst of saves only exports once. When it
+    fires, the saved file is opened by a background Blender process which runs
+    an incremental individual export, so fingerprinting roots against the
+    manifest of the watch directory happens there too. The timer polls the
+    process so the artist's session never waits on an export; saves made while
+    one is running are picked up as soon as it finishes.
+    """
+
+    WORKER_FLAG = "--hyperfy-watch"
+    POLL_INTERVAL = 0.5
+
+    # When the pending export should start (time.monotonic), None when nothing is pending
+    due = None
+    # The running export, None when idle
+    job = None
+    # Result of the last watch export, shown in the panel
+    status = ""
+
+    @staticmethod
+    def get_directory(settings):
+        """Directory watch exports are written to"""
+        if settings.watch_directory:
+            return bpy.path.abspath(settings.watch_directory)
+        return HyperfyExporter.get_export_directory()
+
+    @staticmethod
+    def schedule(delay):
+        """Start an export after delay seconds without further saves"""
+        WatchExporter.due = time.monotonic() + delay
+        if not bpy.app.timers.is_registered(WatchExporter.tick):
+            bpy.app.timers.register(WatchExporter.tick, first_interval=delay, persistent=True)
+
+    @staticmethod
+    def cancel():
+        """Drop any pending export, a running one is left to finish"""
+        WatchExporter.due = None
+
+    @staticmethod
+    def tick():
+        """Timer callback, returns the seconds until it should run again or None to stop"""
+        if WatchExporter.job is not None:
+            if WatchExporter.job["process"].poll() is None:
+                return WatchExporter.POLL_INTERVAL
+            WatchExporter.finish()
+
+        if WatchExporter.due is None:
+            return None
+        remaining = WatchExporter.due - time.monotonic()
+        if remaining > 0:
+            return remaining
+        WatchExporter.due = None
+
+        try:
+            WatchExporter.start(bpy.context.scene)
+        except Exception as e:
+            WatchExporter.set_status(f"Watch export failed: {e}")
+        return WatchExporter.POLL_INTERVAL if WatchExporter.job is not None else None
+
+    @staticmethod
+    def start(scene):
+        """Launch a background export of the saved file, which skips roots unchanged since the last one
+
+        Only saves schedule an export, so the file on disk is what the artist
+        saved and the worker can open it without writing a snapshot here.
+        """
+        settings = scene.hyperfy_export
+        if not settings.watch or not bpy.data.filepath:
+            return
+        if not ParallelExporter.is_available():
+            WatchExporter.set_status("Watch export needs a Blender executable")
+            return
+
+        export_directory = WatchExporter.get_directory(settings)
+        os.makedirs(export_directory, exist_ok=True)
+        work_directory = tempfile.mkdtemp(prefix="hyperfy_watch_")
+        log_path = os.path.join(work_directory, "watch.log")
+        command = ParallelExporter.get_worker_command(bpy.data.filepath, WatchExporter.WORKER_FLAG, export_directory)
+        log = open(log_path, "w")
+        WatchExporter.job = {
+            "process": subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT),
+            "log": log,
+            "log_path": log_path,
+            "work_directory": work_directory,
+            "export_directory": export_directory,
+            "started": time.time(),
+        }
+        WatchExporter.set_status("Exporting changed roots...")
+
+    @staticmethod
+    def finish():
+        """Collect the result of the finished export"""
+        job = WatchExporter.job
+        WatchExporter.job = None
+        job["log"].close()
+
+        # The worker writes the usual report, anything older is from a previous export
+        report = None
+        report_path = os.path.join(job["export_directory"], HyperfyExporter.REPORT_FILENAME)
+        try:
+            if os.path.getmtime(report_path) >= job["started"]:
+                with open(report_path) as f:
+                    report = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if report is None:
+            tail = ParallelExporter.read_log_tail(job["log_path"])
+            WatchExporter.set_status(f"Watch export exited with code {job['process'].returncode}: {tail}")
+        elif not report["exported"] and not report["failed"]:
+            WatchExporter.set_status(f"No changes ({time.strftime('%H:%M:%S')})")
+        else:
+            status = f"Exported {len(report['exported'])} to {job['export_directory']} ({time.strftime('%H:%M:%S')})"
+            if report["failed"]:
+                status += f", {len(report['failed'])} failed"
+            WatchExporter.set_status(status)
+        shutil.rmtree(job["work_directory"], ignore_errors=True)
+
+    @staticmethod
+    def set_status(status):
+        WatchExporter.status = status
+        tag_redraw(bpy.context, bpy.context.window_manager)
+
+    @staticmethod
+    def run_worker(export_directory):
+        """Entry point inside the background process, returns the process exit code"""
+        settings = bpy.context.scene.hyperfy_export
+        # Only roots that changed since the last export, in this process
+        settings.incremental = True
+        settings.parallel = False
+        report = HyperfyExporter.run_individual(bpy.context, export_directory, settings)
+        return 1 if report["failed"] else 0
+
+class ExportCache:
+    """Helper class to fingerprint root objects so unchanged ones can skip re-exporting
+
+    The fingerprint covers everything that ends up in the exported GLB: mesh
+    attributes, transforms of the hierarchy, modifiers, materials and their
+    images, custom properties (node, type, convex, maxDistance, exp_splatmap...),
+    animation and the export settings themselves. Objects referenced by
+    modifiers (eg. booleans) are only tracked by name.
+    """
+
+    MANIFEST_FILENAME = "export_manifest.json"
+    MANIFEST_VERSION = 1
+
+    # Settings that change how we export but not what gets written
+    UNTRACKED_SETTINGS = {
+        "parallel", "parallel_workers", "incremental",
+        "texture_cache", "texture_cache_directory", "texture_cache_size", "toktx_path",
+        "budget_mode", "budget_triangles", "budget_draw_calls", "budget_texture_mb", "budget_bones",
+        "push", "push_url", "push_workers",
+        "watch", "watch_directory", "watch_delay",
+    }
+
+    # Node editor state that never reaches the exported file, only skipped on shader nodes
+    # since modifiers and object data use the same names (eg. bevel width, light color) for real inputs
+    UI_PROPERTIES = {
+        "select", "location", "width", "height", "dimensions", "hide", "is_active",
+        "show_expanded", "show_options", "show_preview", "show_texture", "use_custom_color", "color",
+    }
+    MODIFIER_UI_PROPERTIES = {"show_expanded", "is_active"}
+
+    # foreach_get attribute and component count for each attribute data type
+    ATTRIBUTE_LAYOUTS = {
+        'FLOAT': ('value', 1, 'f'),
+        'INT': ('value', 1, None),
+        'INT8': ('value', 1, None),
+        'BOOLEAN': ('value', 1, None),
+        'FLOAT2': ('vector', 2, 'f'),
+        'INT32_2D': ('value', 2, None),
+        'FLOAT_VECTOR': ('vector', 3, 'f'),
+        'FLOAT_COLOR': ('color', 4, 'f'),
+        'BYTE_COLOR': ('color', 4, 'f'),
+        'QUATERNION': ('value', 4, 'f'),
+        'FLOAT4X4': ('value', 16, 'f'),
+    }
+
+    @staticmethod
+    def load_manifest(export_directory):
+        """Load the manifest of the previous export, or an empty one"""
+        filepath = os.path.join(export_directory, ExportCache.MANIFEST_FILENAME)
+        try:
+            with open(filepath) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == ExportCache.MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": ExportCache.MANIFEST_VERSION, "roots": {}}
+
+    @staticmethod
+    def save_manifest(export_directory, manifest):
+        filepath = os.path.join(export_directory, ExportCache.MANIFEST_FILENAME)
+        with open(filepath, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def find_changed(scene, manifest, export_directory, settings):
+        """Compare root fingerprints against the manifest
+
+        Returns the names of roots that need exporting (hidden roots are passed
+        through so they are still reported as skipped), their fingerprints and
+        the names of unchanged roots.
+        """
+        signature = ExportCache.settings_signature(settings)
+        changed = []
+        fingerprints = {}
+        unchanged = []
+        for obj in HyperfyExporter.get_root_objects(scene):
+            if obj.hide_get():
+                changed.append(obj.name)
+                continue
+            fingerprint = ExportCache.fingerprint(obj, signature)
+            fingerprints[obj.name] = fingerprint
+            entry = manifest["roots"].get(obj.name)
+            if entry and entry["fingerprint"] == fingerprint and os.path.exists(os.path.join(export_directory, entry["file"])):
+                unchanged.append(obj.name)
+            else:
+                changed.append(obj.name)
+        return changed, fingerprints, unchanged
+
+    @staticmethod
+    def settings_signature(settings):
+        """Hash of the export settings that affect the exported files"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(repr(bl_info["version"]).encode())
+        ExportCache.hash_rna(hasher, settings, skip=ExportCache.UNTRACKED_SETTINGS)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def fingerprint(root, signature=""):
+        """Content fingerprint of a root object and everything below it"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(signature.encode())
+        seen_data = set()
+        for obj in [root] + sorted(root.children_recursive, key=lambda o: o.name):
+            hasher.update(f"object:{obj.name}:{obj.type}:{obj.parent.name if obj.parent else ''}:{obj.visible_get()}".encode())
+
+            # The root is exported at the origin so only its rotation and scale matter
+            matrix = obj.matrix_basis.copy() if obj is root else obj.matrix_local.copy()
+            if obj is root:
+                matrix.translation = (0, 0, 0)
+            hasher.update(repr(ExportCache.plain(matrix)).encode())
+
+            ExportCache.hash_custom_properties(hasher, obj)
+
+            for modifier in obj.modifiers:
+                hasher.update(f"modifier:{modifier.type}".encode())
+                ExportCache.hash_rna(hasher, modifier, skip=ExportCache.MODIFIER_UI_PROPERTIES)
+                # Geometry nodes inputs are stored as ID properties
+                ExportCache.hash_custom_properties(hasher, modifier)
+
+            for slot in obj.material_slots:
+                hasher.update(f"slot:{slot.link}".encode())
+                if slot.material:
+                    ExportCache.hash_material(hasher, slot.material)
+
+            if obj.animation_data:
+                ExportCache.hash_animation(hasher, obj.animation_data)
+
+            # Shared data only needs hashing once
+            data = obj.data
+            if data is None or data.name in seen_data:
+                continue
+            seen_data.add(data.name)
+            hasher.update(f"data:{data.name}".encode())
+            if obj.type == 'MESH':
+                ExportCache.hash_mesh(hasher, data)
+            elif obj.type == 'ARMATURE':
+                for bone in data.bones:
+                    hasher.update(f"bone:{bone.name}:{bone.parent.name if bone.parent else ''}:{bone.use_deform}".encode())
+                    hasher.update(repr(ExportCache.plain(bone.matrix_local)).encode())
+            else:
+                ExportCache.hash_rna(hasher, data)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def hash_custom_properties(hasher, id_data):
+        for key in sorted(id_data.keys()):
+            value = id_data[key]
+            if hasattr(value, "to_dict"):
+                value = value.to_dict()
+            elif hasattr(value, "to_list"):
+                value = value.to_list()
+            hasher.update(f"prop:{key}={value!r}".encode())
+
+    @staticmethod
+    def hash_mesh(hasher, mesh):
+        """Hash topology and every attribute layer using bulk reads"""
+        ExportCache.hash_foreach(hasher, mesh.polygons, "loop_total", len(mesh.polygons), None)
+        ExportCache.hash_foreach(hasher, mesh.loops, "vertex_index", len(mesh.loops), None)
+        for attribute in sorted(mesh.attributes, key=lambda a: a.name):
+            # Internal attributes (selection, hide state...) start with a dot
+            if attribute.name.startswith("."):
+                continue
+            layout = ExportCache.ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+            hasher.update(f"attribute:{attribute.name}:{attribute.domain}:{attribute.data_type}".encode())
+            if layout is None:
+                continue
+            key, components, typecode = layout
+            ExportCache.hash_foreach(hasher, attribute.data, key, len(attribute.data) * components, typecode)
+        if mesh.has_custom_normals:
+            ExportCache.hash_foreach(hasher, mesh.loops, "normal", len(mesh.loops) * 3, 'f')
+        if mesh.shape_keys:
+            for key_block in mesh.shape_keys.key_blocks:
+                hasher.update(f"shape_key:{key_block.name}:{key_block.value}".encode())
+                ExportCache.hash_foreach(hasher, key_block.data, "co", len(key_block.data) * 3, 'f')
+        hasher.update(repr([material.name if material else None for material in mesh.materials]).encode())
+
+    @staticmethod
+    def hash_foreach(hasher, collection, key, count, typecode):
+        """Bulk read a property of a collection into the hash
+
+        Float data goes through a typed buffer, everything else through a list
+        since foreach_get is strict about buffer types for ints and booleans.
+        """
+        if count == 0:
+            return
+        if typecode == 'f':
+            values = array('f', [0.0]) * count
+            collection.foreach_get(key, values)
+            hasher.update(values.tobytes())
+        else:
+            values = [0] * count
+            collection.foreach_get(key, values)
+            hasher.update(repr(values).encode())
+
+    @staticmethod
+    def hash_material(hasher, material):
+        hasher.update(f"material:{material.name}".encode())
+        ExportCache.hash_custom_properties(hasher, material)
+        ExportCache.hash_rna(hasher, material)
+        if material.use_nodes and material.node_tree:
+            ExportCache.hash_node_tree(hasher, material.node_tree, set())
+
+    @staticmethod
+    def hash_node_tree(hasher, node_tree, seen_groups):
+        for node in node_tree.nodes:
+            hasher.update(f"node:{node.bl_idname}:{node.name}:{node.label}".encode())
+            ExportCache.hash_rna(hasher, node, skip=ExportCache.UI_PROPERTIES)
+            for socket in list(node.inputs) + list(node.outputs):
+                if hasattr(socket, "default_value") and not socket.is_linked:
+                    value = ExportCache.plain(socket.default_value)
+                    hasher.update(f"socket:{socket.identifier}={value!r}".encode())
+            image = getattr(node, "image", None)
+            if image:
+                hasher.update(ExportCache.image_fingerprint(image).encode())
+            group = getattr(node, "node_tree", None)
+            if group and group.name not in seen_groups:
+                seen_groups.add(group.name)
+                ExportCache.hash_node_tree(hasher, group, seen_groups)
+        for link in node_tree.links:
+            hasher.update(f"link:{link.from_node.name}:{link.from_socket.identifier}>{link.to_node.name}:{link.to_socket.identifier}".encode())
+
+    @staticmethod
+    def image_fingerprint(image):
+        """Cheap fingerprint of an image, files are tracked by size and modification time"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"image:{image.name}:{image.source}:{image.filepath}:{tuple(image.size)}:{image.colorspace_settings.name}:{image.alpha_mode}".encode())
+        if image.is_dirty or image.source == 'GENERATED':
+            pixels = array('f', [0.0]) * len(image.pixels)
+            image.pixels.foreach_get(pixels)
+            hasher.update(pixels.tobytes())
+        elif image.packed_file:
+            hasher.update(f"packed:{image.packed_file.size}".encode())
+            hasher.update(image.packed_file.data)
+        else:
+            try:
+                stat = os.stat(bpy.path.abspath(image.filepath, library=image.library))
+                hasher.update(f"file:{stat.st_size}:{stat.st_mtime_ns}".encode())
+            except OSError:
+                hasher.update(b"missing")
+        return hasher.hexdigest()
+
+    @staticmethod
+    def hash_animation(hasher, animation_data):
+        actions = []
+        if animation_data.action:
+            actions.append(animation_data.action)
+        for track in animation_data.nla_tracks:
+            hasher.update(f"nla:{track.name}:{track.mute}".encode())
+            for strip in track.strips:
+                if strip.action:
+                    actions.append(strip.action)
+        for action in actions:
+            hasher.update(f"action:{action.name}".encode())
+            for fcurve in action.fcurves:
+                hasher.update(f"fcurve:{fcurve.data_path}:{fcurve.array_index}".encode())
+                ExportCache.hash_foreach(hasher, fcurve.keyframe_points, "co", len(fcurve.keyframe_points) * 2, 'f')
+
+    @staticmethod
+    def hash_rna(hasher, rna, skip=()):
+        """Hash the simple (non pointer, non collection) RNA properties of a struct"""
+        for prop in rna.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier == "rna_type" or identifier in skip or prop.type == 'COLLECTION':
+                continue
+            try:
+                value = getattr(rna, identifier)
+            except AttributeError:
+                continue
+            if prop.type == 'POINTER':
+                # Only track referenced datablocks by name
+                value = getattr(value, "name", None)
+            else:
+                value = ExportCache.plain(value)
+            hasher.update(f"{identifier}={value!r}".encode())
+
+    @staticmethod
+    def plain(value):
+        """Convert vectors, colors, property arrays and enum flags into tuples with a stable repr"""
+        if isinstance(value, set):
+            return tuple(sorted(value))
+        if hasattr(value, "__len__") and not isinstance(value, str):
+            return tuple(ExportCache.plain(item) for item in value)
+        return value
+
+class ExportProfiler:
+    """Helper class to time export stages and collect stats about each exported file
+
+    Stages are splatmap, colliders, merge, textures (texture cache), gltf (the glTF exporter,
+    which includes its own image encoding and the file write), meshes, animations, ktx2,
+    tiers (lower tier files), cleanup and package (.hyp writing). Avatars have avatar (joining and reducing the
+    copies) and vrm (the VRM add-on's exporter) instead of gltf.
+    Stats are read back from the written GLB so they match what ships.
+    """
+
+    FILENAME = "export_profile.json"
+
+    # Summary of the last export, shown in the panel
+    last_summary = None
+
+    def __init__(self):
+        self.stages = {}
+        self.animations = None
+        self.avatar = None
+        self.tiers = None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def describe(self, name, filepath):
+        """Report entry for an exported file with its stage timings and stats"""
+        entry = {
+            "name": name,
+            "file": filepath,
+            "time": round(sum(self.stages.values()), 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+        }
+        try:
+            entry.update(ExportProfiler.get_glb_stats(filepath))
+        except (OSError, ValueError, KeyError, struct.error):
+            pass
+        if self.animations:
+            entry["animations"] = self.animations
+        if self.avatar:
+            entry["avatar"] = self.avatar
+        if self.tiers:
+            entry["tiers"] = {}
+            for tier, tier_filepath in self.tiers.items():
+                tier_entry = {"file": tier_filepath}
+                try:
+                    tier_entry.update(ExportProfiler.get_glb_stats(tier_filepath))
+                except (OSError, ValueError, KeyError, struct.error):
+                    pass
+                entry["tiers"][tier] = tier_entry
+        return entry
+
+    @staticmethod
+    def get_glb_stats(filepath):
+        """File size, triangles, draw calls, materials and uncompressed texture bytes of a GLB"""
+        glb = GLBFile.load(filepath)
+        gltf = glb.gltf
+        accessors = gltf.get("accessors", [])
+        meshes = gltf.get("meshes", [])
+
+        # Each primitive is a draw call for every node that uses its mesh, instanced nodes draw all their instances at once
+        mesh_uses = [0] * len(meshes)
+        mesh_instances = [0] * len(meshes)
+        for node in gltf.get("nodes", []):
+            if "mesh" in node:
+                mesh_uses[node["mesh"]] += 1
+                instancing = node.get("extensions", {}).get("EXT_mesh_gpu_instancing")
+                if instancing and instancing.get("attributes"):
+                    attribute = next(iter(instancing["attributes"].values()))
+                    mesh_instances[node["mesh"]] += accessors[attribute]["count"]
+                else:
+                    mesh_instances[node["mesh"]] += 1
+
+        triangles = 0
+        draw_calls = 0
+        for index, mesh in enumerate(meshes):
+            for primitive in mesh["primitives"]:
+                if "indices" in primitive:
+                    count = accessors[primitive["indices"]]["count"]
+                else:
+                    count = accessors[primitive["attributes"]["POSITION"]]["count"]
+                mode = primitive.get("mode", 4)
+                if mode == 4:
+                    triangles += count // 3 * mesh_instances[index]
+                elif mode in (5, 6):
+                    triangles += max(count - 2, 0) * mesh_instances[index]
+                draw_calls += mesh_uses[index]
+
+        # Same estimate as getTextureBytesFromMaterial on the client: width * height * 4
+        texture_bytes = 0
+        images = gltf.get("images", [])
+        sources = {GLBFile.get_texture_source(texture) for texture in gltf.get("textures", [])}
+        sources.discard(None)
+        for source in sources:
+            image = images[source]
+            if "bufferView" in image:
+                size = GLBFile.get_image_size(glb.read_view(image["bufferView"]))
+                if size:
+                    texture_bytes += size[0] * size[1] * 4
+
+        return {
+            "bytes": os.path.getsize(filepath),
+            "triangles": triangles,
+            "draw_calls": draw_calls,
+            "materials": len(gltf.get("materials", [])),
+            "texture_bytes": texture_bytes,
+        }
+
+    @staticmethod
+    def summarize(report):
+        entries = [entry for entry in report["exported"] if "time" in entry]
+        summary = {
+            "assets": len(entries),
+            "time": round(sum(entry["time"] for entry in entries), 4),
+            "bytes": sum(entry.get("bytes", 0) for entry in entries),
+            "triangles": sum(entry.get("triangles", 0) for entry in entries),
+            "texture_bytes": sum(entry.get("texture_bytes", 0) for entry in entries),
+            "animation_bytes_saved": sum(clip["bytes_saved"] for entry in entries for clip in entry.get("animations", {}).get("clips", [])),
+            "stages": {},
+        }
+        for entry in entries:
+            for stage, seconds in entry["stages"].items():
+                summary["stages"][stage] = round(summary["stages"].get(stage, 0.0) + seconds, 4)
+        if entries:
+            slowest = max(entries, key=lambda entry: entry["time"])
+            largest = max(entries, key=lambda entry: entry.get("bytes", 0))
+            summary["slowest"] = {"name": slowest["name"], "time": slowest["time"]}
+            summary["largest"] = {"name": largest["name"], "bytes": largest.get("bytes", 0)}
+        return summary
+
+    @staticmethod
+    def write(report):
+        """Write the profile of an export next to its output, slowest assets first"""
+        summary = ExportProfiler.summarize(report)
+        ExportProfiler.last_summary = summary
+        profile = {
+            "summary": summary,
+            "assets": sorted((entry for entry in report["exported"] if "time" in entry), key=lambda entry: -entry["time"]),
+        }
+        filepath = os.path.join(report["directory"], ExportProfiler.FILENAME)
+        with open(filepath, "w") as f:
+            json.dump(profile, f, indent=2)
+        return filepath
+
+    @staticmethod
+    def format_bytes(num):
+        """Same format as formatBytes on the client"""
+        units = ["B", "KB", "MB", "GB", "TB"]
+        index = 0
+        while num >= 1024 and index < len(units) - 1:
+            num /= 1024
+            index += 1
+        return f"{num:.0f} {units[index]}" if index <= 1 else f"{num:.1f} {units[index]}"
+
+class MeshOptimizer:
+    """Post-processes the meshes of an exported GLB
+
+    Optimizing drops TEXCOORD, TANGENT and COLOR attributes no material uses,
+    welds vertices that are identical afterwards, orders triangles along a
+    Morton curve and vertices by first use so neighbouring triangles share
+    cached vertices and fetches stay local. Quantizing stores attributes as
+    normalized integers (KHR_mesh_quantization), which the client and server
+    GLTFLoader both support.
+    """
+
+    DTYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+    COMPONENT_TYPES = {np.dtype(dtype): component_type for component_type, dtype in DTYPES.items()}
+    COMPONENTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+    ARRAY_BUFFER = 34962
+    ELEMENT_ARRAY_BUFFER = 34963
+
+    @staticmethod
+    def read_accessor(glb, index):
+        """Accessor data as a (count, components) array"""
+        accessor = glb.gltf["accessors"][index]
+        dtype = np.dtype(MeshOptimizer.DTYPES[accessor["componentType"]])
+        components = MeshOptimizer.COMPONENTS[accessor["type"]]
+        if "bufferView" not in accessor:
+            return np.zeros((accessor["count"], components), dtype)
+        view = glb.gltf["bufferViews"][accessor["bufferView"]]
+        offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+        stride = view.get("byteStride", dtype.itemsize * components)
+        return np.ndarray((accessor["count"], components), dtype, buffer=glb.binary, offset=offset, strides=(stride, dtype.itemsize)).copy()
+
+    @staticmethod
+    def write_accessor(glb, index, data, target, normalized=False, bounds=False):
+        """Replace an accessor's data, vertex attributes are padded to 4 byte strides"""
+        data = np.ascontiguousarray(data)
+        count, components = data.shape
+        size = data.dtype.itemsize * components
+        stride = None
+        raw = data.tobytes()
+        if target == MeshOptimizer.ARRAY_BUFFER and size % 4:
+            stride = size + (-size % 4)
+            padded = np.zeros((count, stride), np.uint8)
+            padded[:, :size] = data.view(np.uint8).reshape(count, size)
+            raw = padded.tobytes()
+        accessor = glb.gltf["accessors"][index]
+        for key in ("byteOffset", "min", "max", "normalized", "sparse"):
+            accessor.pop(key, None)
+        accessor["bufferView"] = glb.add_view(raw, target, stride)
+        accessor["componentType"] = MeshOptimizer.COMPONENT_TYPES[data.dtype]
+        accessor["count"] = count
+        if normalized:
+            accessor["normalized"] = True
+        if bounds:
+            accessor["min"] = data.min(axis=0).tolist()
+            accessor["max"] = data.max(axis=0).tolist()
+
+    @staticmethod
+    def get_material_usage(glb, material_index):
+        """Texture coordinate sets, tangents and vertex colors a material needs"""
+        if material_index is None:
+            return set(), False, False
+        material = glb.gltf["materials"][material_index]
+        texcoords = set()
+        stack = [material]
+        while stack:
+            value = stack.pop()
+            for key, item in value.items():
+                if isinstance(item, dict):
+                    if key.endswith("Texture") and "index" in item:
+                        texcoords.add(item.get("texCoord", 0))
+                        transform = item.get("extensions", {}).get("KHR_texture_transform", {})
+                        if "texCoord" in transform:
+                            texcoords.add(transform["texCoord"])
+                    stack.append(item)
+
+        # Vertex colors are only kept when the blender material reads them
+        colors = True
+        blender_material = bpy.data.materials.get(material.get("name", ""))
+        if blender_material:
+            colors = any(
+                node.type in ('VERTEX_COLOR', 'ATTRIBUTE')
+                for node_tree in TextureCache.get_node_trees([blender_material])
+                for node in node_tree.nodes
+            )
+        return texcoords, "normalTexture" in material, colors
+
+    @staticmethod
+    def prune_attributes(glb, primitive):
+        """Attributes of a primitive that its material uses, sets stay numbered from 0"""
+        texcoords, tangents, colors = MeshOptimizer.get_material_usage(glb, primitive.get("material"))
+        last_texcoord = max(texcoords, default=-1)
+        attributes = {}
+        for name, index in primitive["attributes"].items():
+            if name.startswith("TEXCOORD_") and int(name[9:]) > last_texcoord:
+                continue
+            if name == "TANGENT" and not tangents:
+                continue
+            if name.startswith("COLOR_") and not colors:
+                continue
+            attributes[name] = index
+        return attributes
+
+    @staticmethod
+    def spread_bits(values):
+        """Interleave 10 bit integers with two zero bits for a 30 bit Morton code"""
+        values = values & np.uint64(0x3FF)
+        values = (values | (values << np.uint64(16))) & np.uint64(0x030000FF)
+        values = (values | (values << np.uint64(8))) & np.uint64(0x0300F00F)
+        values = (values | (values << np.uint64(4))) & np.uint64(0x030C30C3)
+        values = (values | (values << np.uint64(2))) & np.uint64(0x09249249)
+        return values
+
+    @staticmethod
+    def optimize_triangles(arrays, targets, triangles):
+        """Weld identical vertices, drop degenerate triangles and reorder for locality
+
+        Returns the source vertex of every new vertex and the remapped triangles.
+        """
+        count = len(arrays["POSITION"])
+        columns = [data.view(np.uint8).reshape(count, -1) for data in arrays.values()]
+        columns += [data.view(np.uint8).reshape(count, -1) for target in targets for data in target.values()]
+        keys = np.ascontiguousarray(np.hstack(columns))
+        keys = keys.view(np.dtype((np.void, keys.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        triangles = inverse.ravel()[triangles]
+        triangles = triangles[
+            (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])
+        ]
+        if not len(triangles):
+            return first, triangles
+
+        # Triangles along a Morton curve of their centroids
+        centroids = arrays["POSITION"][first].astype(np.float64)[triangles].mean(axis=1)
+        lo = centroids.min(axis=0)
+        extent = np.maximum(centroids.max(axis=0) - lo, 1e-9)
+        cells = ((centroids - lo) / extent * 1023).astype(np.uint64)
+        codes = (
+            MeshOptimizer.spread_bits(cells[:, 0])
+            | (MeshOptimizer.spread_bits(cells[:, 1]) << np.uint64(1))
+            | (MeshOptimizer.spread_bits(cells[:, 2]) << np.uint64(2))
+        )
+        triangles = triangles[np.argsort(codes, kind="stable")]
+
+        # Vertices in the order the triangles first use them
+        used, first_use = np.unique(triangles.ravel(), return_index=True)
+        order = used[np.argsort(first_use)]
+        remap = np.empty(len(first), np.int64)
+        remap[order] = np.arange(len(order))
+        return first[order], remap[triangles]
+
+    @staticmethod
+    def quantize(name, data, accessor):
+        """Normalized integer version of an attribute, or None to keep it as is"""
+        if accessor["componentType"] != 5126:
+            return None
+        if name in ("NORMAL", "TANGENT"):
+            return np.clip(np.round(data * 127), -127, 127).astype(np.int8)
+        if name.startswith("TEXCOORD_") and len(data) and data.min() >= 0 and data.max() <= 1:
+            return np.round(data * 65535).astype(np.uint16)
+        return None
+
+    @staticmethod
+    def get_position_nodes(glb):
+        """Mesh index -> nodes using it, for meshes whose positions can be quantized
+
+        Dequantizing moves a scale and offset onto the mesh node, so meshes used
+        by colliders, splatmaps, wind, skins, animations, instanced nodes or nodes
+        with children keep float positions.
+        """
+        animated = {channel["target"].get("node") for animation in glb.gltf.get("animations", []) for channel in animation["channels"]}
+        materials = glb.gltf.get("materials", [])
+        nodes_by_mesh = {}
+        excluded = set()
+        for index, node in enumerate(glb.gltf.get("nodes", [])):
+            if "mesh" not in node:
+                continue
+            mesh = node["mesh"]
+            nodes_by_mesh.setdefault(mesh, []).append(node)
+            extras = node.get("extras", {})
+            if (
+                "skin" in node or "matrix" in node or node.get("children") or index in animated
+                or "EXT_mesh_gpu_instancing" in node.get("extensions", {})
+                or extras.get("node") == NODE_COLLIDER or extras.get("exp_splatmap")
+            ):
+                excluded.add(mesh)
+        for mesh_index, mesh in enumerate(glb.gltf.get("meshes", [])):
+            for primitive in mesh["primitives"]:
+                material = materials[primitive["material"]] if "material" in primitive else {}
+                if "targets" in primitive or material.get("extras", {}).get("wind"):
+                    excluded.add(mesh_index)
+        return {mesh: nodes for mesh, nodes in nodes_by_mesh.items() if mesh not in excluded}
+
+    @staticmethod
+    def move_scale_to_node(node, offset, scale):
+        """Fold position dequantization (q * scale + offset) into a node's transform"""
+        translation = node.get("translation", [0.0, 0.0, 0.0])
+        x, y, z, w = node.get("rotation", [0.0, 0.0, 0.0, 1.0])
+        node_scale = node.get("scale", [1.0, 1.0, 1.0])
+        v = Vector([offset[i] * node_scale[i] for i in range(3)])
+        q = Vector((x, y, z))
+        t = q.cross(v) * 2
+        rotated = v + t * w + q.cross(t)
+        node["translation"] = [translation[i] + rotated[i] for i in range(3)]
+        node["scale"] = [node_scale[i] * scale for i in range(3)]
+
+    @staticmethod
+    def optimize_file(filepath, settings):
+        """Optimize and/or quantize the meshes of a GLB in place"""
+        optimize = settings.mesh_optimize
+        quantize = settings.mesh_quantize
+        glb = GLBFile.load(filepath)
+        accessors = glb.gltf.get("accessors", [])
+        users = {}
+        for container, key in glb.get_accessor_refs():
+            users[container[key]] = users.get(container[key], 0) + 1
+        position_nodes = MeshOptimizer.get_position_nodes(glb) if quantize == 'ALL' else {}
+        quantized = False
+
+        for mesh_index, mesh in enumerate(glb.gltf.get("meshes", [])):
+            # Accessors shared with anything else, sparse data or non-triangle primitives are left alone
+            primitives = []
+            for primitive in mesh["primitives"]:
+                refs = list(primitive["attributes"].values()) + [primitive.get("indices")]
+                refs += [index for target in primitive.get("targets", []) for index in target.values()]
+                if (
+                    primitive.get("mode", 4) == 4 and "indices" in primitive and "POSITION" in primitive["attributes"]
+                    and all(index is not None and users[index] == 1 and "sparse" not in accessors[index] for index in refs)
+                ):
+                    primitives.append(primitive)
+
+            # Positions share one grid per mesh so the node transform fits every primitive
+            position_grid = None
+            if (
+                mesh_index in position_nodes and len(primitives) == len(mesh["primitives"])
+                and all("min" in accessors[p["attributes"]["POSITION"]] for p in primitives)
+            ):
+                lo = np.min([accessors[p["attributes"]["POSITION"]]["min"] for p in primitives], axis=0)
+                hi = np.max([accessors[p["attributes"]["POSITION"]]["max"] for p in primitives], axis=0)
+                offset = (lo + hi) / 2
+                scale = float(np.max(hi - lo)) / 2 or 1.0
+                position_grid = (offset, scale)
+
+            for primitive in primitives:
+                attributes = MeshOptimizer.prune_attributes(glb, primitive) if optimize else dict(primitive["attributes"])
+                arrays = {name: MeshOptimizer.read_accessor(glb, index) for name, index in attributes.items()}
+                targets = [
+                    {name: MeshOptimizer.read_accessor(glb, index) for name, index in target.items()}
+                    for target in primitive.get("targets", [])
+                ]
+                triangles = MeshOptimizer.read_accessor(glb, primitive["indices"]).astype(np.int64).reshape(-1, 3)
+                source = np.arange(len(arrays["POSITION"]))
+                if optimize:
+                    optimized_source, optimized_triangles = MeshOptimizer.optimize_triangles(arrays, targets, triangles)
+                    # A primitive with only degenerate triangles is written as it was
+                    if len(optimized_triangles):
+                        source, triangles = optimized_source, optimized_triangles
+
+                for name, index in attributes.items():
+                    data = arrays[name][source]
+                    accessor = accessors[index]
+                    if name == "POSITION" and position_grid:
+                        offset, scale = position_grid
+                        data = np.clip(np.round((data - offset) / scale * 32767), -32767, 32767).astype(np.int16)
+                        MeshOptimizer.write_accessor(glb, index, data, MeshOptimizer.ARRAY_BUFFER, normalized=True, bounds=True)
+                        quantized = True
+                        continue
+                    quantized_data = MeshOptimizer.quantize(name, data, accessor) if quantize != 'NONE' else None
+                    if quantized_data is not None:
+                        MeshOptimizer.write_accessor(glb, index, quantized_data, MeshOptimizer.ARRAY_BUFFER, normalized=True)
+                        quantized = True
+                    else:
+                        MeshOptimizer.write_accessor(glb, index, data, MeshOptimizer.ARRAY_BUFFER, normalized=accessor.get("normalized", False), bounds=name == "POSITION")
+                for target, target_arrays in zip(primitive.get("targets", []), targets):
+                    for name, index in target.items():
+                        MeshOptimizer.write_accessor(glb, index, target_arrays[name][source], MeshOptimizer.ARRAY_BUFFER, bounds=name == "POSITION")
+
+                # Smallest index type that fits
+                index_type = np.uint16 if len(source) < 65535 else np.uint32
+                MeshOptimizer.write_accessor(glb, primitive["indices"], triangles.reshape(-1, 1).astype(index_type), MeshOptimizer.ELEMENT_ARRAY_BUFFER)
+                primitive["attributes"] = attributes
+
+            if position_grid:
+                for node in position_nodes[mesh_index]:
+                    MeshOptimizer.move_scale_to_node(node, position_grid[0].tolist(), position_grid[1])
+
+        if quantized:
+            glb.use_extension("KHR_mesh_quantization", required=True)
+        glb.compact()
+        glb.save(filepath)
+
+class AnimationOptimizer:
+    """Post-processes the animations of an exported GLB
+
+    Keyframes a linear interpolation of their neighbours reproduces within the
+    tolerance are removed (Ramer-Douglas-Peucker per channel, rotations compared
+    after sign alignment). Constant channels keep only their first and last key
+    and are dropped entirely when they hold the node's rest value. Leaf bones
+    that are neither weighted nor animated are removed from skins and the node
+    tree. Rotations can be stored as normalized 16-bit integers, which core
+    glTF allows for rotation outputs. VRM files keep all their bones since the
+    humanoid extension references them.
+    """
+
+    REST_VALUES = {
+        "translation": [0.0, 0.0, 0.0],
+        "rotation": [0.0, 0.0, 0.0, 1.0],
+        "scale": [1.0, 1.0, 1.0],
+    }
+    VRM_EXTENSIONS = ("VRM", "VRMC_vrm")
+
+    @staticmethod
+    def align_signs(values, reference):
+        """Flip quaternions onto the same hemisphere as reference (q and -q are the same rotation)"""
+        signs = np.where(np.sum(values * reference, axis=-1) < 0, -1.0, 1.0)
+        return values * signs[..., None]
+
+    @staticmethod
+    def reduce_keys(times, values, tolerance, rotation):
+        """Indices of the keys to keep so linear interpolation stays within tolerance"""
+        count = len(times)
+        keep = np.zeros(count, dtype=bool)
+        keep[0] = keep[-1] = True
+        stack = [(0, count - 1)]
+        while stack:
+            start, end = stack.pop()
+            if end - start < 2:
+                continue
+            span = times[end] - times[start]
+            t = (times[start + 1:end] - times[start]) / span if span > 0 else np.zeros(end - start - 1)
+            a = values[start]
+            b = AnimationOptimizer.align_signs(values[end], a) if rotation else values[end]
+            expected = a + (b - a) * t[:, None]
+            actual = values[start + 1:end]
+            if rotation:
+                expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+                actual = AnimationOptimizer.align_signs(actual, expected)
+            error = np.abs(expected - actual).max(axis=1)
+            worst = int(np.argmax(error))
+            if error[worst] > tolerance:
+                split = start + 1 + worst
+                keep[split] = True
+                stack.append((start, split))
+                stack.append((split, end))
+        return np.flatnonzero(keep)
+
+    @staticmethod
+    def is_constant(values, tolerance, rotation):
+        if rotation:
+            values = AnimationOptimizer.align_signs(values, values[0])
+        return float(np.abs(values - values[0]).max()) <= tolerance
+
+    @staticmethod
+    def is_rest(node, path, value, tolerance):
+        """Whether a constant channel holds the value the node has without animation"""
+        if "matrix" in node or path not in AnimationOptimizer.REST_VALUES:
+            return False
+        rest = np.array(node.get(path, AnimationOptimizer.REST_VALUES[path]), dtype=np.float32)
+        if path == "rotation":
+            value = AnimationOptimizer.align_signs(value, rest)
+        return float(np.abs(value - rest).max()) <= tolerance
+
+    @staticmethod
+    def accessor_bytes(glb, index):
+        accessor = glb.gltf["accessors"][index]
+        itemsize = np.dtype(MeshOptimizer.DTYPES[accessor["componentType"]]).itemsize
+        return accessor["count"] * MeshOptimizer.COMPONENTS[accessor["type"]] * itemsize
+
+    @staticmethod
+    def clip_bytes(glb, animation):
+        """Bytes of the unique accessors a clip uses"""
+        indices = {sampler[key] for sampler in animation["samplers"] for key in ("input", "output")}
+        return sum(AnimationOptimizer.accessor_bytes(glb, index) for index in indices)
+
+    @staticmethod
+    def add_accessor(glb, data, accessor_type, normalized=False, bounds=False, shared=None):
+        """Append a new accessor, identical data is written once when shared is a dict"""
+        data = np.ascontiguousarray(data)
+        key = (data.dtype.str, data.shape, accessor_type, data.tobytes())
+        if shared is not None and key in shared:
+            return shared[key]
+        accessors = glb.gltf.setdefault("accessors", [])
+        accessors.append({"type": accessor_type})
+        index = len(accessors) - 1
+        MeshOptimizer.write_accessor(glb, index, data, None, normalized=normalized, bounds=bounds)
+        if shared is not None:
+            shared[key] = index
+        return index
+
+    @staticmethod
+    def optimize_clip(glb, animation, tolerance, quantize_rotations, shared):
+        """Reduce the channels of one animation in place, returns its stats"""
+        nodes = glb.gltf.get("nodes", [])
+        accessors = glb.gltf["accessors"]
+        stats = {
+            "name": animation.get("name", ""),
+            "bytes_before": AnimationOptimizer.clip_bytes(glb, animation),
+            "keys_before": 0,
+            "keys_after": 0,
+            "channels_removed": 0,
+        }
+
+        channels = []
+        removed = []
+        for channel in animation["channels"]:
+            sampler = animation["samplers"][channel["sampler"]]
+            path = channel["target"].get("path")
+            interpolation = sampler.get("interpolation", "LINEAR")
+            count = accessors[sampler["input"]]["count"]
+            stats["keys_before"] += count
+            output = accessors[sampler["output"]]
+            # Morph weights, cubic splines and already quantized outputs are left alone
+            if path not in AnimationOptimizer.REST_VALUES or interpolation == "CUBICSPLINE" or output.get("normalized") or count < 2:
+                channels.append((channel, sampler, None, None))
+                stats["keys_after"] += count
+                continue
+
+            times = MeshOptimizer.read_accessor(glb, sampler["input"])[:, 0].astype(np.float64)
+            values = MeshOptimizer.read_accessor(glb, sampler["output"]).astype(np.float64)
+            rotation = path == "rotation"
+            if AnimationOptimizer.is_constant(values, tolerance, rotation):
+                node = nodes[channel["target"]["node"]] if "node" in channel["target"] else None
+                if node is not None and AnimationOptimizer.is_rest(node, path, values[0], tolerance):
+                    removed.append((channel, sampler, times, values))
+                    continue
+                keep = np.array([0, count - 1])
+            elif interpolation == "STEP":
+                # A step key equal to the previous one changes nothing
+                keep = np.flatnonzero(np.r_[True, np.abs(np.diff(values, axis=0)).max(axis=1) > tolerance])
+            else:
+                keep = AnimationOptimizer.reduce_keys(times, values, tolerance, rotation)
+            channels.append((channel, sampler, times[keep], values[keep]))
+
+        # Removing every channel that reached the end would shorten the clip
+        def get_end(sampler, times):
+            if times is None:
+                times = MeshOptimizer.read_accessor(glb, sampler["input"])[:, 0]
+            return float(times.max()) if len(times) else 0.0
+        end = max((get_end(sampler, times) for channel, sampler, times, values in channels + removed), default=0.0)
+        remaining_end = max((get_end(sampler, times) for channel, sampler, times, values in channels), default=None)
+        if removed and (remaining_end is None or remaining_end < end - 1e-6):
+            channel, sampler, times, values = max(removed, key=lambda item: item[2][-1])
+            removed.remove((channel, sampler, times, values))
+            channels.append((channel, sampler, times[[0, -1]], values[[0, -1]]))
+        stats["channels_removed"] = len(removed)
+
+        samplers = []
+        for channel, sampler, times, values in channels:
+            if times is not None:
+                output_type = accessors[sampler["output"]]["type"]
+                sampler = dict(sampler)
+                sampler["input"] = AnimationOptimizer.add_accessor(glb, times.astype(np.float32)[:, None], "SCALAR", bounds=True, shared=shared)
+                if channel["target"]["path"] == "rotation":
+                    values /= np.linalg.norm(values, axis=1, keepdims=True)
+                if quantize_rotations and channel["target"]["path"] == "rotation":
+                    data = np.clip(np.round(values * 32767), -32767, 32767).astype(np.int16)
+                    sampler["output"] = AnimationOptimizer.add_accessor(glb, data, "VEC4", normalized=True)
+                else:
+                    sampler["output"] = AnimationOptimizer.add_accessor(glb, values.astype(np.float32), output_type)
+                stats["keys_after"] += len(times)
+            channel["sampler"] = len(samplers)
+            samplers.append(sampler)
+        animation["channels"] = [channel for channel, sampler, times, values in channels]
+        animation["samplers"] = samplers
+        stats["bytes_after"] = AnimationOptimizer.clip_bytes(glb, animation)
+        stats["bytes_saved"] = stats["bytes_before"] - stats["bytes_after"]
+        return stats
+
+    @staticmethod
+    def remove_nodes(glb, removed):
+        """Delete nodes and renumber every reference to the ones left"""
+        nodes = glb.gltf["nodes"]
+        node_map = {}
+        kept = []
+        for index, node in enumerate(nodes):
+            if index not in removed:
+                node_map[index] = len(kept)
+                kept.append(node)
+        glb.gltf["nodes"] = kept
+        for node in kept:
+            if "children" in node:
+                node["children"] = [node_map[child] for child in node["children"] if child in node_map]
+                if not node["children"]:
+                    del node["children"]
+        for scene in glb.gltf.get("scenes", []):
+            scene["nodes"] = [node_map[index] for index in scene.get("nodes", []) if index in node_map]
+        for skin in glb.gltf.get("skins", []):
+            skin["joints"] = [node_map[index] for index in skin["joints"]]
+            if "skeleton" in skin:
+                skin["skeleton"] = node_map[skin["skeleton"]]
+        for animation in glb.gltf.get("animations", []):
+            for channel in animation["channels"]:
+                if "node" in channel["target"]:
+                    channel["target"]["node"] = node_map[channel["target"]["node"]]
+
+    @staticmethod
+    def drop_unused_joints(glb):
+        """Remove leaf joints nothing is weighted to or animates, returns how many were removed"""
+        used_extensions = glb.gltf.get("extensionsUsed", [])
+        skins = glb.gltf.get("skins", [])
+        if not skins or any(name in used_extensions for name in AnimationOptimizer.VRM_EXTENSIONS):
+            return 0
+        nodes = glb.gltf["nodes"]
+        accessors = glb.gltf["accessors"]
+        users = {}
+        for container, key in glb.get_accessor_refs():
+            users[container[key]] = users.get(container[key], 0) + 1
+
+        # Joint slots each skin's vertices are weighted to, skins whose meshes are shared are left alone
+        mesh_skins = {}
+        for node in nodes:
+            if "mesh" in node:
+                mesh_skins.setdefault(node["mesh"], set()).add(node.get("skin"))
+        weighted = {index: set() for index in range(len(skins))}
+        unsafe = set()
+        primitives = {index: [] for index in range(len(skins))}
+        for mesh_index, skin_indices in mesh_skins.items():
+            mesh_primitives = glb.gltf["meshes"][mesh_index]["primitives"]
+            if len(skin_indices) > 1:
+                unsafe.update(index for index in skin_indices if index is not None)
+                continue
+            skin_index = next(iter(skin_indices))
+            if skin_index is None:
+                continue
+            for primitive in mesh_primitives:
+                attributes = primitive["attributes"]
+                set_index = 0
+                while f"JOINTS_{set_index}" in attributes:
+                    joints_index = attributes[f"JOINTS_{set_index}"]
+                    if users[joints_index] > 1 or "sparse" in accessors[joints_index]:
+                        unsafe.add(skin_index)
+                    joints = MeshOptimizer.read_accessor(glb, joints_index)
+                    weights = MeshOptimizer.read_accessor(glb, attributes[f"WEIGHTS_{set_index}"])
+                    weighted[skin_index].update(np.unique(joints[weights > 0]).tolist())
+                    primitives[skin_index].append((primitive, f"JOINTS_{set_index}"))
+                    set_index += 1
+
+        animated = {channel["target"].get("node") for animation in glb.gltf.get("animations", []) for channel in animation["channels"]}
+        joint_counts = {}
+        for skin in skins:
+            for joint in skin["joints"]:
+                joint_counts[joint] = joint_counts.get(joint, 0) + 1
+        candidates = set()
+        for skin_index, skin in enumerate(skins):
+            if skin_index in unsafe:
+                continue
+            for slot, joint in enumerate(skin["joints"]):
+                node = nodes[joint]
+                if (
+                    slot not in weighted[skin_index] and joint not in animated and joint_counts[joint] == 1
+                    and joint != skin.get("skeleton") and not any(key in node for key in ("mesh", "camera", "extras", "extensions"))
+                ):
+                    candidates.add(joint)
+
+        # Only whole branches go, so every child left keeps its parent
+        removed = set()
+        def removable(index):
+            if index not in candidates:
+                return False
+            result = all([removable(child) for child in nodes[index].get("children", [])])
+            if result:
+                removed.add(index)
+            return result
+        for index in candidates:
+            removable(index)
+        if not removed:
+            return 0
+
+        for skin_index, skin in enumerate(skins):
+            slots = [slot for slot, joint in enumerate(skin["joints"]) if joint not in removed]
+            if len(slots) == len(skin["joints"]):
+                continue
+            # Removed slots carry no weight, so they can point anywhere
+            slot_map = np.zeros(len(skin["joints"]), dtype=np.int64)
+            slot_map[slots] = np.arange(len(slots))
+            for primitive, name in primitives[skin_index]:
+                joints = MeshOptimizer.read_accessor(glb, primitive["attributes"][name])
+                MeshOptimizer.write_accessor(glb, primitive["attributes"][name], slot_map[joints].astype(joints.dtype), MeshOptimizer.ARRAY_BUFFER)
+            if "inverseBindMatrices" in skin:
+                matrices = MeshOptimizer.read_accessor(glb, skin["inverseBindMatrices"])
+                MeshOptimizer.write_accessor(glb, skin["inverseBindMatrices"], matrices[slots], None)
+            skin["joints"] = [skin["joints"][slot] for slot in slots]
+
+        AnimationOptimizer.remove_nodes(glb, removed)
+        return len(removed)
+
+    @staticmethod
+    def optimize(glb, tolerance, quantize_rotations):
+        """Optimize every clip of a loaded GLB, returns the stats"""
+        shared = {}
+        clips = [
+            AnimationOptimizer.optimize_clip(glb, animation, tolerance, quantize_rotations, shared)
+            for animation in glb.gltf.get("animations", [])
+        ]
+        bones_removed = AnimationOptimizer.drop_unused_joints(glb)
+        glb.compact()
+        return {"clips": clips, "bones_removed": bones_removed}
+
+    @staticmethod
+    def optimize_file(filepath, settings):
+        """Optimize the animations of a GLB in place, returns per clip stats or None without animations or skins"""
+        glb = GLBFile.load(filepath)
+        if not glb.gltf.get("animations") and not glb.gltf.get("skins"):
+            return None
+        stats = AnimationOptimizer.optimize(glb, settings.animation_tolerance, settings.animation_quantize)
+        glb.save(filepath)
+        return stats
+
+class GLBFile:
+    """Minimal reader and writer for binary glTF files, used to post-process exports"""
+
+    MAGIC = b'glTF'
+    CHUNK_JSON = 0x4E4F534A
+    CHUNK_BIN = 0x004E4942
+
+    def __init__(self, gltf, binary=b''):
+        self.gltf = gltf
+        self.binary = bytearray(binary)
+
+    @staticmethod
+    def load(filepath):
+        with open(filepath, "rb") as f:
+            data = f.read()
+        magic, version, length = struct.unpack_from("<4sII", data, 0)
+        if magic != GLBFile.MAGIC or version != 2:
+            raise ValueError(f"'{filepath}' is not a glTF 2.0 binary file")
+        gltf = None
+        binary = b''
+        offset = 12
+        while offset < length:
+            chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+            offset += 8
+            if chunk_type == GLBFile.CHUNK_JSON:
+                gltf = json.loads(data[offset:offset + chunk_length])
+            elif chunk_type == GLBFile.CHUNK_BIN:
+                binary = data[offset:offset + chunk_length]
+            offset += chunk_length
+        return GLBFile(gltf, binary)
+
+    def to_bytes(self):
+        # Chunks must be 4 byte aligned, json is padded with spaces and binary with zeros
+        if self.binary:
+            buffers = self.gltf.setdefault("buffers", [{}])
+            buffers[0]["byteLength"] = len(self.binary)
+        json_bytes = json.dumps(self.gltf, separators=(",", ":")).encode()
+        json_bytes += b' ' * (-len(json_bytes) % 4)
+        binary = bytes(self.binary) + b'\0' * (-len(self.binary) % 4)
+        length = 12 + 8 + len(json_bytes) + (8 + len(binary) if binary else 0)
+        parts = [
+            struct.pack("<4sII", GLBFile.MAGIC, 2, length),
+            struct.pack("<II", len(json_bytes), GLBFile.CHUNK_JSON),
+            json_bytes,
+        ]
+        if binary:
+            parts.append(struct.pack("<II", len(binary), GLBFile.CHUNK_BIN))
+            parts.append(binary)
+        return b''.join(parts)
+
+    def save(self, filepath):
+        with open(filepath, "wb") as f:
+            f.write(self.to_bytes())
+
+    def read_view(self, index):
+        view = self.gltf["bufferViews"][index]
+        offset = view.get("byteOffset", 0)
+        return bytes(self.binary[offset:offset + view["byteLength"]])
+
+    def add_view(self, data, target=None, stride=None):
+        """Append data to the binary chunk and return the index of its new buffer view"""
+        self.binary += b'\0' * (-len(self.binary) % 4)
+        view = {"buffer": 0, "byteOffset": len(self.binary), "byteLength": len(data)}
+        if stride is not None:
+            view["byteStride"] = stride
+        if target is not None:
+            view["target"] = target
+        self.binary += data
+        self.gltf.setdefault("buffers", [{"byteLength": 0}])
+        views = self.gltf.setdefault("bufferViews", [])
+        views.append(view)
+        return len(views) - 1
+
+    def get_accessor_refs(self):
+        """(container, key) pairs of every place an accessor index is referenced"""
+        refs = []
+        for mesh in self.gltf.get("meshes", []):
+            for primitive in mesh["primitives"]:
+                refs.extend((primitive["attributes"], key) for key in primitive["attributes"])
+                if "indices" in primitive:
+                    refs.append((primitive, "indices"))
+                for target in primitive.get("targets", []):
+                    refs.extend((target, key) for key in target)
+        for skin in self.gltf.get("skins", []):
+            if "inverseBindMatrices" in skin:
+                refs.append((skin, "inverseBindMatrices"))
+        for animation in self.gltf.get("animations", []):
+            for sampler in animation["samplers"]:
+                refs.extend((sampler, key) for key in ("input", "output"))
+        for node in self.gltf.get("nodes", []):
+            instancing = node.get("extensions", {}).get("EXT_mesh_gpu_instancing")
+            if instancing:
+                refs.extend((instancing["attributes"], key) for key in instancing["attributes"])
+        return refs
+
+    def compact(self):
+        """Drop accessors and buffer views nothing references any more and rewrite the binary chunk"""
+        refs = self.get_accessor_refs()
+        used = sorted({container[key] for container, key in refs})
+        accessor_map = {old: new for new, old in enumerate(used)}
+        for container, key in refs:
+            container[key] = accessor_map[container[key]]
+        if "accessors" in self.gltf:
+            self.gltf["accessors"] = [self.gltf["accessors"][old] for old in used]
+
+        # Buffer views are referenced by accessors (and their sparse parts) and images
+        view_refs = []
+        for accessor in self.gltf.get("accessors", []):
+            if "bufferView" in accessor:
+                view_refs.append(accessor)
+            sparse = accessor.get("sparse")
+            if sparse:
+                view_refs.extend((sparse["indices"], sparse["values"]))
+        view_refs.extend(image for image in self.gltf.get("images", []) if "bufferView" in image)
+        used = sorted({container["bufferView"] for container in view_refs})
+        binary = bytearray()
+        views = []
+        view_map = {}
+        for old in used:
+            view = dict(self.gltf["bufferViews"][old])
+            data = self.read_view(old)
+            binary += b'\0' * (-len(binary) % 4)
+            view["byteOffset"] = len(binary)
+            binary += data
+            view_map[old] = len(views)
+            views.append(view)
+        for container in view_refs:
+            container["bufferView"] = view_map[container["bufferView"]]
+        self.gltf["bufferViews"] = views
+        self.binary = binary
+
+    @staticmethod
+    def get_texture_source(texture):
+        """Image a texture uses, WEBP images are referenced through EXT_texture_webp"""
+        webp = texture.get("extensions", {}).get("EXT_texture_webp")
+        if webp and "source" in webp:
+            return webp["source"]
+        return texture.get("source")
+
+    @staticmethod
+    def get_image_size(data):
+        """Width and height from PNG, JPEG, WEBP or KTX2 headers, or None"""
+        if data[:8] == b'\x89PNG\r\n\x1a\n':
+            return struct.unpack_from(">II", data, 16)
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            chunk = data[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack_from("<HH", data, 26)
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = struct.unpack_from("<I", data, 21)[0]
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                width = int.from_bytes(data[24:27], "little") + 1
+                height = int.from_bytes(data[27:30], "little") + 1
+                return width, height
+        if data[:12] == b'\xabKTX 20\xbb\r\n\x1a\n':
+            return struct.unpack_from("<II", data, 20)
+        if data[:2] == b'\xff\xd8':
+            # Walk JPEG segments until a start of frame marker
+            offset = 2
+            while offset + 9 < len(data):
+                if data[offset] != 0xFF:
+                    offset += 1
+                    continue
+                marker = data[offset + 1]
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack_from(">HH", data, offset + 5)
+                    return width, height
+                length = struct.unpack_from(">H", data, offset + 2)[0]
+                offset += 2 + length
+        return None
+
+    def use_extension(self, name, required=False):
+        used = self.gltf.setdefault("extensionsUsed", [])
+        if name not in used:
+            used.append(name)
+        if required:
+            required_list = self.gltf.setdefault("extensionsRequired", [])
+            if name not in required_list:
+                required_list.append(name)
+
+class HypWriter:
+    """Writes .hyp apps in the format of exportApp/importApp in src/core/extras/appTools.js
+
+    A .hyp is a 4 byte little endian header length, a JSON header with the
+    blueprint and assets, then each asset's bytes in order. Asset urls are
+    asset://<sha256>.<ext>, the name /api/upload stores files under. Assets are
+    hashed and then copied in chunks, so they're never held in memory.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    MIME_TYPES = {
+        "glb": "model/gltf-binary",
+        "vrm": "model/gltf-binary",
+        "js": "text/javascript",
+        "png": "image/png",
+        "jpg": "image/jpeg",
+        "jpeg": "image/jpeg",
+        "webp": "image/webp",
+    }
+
+    @staticmethod
+    def hash_file(filepath):
+        """Hex SHA-256 of a file, same as hashFile in src/core/utils-server.js"""
+        hasher = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(HypWriter.CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def get_asset(asset_type, filepath):
+        """Header entry for a file, with its path for writing"""
+        ext = os.path.splitext(filepath)[1][1:].lower()
+        return {
+            "type": asset_type,
+            "url": f"asset://{HypWriter.hash_file(filepath)}.{ext}",
+            "size": os.path.getsize(filepath),
+            "mime": HypWriter.MIME_TYPES.get(ext, "application/octet-stream"),
+            "path": filepath,
+        }
+
+    @staticmethod
+    def new_blueprint(name, model_url):
+        """Blueprint matching the one the client creates when a GLB is dropped into a world"""
+        return {
+            "id": str(uuid.uuid4()),
+            "version": 0,
+            "name": name,
+            "image": None,
+            "author": None,
+            "url": None,
+            "desc": None,
+            "model": model_url,
+            "script": None,
+            "props": {},
+            "preload": False,
+            "public": False,
+            "locked": False,
+            "unique": False,
+            "scene": False,
+            "disabled": False,
+        }
+
+    @staticmethod
+    def write(filepath, blueprint, assets):
+        """Write a .hyp file from a blueprint and assets made by get_asset"""
+        header = {
+            "blueprint": blueprint,
+            "assets": [{key: asset[key] for key in ("type", "url", "size", "mime")} for asset in assets],
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        tmp_filepath = filepath + ".tmp"
+        with open(tmp_filepath, "wb") as out:
+            out.write(struct.pack("<I", len(header_bytes)))
+            out.write(header_bytes)
+            for asset in assets:
+                with open(asset["path"], "rb") as f:
+                    shutil.copyfileobj(f, out, HypWriter.CHUNK_SIZE)
+        os.replace(tmp_filepath, filepath)
+
+    @staticmethod
+    def write_app(glb_filepath, name):
+        """Package an exported GLB as an app in a .hyp next to it and return its path"""
+        asset = HypWriter.get_asset("model", glb_filepath)
+        filepath = os.path.splitext(glb_filepath)[0] + ".hyp"
+        HypWriter.write(filepath, HypWriter.new_blueprint(name, asset["url"]), [asset])
+        return filepath
+
+class AssetUploader:
+    """Uploads exported assets to a world server, skipping the ones it already has
+
+    Assets are named <sha256>.<ext> like /api/upload names them, so
+    /api/upload-check can tell if the server has one before it is sent. Uploads
+    run on a bounded thread pool, each thread reusing its own keep-alive
+    connection, and failed requests are retried with backoff.
+    """
+
+    RETRIES = 3
+    TIMEOUT = 60
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, server_url, workers=8):
+        parsed = urllib.parse.urlsplit(server_url if "://" in server_url else f"http://{server_url}")
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Invalid world URL '{server_url}'")
+        self.scheme = parsed.scheme
+        self.netloc = parsed.netloc
+        # Accept the api url (PUBLIC_API_URL) as well as the world url
+        path = parsed.path.rstrip("/")
+        self.api_path = path if path.endswith("/api") else path + "/api"
+        self.workers = workers
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
     @staticmethod
-    def process_splatmap_object(obj):
-        """Process a single splatmap object for export"""
-        # Ensure object has only one material
-        if len(obj.data.materials) > 1:
-            return False, f"Splatmap object '{obj.name}' has more than one material"
-        
-        if len(obj.data.materials) == 0:
-            return False, f"Splatmap object '{obj.name}' has no materials"
-        
-        original_material = obj.data.materials[0]
-        
-        # Clone the mesh object
-        clone = obj.copy()
-        clone.data = obj.data.copy()
-        clone.name = f"{obj.name}_splatmap_clone"
-        
-        # Link clone to the scene
-        bpy.context.collection.objects.link(clone)
-        
-        # Create new principled BSDF material
-        new_material = bpy.data.materials.new(name=f"{original_material.name}_splatmap_converted")
-        new_material.use_nodes = True
-        
-        # Clear default nodes
-        new_material.node_tree.nodes.clear()
-        
-        # Add principled BSDF
-        principled = new_material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
-        output = new_material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-        
-        # Connect principled to output
-        new_material.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
-        
-        # Find and copy required image nodes from original material
-        if original_material.use_nodes:
-            image_nodes = {}
-            mapping_scales = {}
-            
-            for node in original_material.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.label in ['SPLAT', 'RED', 'GREEN', 'BLUE', 'ALPHA']:
-                    image_nodes[node.label] = node
-                    
-                    # Check if this image node has a mapping node connected to it
-                    for input_socket in node.inputs:
-                        if input_socket.is_linked:
-                            for link in input_socket.links:
-                                if link.from_node.type == 'MAPPING':
-                                    mapping_node = link.from_node
-                                    # Get the scale values (X, Y, Z)
-                                    scale_x = mapping_node.inputs['Scale'].default_value[0]
-                                    scale_y = mapping_node.inputs['Scale'].default_value[1]
-                                    scale_z = mapping_node.inputs['Scale'].default_value[2]
-                                    # Calculate average scale
-                                    avg_scale = (scale_x + scale_y + scale_z) / 3.0
-                                    mapping_scales[node.label] = avg_scale
-                                    break
-            
-            # Add and connect image nodes to principled BSDF
-            connections = {
-                'SPLAT': 'Base Color',
-                'RED': 'Specular IOR Level',
-                'GREEN': 'Emission Color',
-                'BLUE': 'Normal',
-                'ALPHA': 'Transmission Weight'
+    def collect(files):
+        """Assets to upload from (root name, filepath) pairs, the assets inside .hyp files are uploaded on their own"""
+        assets = []
+        for name, filepath in files:
+            if filepath.endswith(".hyp"):
+                with open(filepath, "rb") as f:
+                    header_size = struct.unpack("<I", f.read(4))[0]
+                    header = json.loads(f.read(header_size))
+                offset = 4 + header_size
+                for asset in header["assets"]:
+                    filename = asset["url"].split("/")[-1]
+                    assets.append({"name": name, "filename": filename, "path": filepath, "offset": offset, "size": asset["size"], "mime": asset["mime"]})
+                    offset += asset["size"]
+            else:
+                asset = HypWriter.get_asset("model", filepath)
+                filename = asset["url"].split("/")[-1]
+                assets.append({"name": name, "filename": filename, "path": filepath, "offset": 0, "size": asset["size"], "mime": asset["mime"]})
+        return assets
+
+    def get_connection(self):
+        """This thread's connection, http.client reconnects it after errors"""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(self.netloc, timeout=AssetUploader.TIMEOUT)
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request and return the response body, retrying connection errors and 5xx responses
+
+        body is a function returning the request body, so it can be sent again.
+        """
+        error = None
+        for attempt in range(AssetUploader.RETRIES + 1):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            connection = self.get_connection()
+            try:
+                connection.request(method, self.api_path + path, body=body() if body else None, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                error = str(e) or type(e).__name__
+                continue
+            if response.status < 400:
+                return data
+            error = f"HTTP {response.status}"
+            if response.status < 500:
+                break
+        raise OSError(f"{method} {path} failed: {error}")
+
+    def exists(self, filename):
+        data = self.request("GET", "/upload-check?filename=" + urllib.parse.quote(filename))
+        return bool(json.loads(data).get("exists"))
+
+    def read_chunks(self, asset):
+        with open(asset["path"], "rb") as f:
+            f.seek(asset["offset"])
+            remaining = asset["size"]
+            while remaining > 0:
+                chunk = f.read(min(AssetUploader.CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError(f"{asset['path']} is truncated")
+                remaining -= len(chunk)
+                yield chunk
+
+    def upload(self, asset):
+        """POST an asset to /api/upload as multipart form data, streamed from disk"""
+        boundary = uuid.uuid4().hex
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{asset["filename"]}"\r\n'
+            f"Content-Type: {asset['mime']}\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        headers = {
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Content-Length": str(len(head) + asset["size"] + len(tail)),
+        }
+
+        def body():
+            yield head
+            yield from self.read_chunks(asset)
+            yield tail
+
+        self.request("POST", "/upload", body=body, headers=headers)
+
+    def push_asset(self, asset):
+        """Upload an asset unless the server has it, returns True if it was uploaded"""
+        if self.exists(asset["filename"]):
+            return False
+        self.upload(asset)
+        return True
+
+    def push(self, assets):
+        """Upload assets concurrently, returns uploaded and existing filenames and (name, error) failures"""
+        unique = list({asset["filename"]: asset for asset in assets}.values())
+        uploaded = []
+        existing = []
+        failed = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self.push_asset, asset): asset for asset in unique}
+                for future in as_completed(futures):
+                    asset = futures[future]
+                    try:
+                        (uploaded if future.result() else existing).append(asset["filename"])
+                    except (OSError, ValueError, http.client.HTTPException) as e:
+                        failed.append((asset["name"], f"Upload of '{asset['filename']}' failed: {e}"))
+        finally:
+            for connection in self.connections:
+                connection.close()
+        return uploaded, existing, failed
+
+class TextureCache:
+    """Helper class for a persistent, size bounded cache of encoded textures
+
+    Entries are files named after a hash of the source pixels and the encode
+    settings. Hits refresh the file's modification time so eviction can drop
+    the least recently used files once the cache grows past its size limit.
+    There is no separate index so parallel workers can share a cache.
+    """
+
+    DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "hyperfy", "textures")
+
+    def __init__(self, directory, max_megabytes, persistent=True):
+        self.directory = directory
+        self.max_bytes = max_megabytes * 1024 * 1024
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def from_settings(settings):
+        """Cache configured in settings, or a throwaway one when only KTX2 encoding needs it"""
+        if settings.texture_cache:
+            directory = bpy.path.abspath(settings.texture_cache_directory) if settings.texture_cache_directory else TextureCache.DEFAULT_DIRECTORY
+            return TextureCache(directory, settings.texture_cache_size)
+        if settings.texture_format == 'KTX2':
+            return TextureCache(tempfile.mkdtemp(prefix="hyperfy_textures_"), 0, persistent=False)
+        return None
+
+    def close(self):
+        if self.persistent:
+            self.evict()
+        else:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def get(self, key, ext):
+        """Path of a cached entry, or None"""
+        filepath = os.path.join(self.directory, f"{key}.{ext}")
+        if os.path.exists(filepath):
+            try:
+                # Mark as recently used
+                os.utime(filepath)
+            except OSError:
+                pass
+            self.hits += 1
+            return filepath
+        self.misses += 1
+        return None
+
+    def put(self, key, ext, tmp_filepath):
+        """Move a freshly encoded file into the cache, atomically so concurrent readers never see partial files"""
+        filepath = os.path.join(self.directory, f"{key}.{ext}")
+        os.replace(tmp_filepath, filepath)
+        return filepath
+
+    def tmp_filepath(self, ext):
+        return os.path.join(self.directory, f".tmp-{os.getpid()}-{time.time_ns()}.{ext}")
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size limit"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for mtime, size, filepath in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(filepath)
+                total -= size
+            except OSError:
+                pass
+
+    @staticmethod
+    def source_hash(image):
+        """Hash of an image's source pixels, read straight from the file when it hasn't been modified"""
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(f"{image.colorspace_settings.name}:{image.alpha_mode}".encode())
+        if image.source == 'FILE' and not image.is_dirty:
+            if image.packed_file:
+                hasher.update(image.packed_file.data)
+                return hasher.hexdigest()
+            filepath = bpy.path.abspath(image.filepath_raw, library=image.library)
+            if os.path.isfile(filepath):
+                with open(filepath, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        hasher.update(chunk)
+                return hasher.hexdigest()
+        pixels = array('f', [0.0]) * len(image.pixels)
+        image.pixels.foreach_get(pixels)
+        hasher.update(f"{tuple(image.size)}".encode())
+        hasher.update(pixels.tobytes())
+        return hasher.hexdigest()
+
+    def encode_webp(self, image, quality):
+        """Path of the cached WEBP encoding of an image, encoding it on a miss"""
+        key = hashlib.blake2b(f"{TextureCache.source_hash(image)}:webp:{quality}".encode(), digest_size=20).hexdigest()
+        filepath = self.get(key, "webp")
+        if filepath:
+            return filepath
+
+        # Same approach as the glTF exporter: save a temporary copy in the target format
+        tmp_filepath = self.tmp_filepath("webp")
+        tmp_image = image.copy()
+        try:
+            if image.is_dirty:
+                pixels = array('f', [0.0]) * len(image.pixels)
+                image.pixels.foreach_get(pixels)
+                tmp_image.pixels.foreach_set(pixels)
+            tmp_image.filepath_raw = tmp_filepath
+            tmp_image.file_format = 'WEBP'
+            try:
+                tmp_image.save(quality=quality)
+            except TypeError:
+                # Older versions can't pass a quality
+                tmp_image.save()
+        finally:
+            bpy.data.images.remove(tmp_image)
+        return self.put(key, "webp", tmp_filepath)
+
+    @staticmethod
+    def get_node_trees(materials):
+        """Node trees of the materials and every node group they use"""
+        node_trees = []
+        seen = set()
+        stack = [material.node_tree for material in materials if material.use_nodes and material.node_tree]
+        while stack:
+            node_tree = stack.pop()
+            if node_tree.as_pointer() in seen:
+                continue
+            seen.add(node_tree.as_pointer())
+            node_trees.append(node_tree)
+            for node in node_tree.nodes:
+                group = getattr(node, "node_tree", None)
+                if group:
+                    stack.append(group)
+        return node_trees
+
+    def apply(self, materials, quality):
+        """Point image nodes at cached WEBP encodings so the exporter can use their bytes as is
+
+        Returns the swaps to undo with restore().
+        """
+        swaps = []
+        cached_images = {}
+        for node_tree in TextureCache.get_node_trees(materials):
+            for node in node_tree.nodes:
+                if node.type != 'TEX_IMAGE' or node.image is None:
+                    continue
+                image = node.image
+                # Images the exporter already embeds without re-encoding
+                if image.source != 'FILE' and image.source != 'GENERATED':
+                    continue
+                if image.source == 'FILE' and image.file_format == 'WEBP' and not image.is_dirty:
+                    continue
+                if image.name not in cached_images:
+                    cached_images[image.name] = None
+                    try:
+                        filepath = self.encode_webp(image, quality)
+                        cached = bpy.data.images.load(filepath, check_existing=True)
+                        cached.colorspace_settings.name = image.colorspace_settings.name
+                        cached.alpha_mode = image.alpha_mode
+                        cached_images[image.name] = cached
+                    except (RuntimeError, OSError):
+                        # Missing or unreadable images are left for the exporter to deal with
+                        pass
+                cached = cached_images[image.name]
+                if cached:
+                    swaps.append((node, image, cached))
+                    node.image = cached
+        return swaps
+
+    @staticmethod
+    def restore(swaps):
+        """Point image nodes back at their original images and drop the cached copies"""
+        cached_images = {}
+        for node, image, cached in swaps:
+            node.image = image
+            cached_images[cached.as_pointer()] = cached
+        for cached in cached_images.values():
+            if cached.users == 0:
+                bpy.data.images.remove(cached)
+
+    @staticmethod
+    def get_toktx(settings):
+        if settings.toktx_path:
+            return bpy.path.abspath(settings.toktx_path)
+        return shutil.which("toktx")
+
+    def add_ktx2(self, filepath, settings):
+        """Embed KTX2 versions of every texture in an exported GLB (KHR_texture_basisu)
+
+        The original images stay as the texture source (or EXT_texture_webp
+        source), so clients without a KTX2 loader keep using them. Returns a list of non-fatal errors.
+        """
+        toktx = TextureCache.get_toktx(settings)
+        if not toktx or not os.path.exists(toktx):
+            return ["KTX2 textures were skipped: toktx (KTX-Software) was not found"]
+
+        glb = GLBFile.load(filepath)
+        gltf = glb.gltf
+        if not gltf.get("textures"):
+            return []
+
+        # Color textures are sRGB, everything else is data. Normal maps need UASTC to hold up
+        srgb_textures = set()
+        normal_textures = set()
+        for material in gltf.get("materials", []):
+            pbr = material.get("pbrMetallicRoughness", {})
+            for info in (pbr.get("baseColorTexture"), material.get("emissiveTexture")):
+                if info:
+                    srgb_textures.add(info["index"])
+            if material.get("normalTexture"):
+                normal_textures.add(material["normalTexture"]["index"])
+
+        errors = []
+        encoded = {}
+        for index, texture in enumerate(gltf["textures"]):
+            source = GLBFile.get_texture_source(texture)
+            if source is None or "bufferView" not in gltf["images"][source]:
+                continue
+            srgb = index in srgb_textures
+            encoding = 'UASTC' if index in normal_textures else settings.ktx2_encoding
+            variant = (source, srgb, encoding)
+            if variant not in encoded:
+                image = gltf["images"][source]
+                data = glb.read_view(image["bufferView"])
+                try:
+                    ktx2_filepath = self.encode_ktx2(data, image.get("mimeType", ""), srgb, encoding, toktx)
+                except (RuntimeError, OSError, subprocess.CalledProcessError) as e:
+                    errors.append(f"KTX2 encoding failed for image {image.get('name', source)}: {e}")
+                    encoded[variant] = None
+                    continue
+                with open(ktx2_filepath, "rb") as f:
+                    view = glb.add_view(f.read())
+                gltf["images"].append({"mimeType": "image/ktx2", "bufferView": view})
+                encoded[variant] = len(gltf["images"]) - 1
+            if encoded[variant] is not None:
+                texture.setdefault("extensions", {})["KHR_texture_basisu"] = {"source": encoded[variant]}
+
+        if any(value is not None for value in encoded.values()):
+            glb.use_extension("KHR_texture_basisu")
+            glb.save(filepath)
+        return errors
+
+    def encode_ktx2(self, data, mime_type, srgb, encoding, toktx):
+        """Path of the cached KTX2 encoding of image bytes, running toktx on a miss"""
+        key = hashlib.blake2b(data + f":ktx2:{encoding}:{srgb}".encode(), digest_size=20).hexdigest()
+        filepath = self.get(key, "ktx2")
+        if filepath:
+            return filepath
+
+        # toktx reads PNG and JPEG, anything else is converted to PNG by Blender first
+        ext = {"image/png": "png", "image/jpeg": "jpg"}.get(mime_type)
+        source_filepath = self.tmp_filepath(ext or "webp")
+        with open(source_filepath, "wb") as f:
+            f.write(data)
+        tmp_filepath = self.tmp_filepath("ktx2")
+        try:
+            if ext is None:
+                png_filepath = self.tmp_filepath("png")
+                image = bpy.data.images.load(source_filepath)
+                try:
+                    image.filepath_raw = png_filepath
+                    image.file_format = 'PNG'
+                    image.save()
+                finally:
+                    bpy.data.images.remove(image)
+                os.remove(source_filepath)
+                source_filepath = png_filepath
+            command = [toktx, "--t2", "--genmipmap", "--assign_oetf", "srgb" if srgb else "linear"]
+            if encoding == 'UASTC':
+                command += ["--encode", "uastc", "--zcmp", "18"]
+            else:
+                command += ["--encode", "etc1s", "--clevel", "2", "--qlevel", "128"]
+            command += [tmp_filepath, source_filepath]
+            subprocess.run(command, check=True, capture_output=True)
+        finally:
+            if os.path.exists(source_filepath):
+                os.remove(source_filepath)
+        return self.put(key, "ktx2", tmp_filepath)
+
+class ProfileSettings:
+    """Export settings with the values of an export profile on top"""
+
+    def __init__(self, settings, profile):
+        self.settings = settings
+        self.profile = profile
+
+    def __getattr__(self, name):
+        if name in self.profile:
+            return self.profile[name]
+        return getattr(self.settings, name)
+
+class ExportTiers:
+    """Writes lower resolution tiers of exported GLBs next to them for smaller devices
+
+    The main file is the desktop tier, written with the scene's export
+    settings. Every other tier starts from a copy of what the glTF exporter
+    wrote: embedded images over the profile's maximum size are halved until
+    they fit and re-encoded in their own format, then the profile's mesh
+    settings and texture format are applied like a normal export. Source
+    images are decoded once and kept for the run (up to MAX_DECODED_BYTES), so
+    tiers and roots that share a texture don't decode it again, and scaled
+    encodings are reused too. Tier files are named <name>.<tier>.glb and
+    tiers.json maps each asset to its tier files.
+    """
+
+    MANIFEST_FILENAME = "tiers.json"
+    MAX_DECODED_BYTES = 512 * 1024 * 1024
+
+    # Tiers below desktop, by texture_tiers item
+    TIERS = ('MOBILE', 'LOW')
+
+    # Blender file format and extension of each embedded image type
+    IMAGE_FORMATS = {
+        "image/png": ('PNG', "png"),
+        "image/jpeg": ('JPEG', "jpg"),
+        "image/webp": ('WEBP', "webp"),
+    }
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.directory = tempfile.mkdtemp(prefix="hyperfy_tiers_")
+        self.decoded = {}
+        self.decoded_bytes = 0
+        self.encoded = {}
+        self.cache = None
+
+    @staticmethod
+    def from_settings(settings):
+        """Tiers enabled in settings, or None when only the main file is written"""
+        tiers = [tier for tier in ExportTiers.TIERS if tier in settings.texture_tiers]
+        return ExportTiers(tiers) if tiers else None
+
+    @staticmethod
+    def get_profile(settings, tier):
+        """Export profile of a tier, from its tier_<tier>_* settings"""
+        prefix = f"tier_{tier.lower()}_"
+        return {
+            "max_texture": getattr(settings, prefix + "texture_size"),
+            "texture_quality": getattr(settings, prefix + "texture_quality"),
+            "texture_format": getattr(settings, prefix + "texture_format"),
+            "mesh_optimize": getattr(settings, prefix + "mesh_optimize"),
+            "mesh_quantize": getattr(settings, prefix + "mesh_quantize"),
+        }
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.decoded.clear()
+        self.encoded.clear()
+
+    @staticmethod
+    def get_filepath(filepath, tier):
+        base, ext = os.path.splitext(filepath)
+        return f"{base}.{tier.lower()}{ext}"
+
+    def copy_sources(self, filepath):
+        """Copy the file the glTF exporter wrote for each tier, before it is post-processed"""
+        for tier in self.tiers:
+            shutil.copyfile(filepath, ExportTiers.get_filepath(filepath, tier))
+
+    def process(self, filepath, settings, cache=None):
+        """Apply each tier's profile to its copy of filepath
+
+        Returns the tier filepaths by tier and a list of non-fatal errors.
+        """
+        errors = []
+        filepaths = {}
+        name = os.path.basename(filepath)
+        for tier in self.tiers:
+            tier_filepath = ExportTiers.get_filepath(filepath, tier)
+            tier_settings = ProfileSettings(settings, ExportTiers.get_profile(settings, tier))
+            try:
+                self.scale_images(tier_filepath, tier_settings.max_texture, tier_settings.texture_quality)
+                if tier_settings.mesh_optimize or tier_settings.mesh_quantize != 'NONE':
+                    MeshOptimizer.optimize_file(tier_filepath, tier_settings)
+                if settings.animation_optimize:
+                    AnimationOptimizer.optimize_file(tier_filepath, settings)
+            except Exception as e:
+                errors.append(f"{tier.lower()} tier failed for '{name}': {e}")
+                os.remove(tier_filepath)
+                continue
+            if tier_settings.texture_format == 'KTX2':
+                errors.extend(self.get_cache(cache).add_ktx2(tier_filepath, tier_settings))
+            filepaths[tier.lower()] = tier_filepath
+        return filepaths, errors
+
+    def get_cache(self, cache):
+        """The export's texture cache, or a throwaway one shared by the run's tiers"""
+        if cache:
+            return cache
+        if not self.cache:
+            self.cache = TextureCache(os.path.join(self.directory, "ktx2"), 0, persistent=False)
+        return self.cache
+
+    def scale_images(self, filepath, max_size, quality):
+        """Replace embedded images larger than max_size with scaled down encodings"""
+        glb = GLBFile.load(filepath)
+        changed = False
+        for image in glb.gltf.get("images", []):
+            mime_type = image.get("mimeType")
+            if "bufferView" not in image or mime_type not in ExportTiers.IMAGE_FORMATS:
+                continue
+            data = glb.read_view(image["bufferView"])
+            size = GLBFile.get_image_size(data)
+            if not size or max(size) <= max_size:
+                continue
+            with open(self.encode_scaled(data, mime_type, size, max_size, quality), "rb") as f:
+                image["bufferView"] = glb.add_view(f.read())
+            changed = True
+        if changed:
+            glb.compact()
+            glb.save(filepath)
+
+    def decode(self, key, data, mime_type):
+        """RGBA pixels of image bytes as uint8, rows from the bottom, decoded once per run"""
+        pixels = self.decoded.get(key)
+        if pixels is not None:
+            return pixels
+        source_filepath = os.path.join(self.directory, f"{key}.{ExportTiers.IMAGE_FORMATS[mime_type][1]}")
+        with open(source_filepath, "wb") as f:
+            f.write(data)
+        image = bpy.data.images.load(source_filepath)
+        try:
+            # Keep the stored values, normal and packed maps aren't colors
+            image.colorspace_settings.name = 'Non-Color'
+            width, height = image.size
+            values = np.empty(width * height * 4, np.float32)
+            image.pixels.foreach_get(values)
+        finally:
+            bpy.data.images.remove(image)
+            os.remove(source_filepath)
+        pixels = (values.reshape(height, width, 4) * 255 + 0.5).astype(np.uint8)
+
+        # Oldest decoded images are dropped first
+        while self.decoded and self.decoded_bytes + pixels.nbytes > ExportTiers.MAX_DECODED_BYTES:
+            oldest = next(iter(self.decoded))
+            self.decoded_bytes -= self.decoded.pop(oldest).nbytes
+        self.decoded[key] = pixels
+        self.decoded_bytes += pixels.nbytes
+        return pixels
+
+    @staticmethod
+    def halve(pixels):
+        """Average 2x2 blocks, an odd last row or column is dropped"""
+        height, width = pixels.shape[:2]
+        if height > 1:
+            pixels = pixels[:height // 2 * 2].reshape(height // 2, 2, -1, 4).mean(axis=1)
+        if width > 1:
+            pixels = pixels[:, :width // 2 * 2].reshape(pixels.shape[0], width // 2, 2, 4).mean(axis=2)
+        return pixels
+
+    def encode_scaled(self, data, mime_type, size, max_size, quality):
+        """Path of image bytes halved until they fit max_size and encoded in the same format"""
+        key = hashlib.blake2b(data, digest_size=20).hexdigest()
+        width, height = size
+        steps = 0
+        while max(width, height) > max_size:
+            width, height = max(1, width // 2), max(1, height // 2)
+            steps += 1
+        variant = (key, steps, quality)
+        if variant in self.encoded:
+            return self.encoded[variant]
+
+        pixels = self.decode(key, data, mime_type).astype(np.float32)
+        for _ in range(steps):
+            pixels = ExportTiers.halve(pixels)
+        height, width = pixels.shape[:2]
+
+        file_format, ext = ExportTiers.IMAGE_FORMATS[mime_type]
+        filepath = os.path.join(self.directory, f"{key}_{width}x{height}_{quality}.{ext}")
+        image = bpy.data.images.new(f"{key}_{width}x{height}", width, height, alpha=True)
+        try:
+            image.colorspace_settings.name = 'Non-Color'
+            image.pixels.foreach_set((pixels / 255).ravel())
+            image.filepath_raw = filepath
+            image.file_format = file_format
+            try:
+                image.save(quality=quality)
+            except TypeError:
+                # Older versions can't pass a quality
+                image.save()
+        finally:
+            bpy.data.images.remove(image)
+        self.encoded[variant] = filepath
+        return filepath
+
+    @staticmethod
+    def get_files(entries):
+        """(name, filepath) pairs of the tier files of exported entries"""
+        return [(f"{entry['name']}.{tier}", tier_entry["file"]) for entry in entries for tier, tier_entry in entry.get("tiers", {}).items()]
+
+    @staticmethod
+    def write_manifest(export_directory, report, settings):
+        """Add the exported entries' tiers to tiers.json in export_directory, returns its path or None
+
+        Each asset lists its files by tier with their size and estimated
+        texture memory, so clients can pick the largest tier their device fits.
+        """
+        entries = [entry for entry in report["exported"] if "tiers" in entry]
+        if not entries:
+            return None
+        filepath = os.path.join(export_directory, ExportTiers.MANIFEST_FILENAME)
+        manifest = {"assets": {}}
+        if os.path.exists(filepath):
+            try:
+                with open(filepath) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        manifest["tiers"] = {"desktop": {"max_texture": None, "texture_format": settings.texture_format}}
+        for tier in ExportTiers.TIERS:
+            if tier in settings.texture_tiers:
+                profile = ExportTiers.get_profile(settings, tier)
+                manifest["tiers"][tier.lower()] = {"max_texture": profile["max_texture"], "texture_format": profile["texture_format"]}
+        for entry in entries:
+            files = {"desktop": entry}
+            files.update(entry["tiers"])
+            manifest["assets"][entry["name"]] = {
+                tier: {
+                    "file": os.path.relpath(tier_entry["file"], export_directory).replace(os.sep, "/"),
+                    "bytes": tier_entry.get("bytes", 0),
+                    "texture_bytes": tier_entry.get("texture_bytes", 0),
+                }
+                for tier, tier_entry in files.items()
+            }
+        with open(filepath, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return filepath
+
+class HyperfyCLI:
+    """Headless command line entry point for exporting on build machines
+
+    blender -b scene.blend --python blender-addon.py -- export --mode individual --output ./out
+
+    Export settings saved in the blend file are used as defaults, every setting
+    can be overridden with its own flag (eg. --parallel, --texture-quality 90).
+    Exits with 0 on success, 1 when anything failed and 2 on bad arguments.
+    """
+
+    COMMAND = "export"
+
+    @staticmethod
+    def build_parser():
+        parser = argparse.ArgumentParser(
+            prog="blender -b <file.blend> --python blender-addon.py -- export",
+            description="Export Hyperfy assets without the Blender UI",
+        )
+        parser.add_argument("--mode", choices=["all", "individual"], default="individual", help="export the whole scene into one GLB, or each root object separately")
+        parser.add_argument("--output", help="output directory (default: next to the blend file)")
+        parser.add_argument("--report", help="where to write the JSON report (default: <output>/export_report.json)")
+        HyperfyCLI.add_setting_arguments(parser)
+        return parser
+
+    @staticmethod
+    def add_setting_arguments(parser):
+        """Every export setting gets its own flag"""
+        for prop in HyperfyExportSettings.bl_rna.properties:
+            if prop.identifier in ("rna_type", "name"):
+                continue
+            flag = "--" + prop.identifier.replace("_", "-")
+            if prop.type == 'BOOLEAN':
+                parser.add_argument(flag, dest=prop.identifier, action=argparse.BooleanOptionalAction, default=None, help=prop.description)
+            elif prop.type == 'INT':
+                parser.add_argument(flag, dest=prop.identifier, type=int, help=prop.description)
+            elif prop.type == 'FLOAT':
+                parser.add_argument(flag, dest=prop.identifier, type=float, help=prop.description)
+            elif prop.type == 'ENUM' and prop.is_enum_flag:
+                parser.add_argument(flag, dest=prop.identifier, nargs="*", choices=[item.identifier for item in prop.enum_items], help=prop.description)
+            elif prop.type == 'ENUM':
+                parser.add_argument(flag, dest=prop.identifier, choices=[item.identifier for item in prop.enum_items], help=prop.description)
+            elif prop.type == 'STRING':
+                parser.add_argument(flag, dest=prop.identifier, help=prop.description)
+
+    @staticmethod
+    def apply_settings(args, settings):
+        """Set the settings given on the command line, returns them as a dict"""
+        overrides = {}
+        for prop in HyperfyExportSettings.bl_rna.properties:
+            value = getattr(args, prop.identifier, None)
+            if value is not None:
+                # Enum flags take sets, lists stay in the overrides so they can be written as JSON
+                setattr(settings, prop.identifier, set(value) if isinstance(value, list) else value)
+                overrides[prop.identifier] = value
+        return overrides
+
+    @staticmethod
+    def main(argv):
+        try:
+            args = HyperfyCLI.build_parser().parse_args(argv)
+        except SystemExit as e:
+            return e.code
+
+        context = bpy.context
+        settings = context.scene.hyperfy_export
+        HyperfyCLI.apply_settings(args, settings)
+
+        output = os.path.abspath(args.output) if args.output else None
+        try:
+            if args.mode == "all":
+                directory = output or HyperfyExporter.get_base_directory()
+                os.makedirs(directory, exist_ok=True)
+                report = HyperfyExporter.export_all(context, HyperfyExporter.get_export_all_filepath(directory), settings)
+            else:
+                directory = output or HyperfyExporter.get_export_directory()
+                report = HyperfyExporter.run_individual(context, directory, settings)
+        except Exception as e:
+            directory = output or HyperfyExporter.get_base_directory()
+            report = HyperfyExporter.new_report(directory)
+            report["failed"].append({"name": bpy.path.basename(bpy.data.filepath), "error": str(e)})
+
+        report["mode"] = args.mode
+        report_filepath = args.report or os.path.join(report["directory"], HyperfyExporter.REPORT_FILENAME)
+        os.makedirs(os.path.dirname(os.path.abspath(report_filepath)), exist_ok=True)
+        with open(report_filepath, "w") as f:
+            json.dump(report, f, indent=2)
+
+        for error in report["errors"]:
+            print(f"hyperfy: error: {error}")
+        for warning in report["warnings"]:
+            print(f"hyperfy: warning: {warning}")
+        for failure in report["failed"]:
+            print(f"hyperfy: failed: {failure['name']}: {failure['error']}")
+        print(f"hyperfy: exported {len(report['exported'])}, unchanged {len(report['unchanged'])}, skipped {len(report['skipped'])}, failed {len(report['failed'])}")
+        if settings.push:
+            print(f"hyperfy: uploaded {len(report['uploaded'])}, already on server {len(report['existing'])}")
+
+        return 1 if report["failed"] else 0
+
+class HyperfyBenchmark:
+    """Reproducible benchmark of the export pipeline on generated scenes
+
+    blender -b --factory-startup --python blender-addon.py -- benchmark --roots 200 --repeat 3
+
+    Every run happens in a fresh background Blender process, which builds a
+    seeded synthetic scene (roots, triangles, materials, textures, splatmap
+    terrains and LOD groups) and exports it. The wall time, peak RSS and output
+    bytes of each run are written to JSON and compared against a baseline,
+    exiting with 1 when a metric is worse than the baseline by more than the
+    tolerance.
+    """
+
+    COMMAND = "benchmark"
+    RUN_FLAG = "--hyperfy-benchmark-run"
+    METRICS = ("time", "peak_rss", "bytes")
+
+    @staticmethod
+    def build_parser():
+        parser = argparse.ArgumentParser(
+            prog="blender -b --factory-startup --python blender-addon.py -- benchmark",
+            description="Benchmark Hyperfy exports on generated scenes",
+        )
+        parser.add_argument("--roots", type=int, default=50, help="number of root objects")
+        parser.add_argument("--triangles", type=int, default=2000, help="triangles per root object")
+        parser.add_argument("--materials", type=int, default=8, help="number of materials shared by the roots")
+        parser.add_argument("--textures", type=int, default=4, help="number of base color textures shared by the materials")
+        parser.add_argument("--texture-size", type=int, default=512, help="width and height of each texture")
+        parser.add_argument("--splatmaps", type=int, default=1, help="number of splatmap terrains")
+        parser.add_argument("--lods", type=int, default=5, help="number of roots turned into LOD groups")
+        parser.add_argument("--seed", type=int, default=0, help="random seed for the generated scene")
+        parser.add_argument("--modes", nargs="+", choices=["all", "individual"], default=["all", "individual"], help="export modes to run")
+        parser.add_argument("--repeat", type=int, default=3, help="runs per mode, the median time is compared")
+        parser.add_argument("--output", default=os.path.join(tempfile.gettempdir(), "hyperfy_benchmark"), help="directory for exports and results")
+        parser.add_argument("--baseline", help="baseline results to compare against")
+        parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+        parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression before failing")
+        HyperfyCLI.add_setting_arguments(parser)
+        return parser
+
+    @staticmethod
+    def get_peak_rss():
+        """Peak resident memory of this process and of its finished children in bytes (None on Windows)"""
+        try:
+            import resource
+        except ImportError:
+            return None, None
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        unit = 1 if sys.platform == "darwin" else 1024
+        return (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+        )
+
+    @staticmethod
+    def make_grid(name, triangles, rng):
+        """Bumpy grid mesh with about the given number of triangles and UVs"""
+        n = max(1, int((triangles / 2) ** 0.5))
+        xs = np.linspace(-1.0, 1.0, n + 1)
+        x, y = np.meshgrid(xs, xs)
+        z = 0.1 * np.sin(x * rng.uniform(2, 8)) * np.cos(y * rng.uniform(2, 8))
+        coords = np.stack((x, y, z), axis=-1).reshape(-1, 3)
+        index = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+        quads = np.stack((index[:-1, :-1], index[:-1, 1:], index[1:, 1:], index[1:, :-1]), axis=-1).reshape(-1, 4)
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata(coords.tolist(), [], quads.tolist())
+        uv = (coords[quads.ravel()][:, :2] + 1) / 2
+        mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", uv.astype(np.float32).ravel())
+        mesh.update()
+        return mesh
+
+    @staticmethod
+    def make_image(name, size, rng):
+        image = bpy.data.images.new(name, size, size)
+        pixels = rng.random((size, size, 4), dtype=np.float32)
+        pixels[:, :, 3] = 1
+        image.pixels.foreach_set(pixels.ravel())
+        return image
+
+    @staticmethod
+    def make_splatmap_material(name, images):
+        """Material in the layout SplatmapProcessor reads, labelled image nodes with mapping scales"""
+        material = bpy.data.materials.new(name)
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        bsdf = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+        for index, label in enumerate(('SPLAT', 'RED', 'GREEN', 'BLUE')):
+            texture = nodes.new('ShaderNodeTexImage')
+            texture.label = label
+            texture.image = images[index % len(images)]
+            if label == 'SPLAT':
+                material.node_tree.links.new(texture.outputs['Color'], bsdf.inputs['Base Color'])
+            else:
+                mapping = nodes.new('ShaderNodeMapping')
+                mapping.inputs['Scale'].default_value = (8.0, 8.0, 8.0)
+                material.node_tree.links.new(mapping.outputs['Vector'], texture.inputs['Vector'])
+        return material
+
+    @staticmethod
+    def generate_scene(context, params):
+        """Replace the scene's objects with a synthetic scene built from params"""
+        for obj in list(bpy.data.objects):
+            bpy.data.objects.remove(obj)
+        rng = np.random.default_rng(params["seed"])
+        scene = context.scene
+
+        images = [HyperfyBenchmark.make_image(f"bench_texture_{i}", params["texture_size"], rng) for i in range(params["textures"])]
+        materials = []
+        for i in range(max(1, params["materials"])):
+            material = bpy.data.materials.new(f"bench_material_{i}")
+            material.use_nodes = True
+            bsdf = next(node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED')
+            bsdf.inputs['Base Color'].default_value = (*rng.random(3), 1.0)
+            if images:
+                texture = material.node_tree.nodes.new('ShaderNodeTexImage')
+                texture.image = images[i % len(images)]
+                material.node_tree.links.new(texture.outputs['Color'], bsdf.inputs['Base Color'])
+            materials.append(material)
+
+        # Roots on a grid, 10m apart
+        columns = max(1, int(params["roots"] ** 0.5))
+        roots = []
+        for i in range(params["roots"]):
+            obj = bpy.data.objects.new(f"bench_root_{i}", HyperfyBenchmark.make_grid(f"bench_mesh_{i}", params["triangles"], rng))
+            obj.data.materials.append(materials[i % len(materials)])
+            obj.location = ((i % columns) * 10.0, (i // columns) * 10.0, 0.0)
+            scene.collection.objects.link(obj)
+            roots.append(obj)
+
+        # Splatmap terrains below the roots
+        splat_images = images or [HyperfyBenchmark.make_image("bench_splat", 64, rng)]
+        for i in range(params["splatmaps"]):
+            obj = bpy.data.objects.new(f"bench_terrain_{i}", HyperfyBenchmark.make_grid(f"bench_terrain_{i}", params["triangles"] * 4, rng))
+            obj.data.materials.append(HyperfyBenchmark.make_splatmap_material(f"bench_splatmap_{i}", splat_images))
+            obj.location = (i * 50.0, 0.0, -1.0)
+            obj.scale = (25.0, 25.0, 1.0)
+            obj["exp_splatmap"] = True
+            scene.collection.objects.link(obj)
+
+        HyperfyIndex.dirty = True
+        context.view_layer.update()
+        for obj in roots[:params["lods"]]:
+            LODGenerator.generate(context, obj, 2, 0.5, 1.0, 4.0, 1080, 70.0)
+
+    @staticmethod
+    def run(spec_path):
+        """Entry point inside a benchmark process, returns the process exit code"""
+        with open(spec_path) as f:
+            spec = json.load(f)
+        context = bpy.context
+        settings = context.scene.hyperfy_export
+        for identifier, value in spec["settings"].items():
+            setattr(settings, identifier, set(value) if isinstance(value, list) else value)
+
+        start = time.perf_counter()
+        HyperfyBenchmark.generate_scene(context, spec["params"])
+        generate_time = time.perf_counter() - start
+
+        directory = spec["directory"]
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        start = time.perf_counter()
+        if spec["mode"] == "all":
+            report = HyperfyExporter.export_all(context, os.path.join(directory, "benchmark.glb"), settings)
+        else:
+            report = HyperfyExporter.run_individual(context, directory, settings)
+        export_time = time.perf_counter() - start
+
+        files = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names if name.endswith((".glb", ".hyp"))]
+        peak_rss, peak_rss_children = HyperfyBenchmark.get_peak_rss()
+        stages = {}
+        for entry in report["exported"]:
+            for stage, seconds in entry.get("stages", {}).items():
+                stages[stage] = round(stages.get(stage, 0) + seconds, 4)
+        result = {
+            "mode": spec["mode"],
+            "time": round(export_time, 4),
+            "generate_time": round(generate_time, 4),
+            "peak_rss": peak_rss,
+            "peak_rss_children": peak_rss_children,
+            "bytes": sum(os.path.getsize(path) for path in files),
+            "files": len(files),
+            "stages": stages,
+            "failed": report["failed"],
+        }
+        with open(spec["result"], "w") as f:
+            json.dump(result, f)
+        return 1 if report["failed"] else 0
+
+    @staticmethod
+    def summarize(runs, modes):
+        """Median time and the largest memory and output size per mode"""
+        summary = {}
+        for mode in modes:
+            mode_runs = [run for run in runs if run["mode"] == mode]
+            if not mode_runs:
+                continue
+            times = sorted(run["time"] for run in mode_runs)
+            rss = [run["peak_rss"] for run in mode_runs if run["peak_rss"] is not None]
+            summary[mode] = {
+                "time": times[len(times) // 2],
+                "peak_rss": max(rss) if rss else None,
+                "bytes": max(run["bytes"] for run in mode_runs),
             }
+        return summary
+
+    @staticmethod
+    def compare(summary, baseline, tolerance):
+        """Lines describing each metric against the baseline, and whether any regressed"""
+        lines = []
+        regressed = False
+        for mode, metrics in summary.items():
+            base = baseline.get("summary", {}).get(mode)
+            for metric in HyperfyBenchmark.METRICS:
+                value = metrics[metric]
+                if not base or value is None or not base.get(metric):
+                    lines.append(f"{mode} {metric}: {value}")
+                    continue
+                change = value / base[metric] - 1
+                worse = change > tolerance
+                regressed = regressed or worse
+                lines.append(f"{mode} {metric}: {value} ({change:+.1%} vs baseline){' REGRESSION' if worse else ''}")
+        return lines, regressed
+
+    @staticmethod
+    def main(argv):
+        try:
+            args = HyperfyBenchmark.build_parser().parse_args(argv)
+        except SystemExit as e:
+            return e.code
+        if not ParallelExporter.is_available():
+            print("hyperfy: benchmark needs a Blender executable")
+            return 2
+
+        params = {
+            "roots": args.roots,
+            "triangles": args.triangles,
+            "materials": args.materials,
+            "textures": args.textures,
+            "texture_size": args.texture_size,
+            "splatmaps": args.splatmaps,
+            "lods": args.lods,
+            "seed": args.seed,
+        }
+        settings = HyperfyCLI.apply_settings(args, bpy.context.scene.hyperfy_export)
+        output = os.path.abspath(args.output)
+        os.makedirs(output, exist_ok=True)
+
+        runs = []
+        for iteration in range(args.repeat):
+            for mode in args.modes:
+                spec_path = os.path.join(output, f"run_{mode}.json")
+                result_path = os.path.join(output, f"run_{mode}.result.json")
+                log_path = os.path.join(output, f"run_{mode}.log")
+                with open(spec_path, "w") as f:
+                    json.dump({"params": params, "settings": settings, "mode": mode, "directory": os.path.join(output, mode), "result": result_path}, f)
+                if os.path.exists(result_path):
+                    os.remove(result_path)
+                command = [
+                    bpy.app.binary_path,
+                    "--background",
+                    "--factory-startup",
+                    "--python-exit-code", "1",
+                    "--python", os.path.abspath(__file__),
+                    "--",
+                    HyperfyBenchmark.RUN_FLAG, spec_path,
+                ]
+                with open(log_path, "w") as log:
+                    returncode = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT)
+                if not os.path.exists(result_path):
+                    print(f"hyperfy: benchmark run failed with code {returncode}: {ParallelExporter.read_log_tail(log_path)}")
+                    return 1
+                with open(result_path) as f:
+                    run = json.load(f)
+                print(f"hyperfy: {mode} #{iteration + 1}: {run['time']:.2f}s, {ExportProfiler.format_bytes(run['bytes'])}")
+                runs.append(run)
+
+        results = {
+            "params": params,
+            "settings": settings,
+            "blender": bpy.app.version_string,
+            "platform": sys.platform,
+            "runs": runs,
+            "summary": HyperfyBenchmark.summarize(runs, args.modes),
+        }
+        with open(os.path.join(output, "benchmark.json"), "w") as f:
+            json.dump(results, f, indent=2)
+
+        if args.baseline and args.save_baseline:
+            with open(args.baseline, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"hyperfy: saved baseline to {args.baseline}")
+            return 0
+
+        baseline = {}
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            if baseline.get("params") != params:
+                print("hyperfy: warning: baseline was recorded with different scene parameters")
+        lines, regressed = HyperfyBenchmark.compare(results["summary"], baseline, args.tolerance)
+        for line in lines:
+            print(f"hyperfy: {line}")
+        return 1 if regressed else 0
+
+def get_target_objects(context, check):
+    """Return the selected objects plus the active object that pass check, active first"""
+    objects = []
+    active = context.active_object
+    if active is not None and check(active):
+        objects.append(active)
+    for obj in context.selected_objects:
+        if obj is not active and check(obj):
+            objects.append(obj)
+    return objects
+
+def tag_redraw(context, window_manager=None):
+    """Redraw the viewport and properties editors once after a batch edit
+
+    Timer callbacks have no screen in their context, with a window manager every window is redrawn instead.
+    """
+    if window_manager is not None:
+        screens = [window.screen for window in window_manager.windows]
+    elif context.screen is not None:
+        screens = [context.screen]
+    else:
+        return
+    for screen in screens:
+        for area in screen.areas:
+            if area.type in {'VIEW_3D', 'PROPERTIES'}:
+                area.tag_redraw()
+
+def set_node_type(obj, node_type):
+    """Set the node property and drop properties that only apply to the previous node type"""
+    if node_type == NODE_NONE:
+        # Remove the custom property if it exists
+        if "node" in obj:
+            del obj["node"]
             
-            for label, socket_name in connections.items():
-                if label in image_nodes:
-                    # Copy the image node
-                    new_image_node = new_material.node_tree.nodes.new(type='ShaderNodeTexImage')
-                    new_image_node.image = image_nodes[label].image
-                    new_image_node.label = label
-                    
-                    # Special handling for normal map
-                    if label == 'BLUE' and socket_name == 'Normal':
-                        # Add normal map node for proper normal mapping
-                        normal_map = new_material.node_tree.nodes.new(type='ShaderNodeNormalMap')
-                        new_material.node_tree.links.new(new_image_node.outputs['Color'], normal_map.inputs['Color'])
-                        new_material.node_tree.links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                    else:
-                        # Direct connection for other inputs
-                        new_material.node_tree.links.new(new_image_node.outputs['Color'], principled.inputs[socket_name])
-        
-        # Replace material on clone
-        clone.data.materials[0] = new_material
-        
-        # Add scale values as custom properties on the mesh object
-        for label, scale in mapping_scales.items():
-            property_name = f"{label.lower()}_scale"
-            clone[property_name] = scale
-        
-        # Hide original object
-        obj.hide_set(True)
+        # Also remove type property if it exists
+        if "type" in obj:
+            del obj["type"]
+            
+        # Remove collider properties if they exist
+        if "convex" in obj:
+            del obj["convex"]
+        if "trigger" in obj:
+            del obj["trigger"]
+    else:
+        # Add or set the custom property
+        obj["node"] = node_type
         
-        return True, clone
+        # If switching to something other than rigidbody, remove type property
+        if node_type != NODE_RIGIDBODY and "type" in obj:
+            del obj["type"]
+            
+        # If switching to something other than collider, remove collider properties
+        if node_type != NODE_COLLIDER:
+            if "convex" in obj:
+                del obj["convex"]
+            if "trigger" in obj:
+                del obj["trigger"]
     
-    @staticmethod
-    def cleanup_splatmap_clone(clone_data):
-        """Clean up after export by removing clones and restoring originals"""
-        clone, original_obj = clone_data
-        
-        # Remove clone's material first
-        if clone.data.materials and clone.data.materials[0]:
-            material_to_remove = clone.data.materials[0]
-            # Remove the material from all material slots
-            clone.data.materials.clear()
-            # Remove the material from Blender data
-            bpy.data.materials.remove(material_to_remove)
-        
-        # Remove clone's mesh data
-        mesh_to_remove = clone.data
-        
-        # Remove clone object
-        bpy.data.objects.remove(clone)
-        
-        # Remove mesh data
-        bpy.data.meshes.remove(mesh_to_remove)
-        
-        # Unhide original
-        original_obj.hide_set(False)
+    # Notify Blender that the object has been updated
+    obj.update_tag(refresh={'OBJECT'})
+    HyperfyIndex.update(obj)
+
+def is_node_type(obj, node_type):
+    return "node" in obj and obj["node"] == node_type
 
 class OBJECT_OT_node_type_set(Operator):
-    """Set Node Type Property"""
+    """Set Node Type Property on the active and selected objects"""
     bl_idname = "object.node_type_set"
     bl_label = "Set Node Type Property"
     bl_options = {'REGISTER', 'UNDO'}
@@ -181,54 +5779,27 @@ class OBJECT_OT_node_type_set(Operator):
         return context.active_object is not None
     
     def execute(self, context):
-        obj = context.active_object
-        
-        # If switching away from rigidbody, we should also remove any type property
-        was_rigidbody = "node" in obj and obj["node"] == NODE_RIGIDBODY
-        
-        # If switching away from collider, remove collider-specific properties
-        was_collider = "node" in obj and obj["node"] == NODE_COLLIDER
-        
-        if self.node_type == NODE_NONE:
-            # Remove the custom property if it exists
-            if "node" in obj:
-                del obj["node"]
-                
-            # Also remove type property if it exists
-            if "type" in obj:
-                del obj["type"]
-                
-            # Remove collider properties if they exist
-            if "convex" in obj:
-                del obj["convex"]
-            if "trigger" in obj:
-                del obj["trigger"]
-        else:
-            # Add or set the custom property
-            obj["node"] = self.node_type
-            
-            # If switching to something other than rigidbody, remove type property
-            if self.node_type != NODE_RIGIDBODY and "type" in obj:
-                del obj["type"]
-                
-            # If switching to something other than collider, remove collider properties
-            if self.node_type != NODE_COLLIDER:
-                if "convex" in obj:
-                    del obj["convex"]
-                if "trigger" in obj:
-                    del obj["trigger"]
+        # Only apply a node type to objects that can carry it, matching the panel buttons
+        allowed = {
+            NODE_NONE: None,
+            NODE_COLLIDER: {'MESH'},
+            NODE_RIGIDBODY: {'EMPTY'},
+            NODE_LOD: {'EMPTY'},
+            NODE_SNAP: {'EMPTY'},
+        }.get(self.node_type)
+        objects = get_target_objects(context, lambda obj: allowed is None or obj.type in allowed)
         
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+        for obj in objects:
+            set_node_type(obj, self.node_type)
         
-        # Force update of the UI - including the properties panel
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
+        if len(objects) > 1:
+            self.report({'INFO'}, f"Set node type on {len(objects)} objects")
                 
         return {'FINISHED'}
 
 class OBJECT_OT_rigidbody_type_set(Operator):
-    """Set Rigidbody Type Property"""
+    """Set Rigidbody Type Property on the active and selected rigidbodies"""
     bl_idname = "object.rigidbody_type_set"
     bl_label = "Set Rigidbody Type Property"
     bl_options = {'REGISTER', 'UNDO'}
@@ -242,30 +5813,27 @@ class OBJECT_OT_rigidbody_type_set(Operator):
     @classmethod
     def poll(cls, context):
         obj = context.active_object
-        return obj is not None and "node" in obj and obj["node"] == NODE_RIGIDBODY
+        return obj is not None and is_node_type(obj, NODE_RIGIDBODY)
     
     def execute(self, context):
-        obj = context.active_object
-        
-        if self.rb_type == TYPE_STATIC:
-            # Remove the type property if it exists (since static is default)
-            if "type" in obj:
-                del obj["type"]
-        else:
-            # Add or set the type property
-            obj["type"] = self.rb_type
-        
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+        for obj in get_target_objects(context, lambda obj: is_node_type(obj, NODE_RIGIDBODY)):
+            if self.rb_type == TYPE_STATIC:
+                # Remove the type property if it exists (since static is default)
+                if "type" in obj:
+                    del obj["type"]
+            else:
+                # Add or set the type property
+                obj["type"] = self.rb_type
+            
+            # Notify Blender that the object has been updated
+            obj.update_tag(refresh={'OBJECT'})
         
-        # Force update of the UI
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
                 
         return {'FINISHED'}
 
 class OBJECT_OT_collider_property_toggle(Operator):
-    """Toggle Collider Property"""
+    """Toggle Collider Property on the active and selected colliders"""
     bl_idname = "object.collider_property_toggle"
     bl_label = "Toggle Collider Property"
     bl_options = {'REGISTER', 'UNDO'}
@@ -279,34 +5847,28 @@ class OBJECT_OT_collider_property_toggle(Operator):
     @classmethod
     def poll(cls, context):
         obj = context.active_object
-        return obj is not None and "node" in obj and obj["node"] == NODE_COLLIDER
+        return obj is not None and is_node_type(obj, NODE_COLLIDER)
     
     def execute(self, context):
-        obj = context.active_object
-        
-        # If property exists, toggle its value
-        if self.property_name in obj:
-            if obj[self.property_name]:
-                # If true, remove it (to match engine default)
-                del obj[self.property_name]
-            else:
-                # Toggle to true
-                obj[self.property_name] = True
-        else:
-            # Property doesn't exist, set it to true
-            obj[self.property_name] = True
+        # The active object decides the new state so mixed selections end up consistent
+        enable = not context.active_object.get(self.property_name, False)
         
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+        for obj in get_target_objects(context, lambda obj: is_node_type(obj, NODE_COLLIDER)):
+            if enable:
+                obj[self.property_name] = True
+            elif self.property_name in obj:
+                # Remove it to match engine default (false)
+                del obj[self.property_name]
+            
+            # Notify Blender that the object has been updated
+            obj.update_tag(refresh={'OBJECT'})
         
-        # Force update of the UI
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
                 
         return {'FINISHED'}
 
 class OBJECT_OT_mesh_property_toggle(Operator):
-    """Toggle Mesh Property"""
+    """Toggle Mesh Property on the active and selected meshes"""
     bl_idname = "object.mesh_property_toggle"
     bl_label = "Toggle Mesh Property"
     bl_options = {'REGISTER', 'UNDO'}
@@ -323,31 +5885,26 @@ class OBJECT_OT_mesh_property_toggle(Operator):
         return obj is not None and obj.type == 'MESH'
     
     def execute(self, context):
-        obj = context.active_object
+        # The active object decides the new state so mixed selections end up consistent
+        enable = context.active_object.get(self.property_name, True) == False
         
-        # If property exists, toggle its value
-        if self.property_name in obj:
-            # If it's false, delete it to revert to default (true)
-            if obj[self.property_name] == False:
-                del obj[self.property_name]
-            # If it's true already (which shouldn't happen normally), set to false
+        for obj in get_target_objects(context, lambda obj: obj.type == 'MESH'):
+            if enable:
+                # Delete it to revert to default (true)
+                if self.property_name in obj:
+                    del obj[self.property_name]
             else:
                 obj[self.property_name] = False
-        else:
-            # Property doesn't exist (default is true), set it to false 
-            obj[self.property_name] = False
-        
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+            
+            # Notify Blender that the object has been updated
+            obj.update_tag(refresh={'OBJECT'})
         
-        # Force update of the UI
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
                 
         return {'FINISHED'}
 
 class OBJECT_OT_lod_property_toggle(Operator):
-    """Toggle LOD Property"""
+    """Toggle LOD Property on the active and selected LOD groups"""
     bl_idname = "object.lod_property_toggle"
     bl_label = "Toggle LOD Property"
     bl_options = {'REGISTER', 'UNDO'}
@@ -361,33 +5918,330 @@ class OBJECT_OT_lod_property_toggle(Operator):
     @classmethod
     def poll(cls, context):
         obj = context.active_object
-        return obj is not None and "node" in obj and obj["node"] == NODE_LOD
+        return obj is not None and is_node_type(obj, NODE_LOD)
     
     def execute(self, context):
-        obj = context.active_object
+        # The active object decides the new state so mixed selections end up consistent
+        enable = context.active_object.get(self.property_name, True) == False
         
-        # If property exists and is false, remove it to revert to default (true)
-        if self.property_name in obj:
-            if obj[self.property_name] == False:
-                del obj[self.property_name]
-            # If it's set to true explicitly (which shouldn't happen normally), set to false
+        for obj in get_target_objects(context, lambda obj: is_node_type(obj, NODE_LOD)):
+            if enable:
+                # Remove it to revert to default (true)
+                if self.property_name in obj:
+                    del obj[self.property_name]
             else:
                 obj[self.property_name] = False
-        else:
-            # Property doesn't exist (default is true), set it to false
-            obj[self.property_name] = False
-        
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+            
+            # Notify Blender that the object has been updated
+            obj.update_tag(refresh={'OBJECT'})
         
-        # Force update of the UI
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
                 
         return {'FINISHED'}
 
+class HyperfyTagRule(PropertyGroup):
+    """A naming or collection rule that tags matching objects"""
+    pattern: StringProperty(
+        name="Pattern",
+        description="Object name pattern to match, eg. *_col or tree_* (empty matches every name)",
+        default="*_col"
+    )
+    collection: PointerProperty(
+        name="Collection",
+        description="Only match objects inside this collection (optional)",
+        type=bpy.types.Collection
+    )
+    action: EnumProperty(
+        name="Tag",
+        description="Tag applied to matching objects",
+        items=[
+            ('COLLIDER', "Collider", "Tag meshes as colliders"),
+            ('COLLIDER_CONVEX', "Convex Collider", "Tag meshes as convex colliders"),
+            ('TRIGGER', "Trigger", "Tag meshes as trigger colliders"),
+            ('RIGIDBODY', "Rigidbody", "Tag empties as rigidbodies"),
+            ('SNAP', "Snap Point", "Tag empties as snap points"),
+            ('LOD_CHILD', "LOD Level", "Set the LOD max distance and tag the parent empty as a LOD group"),
+            ('NO_SHADOW', "No Shadows", "Disable cast and receive shadows on meshes"),
+            ('SPLATMAP', "Splatmap", "Tag meshes as splatmap terrain"),
+        ],
+        default='COLLIDER'
+    )
+    distance: IntProperty(
+        name="Max Distance",
+        description="LOD max distance for LOD Level rules",
+        default=50,
+        min=0
+    )
+
+class TagRules:
+    """Applies scene tag rules so naming conventions replace clicking through objects one by one.
+    Rules run in list order, a later rule wins where two rules set the same property."""
+
+    @staticmethod
+    def matches(rule, obj, members):
+        if members is not None and obj.name not in members:
+            return False
+        return not rule.pattern or fnmatch.fnmatchcase(obj.name, rule.pattern)
+
+    @staticmethod
+    def apply_rule(rule, obj):
+        """Apply one rule to an object, returns the objects that were changed"""
+        action = rule.action
+        if action in {'COLLIDER', 'COLLIDER_CONVEX', 'TRIGGER'}:
+            if obj.type != 'MESH':
+                return []
+            if not is_node_type(obj, NODE_COLLIDER):
+                set_node_type(obj, NODE_COLLIDER)
+            if action == 'COLLIDER_CONVEX':
+                obj["convex"] = True
+            elif action == 'TRIGGER':
+                obj["trigger"] = True
+            return [obj]
+        if action in {'RIGIDBODY', 'SNAP'}:
+            if obj.type != 'EMPTY':
+                return []
+            node_type = NODE_RIGIDBODY if action == 'RIGIDBODY' else NODE_SNAP
+            if not is_node_type(obj, node_type):
+                set_node_type(obj, node_type)
+            return [obj]
+        if action == 'LOD_CHILD':
+            parent = obj.parent
+            if parent is None or parent.type != 'EMPTY':
+                return []
+            changed = [obj]
+            # Don't override a parent that is already something else, eg. a rigidbody
+            if "node" not in parent:
+                set_node_type(parent, NODE_LOD)
+                changed.append(parent)
+            if not is_node_type(parent, NODE_LOD):
+                return []
+            obj.hyperfy_max_distance = rule.distance
+            return changed
+        if obj.type != 'MESH':
+            return []
+        if action == 'NO_SHADOW':
+            obj["castShadow"] = False
+            obj["receiveShadow"] = False
+        elif action == 'SPLATMAP':
+            obj["exp_splatmap"] = True
+        return [obj]
+
+    @staticmethod
+    def apply(rules, objects):
+        """Apply every rule to the objects, returns the number of objects that were changed"""
+        changed = set()
+        for rule in rules:
+            members = set(o.name for o in rule.collection.all_objects) if rule.collection else None
+            for obj in objects:
+                if TagRules.matches(rule, obj, members):
+                    changed.update(o.name for o in TagRules.apply_rule(rule, obj))
+        for name in changed:
+            obj = bpy.data.objects[name]
+            obj.update_tag(refresh={'OBJECT'})
+            HyperfyIndex.update(obj)
+        return len(changed)
+
+class OBJECT_OT_hyperfy_tag_rule_add(Operator):
+    """Add a tag rule"""
+    bl_idname = "object.hyperfy_tag_rule_add"
+    bl_label = "Add Tag Rule"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        context.scene.hyperfy_tag_rules.add()
+        tag_redraw(context)
+        return {'FINISHED'}
+
+class OBJECT_OT_hyperfy_tag_rule_remove(Operator):
+    """Remove a tag rule"""
+    bl_idname = "object.hyperfy_tag_rule_remove"
+    bl_label = "Remove Tag Rule"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: IntProperty(default=0)
+
+    def execute(self, context):
+        rules = context.scene.hyperfy_tag_rules
+        if 0 <= self.index < len(rules):
+            rules.remove(self.index)
+        tag_redraw(context)
+        return {'FINISHED'}
+
+class OBJECT_OT_hyperfy_tag_rules_apply(Operator):
+    """Tag objects matching the tag rules, in one undo step"""
+    bl_idname = "object.hyperfy_tag_rules_apply"
+    bl_label = "Apply Tag Rules"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    selected_only: BoolProperty(
+        name="Selected Only",
+        description="Only apply the rules to selected objects instead of the whole scene",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.hyperfy_tag_rules) > 0
+
+    def execute(self, context):
+        objects = list(context.selected_objects) if self.selected_only else list(context.scene.objects)
+        count = TagRules.apply(context.scene.hyperfy_tag_rules, objects)
+        tag_redraw(context)
+        self.report({'INFO'}, f"Tag rules changed {count} objects")
+        return {'FINISHED'}
+
+class OBJECT_OT_hyperfy_generate_lods(Operator):
+    """Build a LOD Group from this mesh with decimated levels and max distances from a screen-space error budget"""
+    bl_idname = "object.hyperfy_generate_lods"
+    bl_label = "Generate LODs"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    levels: IntProperty(
+        name="Levels",
+        description="Number of decimated levels to add after the source mesh",
+        default=3,
+        min=1,
+        max=6
+    )
+
+    ratio: FloatProperty(
+        name="Triangle Ratio",
+        description="Fraction of triangles each level keeps from the previous one",
+        default=0.5,
+        min=0.05,
+        max=0.95
+    )
+
+    error_pixels: FloatProperty(
+        name="Error (px)",
+        description="Switch to the next level once its geometric error is smaller than this many pixels on screen",
+        default=1.0,
+        min=0.1,
+        max=32.0
+    )
+
+    cull_pixels: FloatProperty(
+        name="Cull Size (px)",
+        description="Hide the last level once the whole object is smaller than this many pixels on screen",
+        default=4.0,
+        min=0.5,
+        max=256.0
+    )
+
+    screen_height: IntProperty(
+        name="Screen Height",
+        description="Vertical resolution the error budget is measured against",
+        default=1080,
+        min=240
+    )
+
+    fov: FloatProperty(
+        name="Field of View",
+        description="Vertical camera field of view in degrees (the client uses 70)",
+        default=70.0,
+        min=10.0,
+        max=120.0
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and "node" not in obj
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        obj = context.active_object
+        if any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+            self.report({'ERROR'}, f"'{obj.name}' is skinned, LODs can't be generated for skinned meshes")
+            return {'CANCELLED'}
+
+        group, chain = LODGenerator.generate(
+            context, obj, self.levels, self.ratio, self.error_pixels,
+            self.cull_pixels, self.screen_height, self.fov
+        )
+
+        # Select the new group
+        bpy.ops.object.select_all(action='DESELECT')
+        group.select_set(True)
+        context.view_layer.objects.active = group
+
+        levels = ", ".join(f"{triangles} tris <= {lod['maxDistance']}m" for lod, triangles, error in chain)
+        self.report({'INFO'}, f"Created '{group.name}': {levels}")
+        return {'FINISHED'}
+
+class OBJECT_OT_hyperfy_bake_lightmaps(Operator):
+    """Bake ambient occlusion and shadows of the static meshes in the selected roots into lightmaps and turn off their realtime shadows"""
+    bl_idname = "object.hyperfy_bake_lightmaps"
+    bl_label = "Bake Lightmaps"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    size: EnumProperty(
+        name="Size",
+        description="Width and height of each root's lightmap",
+        items=[
+            ('512', "512", ""),
+            ('1024', "1024", ""),
+            ('2048', "2048", ""),
+            ('4096', "4096", ""),
+        ],
+        default='1024'
+    )
+
+    samples: IntProperty(
+        name="Samples",
+        description="Cycles samples per pixel",
+        default=64,
+        min=1,
+        max=4096
+    )
+
+    margin: IntProperty(
+        name="Margin",
+        description="Pixels to extend baked islands by, so lower texture mips don't bleed",
+        default=4,
+        min=0,
+        max=64
+    )
+
+    force: BoolProperty(
+        name="Rebake Unchanged",
+        description="Bake roots again even if nothing changed since their last bake",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        roots = []
+        for obj in [context.active_object] + list(context.selected_objects):
+            root = LightmapBaker.get_root(obj)
+            if root not in roots:
+                roots.append(root)
+
+        try:
+            baked, unchanged, count = LightmapBaker.bake_roots(context, roots, int(self.size), self.samples, self.margin, self.force)
+        except (RuntimeError, TypeError) as e:
+            self.report({'ERROR'}, f"Baking failed: {e}")
+            return {'CANCELLED'}
+
+        if not count:
+            self.report({'WARNING'}, "No static meshes to bake")
+            return {'CANCELLED'}
+        tag_redraw(context)
+        self.report({'INFO'}, f"Baked {len(baked)} roots ({count} meshes), {len(unchanged)} unchanged")
+        return {'FINISHED'}
+
 class OBJECT_OT_splatmap_toggle(Operator):
-    """Toggle Splatmap Property"""
+    """Toggle Splatmap Property on the active and selected meshes"""
     bl_idname = "object.splatmap_toggle"
     bl_label = "Toggle Splatmap"
     bl_options = {'REGISTER', 'UNDO'}
@@ -398,28 +6252,119 @@ class OBJECT_OT_splatmap_toggle(Operator):
         return obj is not None and obj.type == 'MESH'
     
     def execute(self, context):
-        obj = context.active_object
+        # The active object decides the new state so mixed selections end up consistent
+        enable = context.active_object.get("exp_splatmap", False) != True
         
-        # If property exists and is true, remove it (revert to default false)
-        if "exp_splatmap" in obj:
-            if obj["exp_splatmap"] == True:
-                del obj["exp_splatmap"]
-            else:
-                # If set to false, toggle to true
+        for obj in get_target_objects(context, lambda obj: obj.type == 'MESH'):
+            if enable:
                 obj["exp_splatmap"] = True
-        else:
-            # Property doesn't exist (default is false), set it to true
-            obj["exp_splatmap"] = True
-        
-        # Notify Blender that the object has been updated
-        obj.update_tag(refresh={'OBJECT'})
+            elif "exp_splatmap" in obj:
+                # Remove it to revert to default (false)
+                del obj["exp_splatmap"]
+            
+            # Notify Blender that the object has been updated
+            obj.update_tag(refresh={'OBJECT'})
+            HyperfyIndex.update(obj)
         
-        # Force update of the UI
-        for area in context.screen.areas:
-            area.tag_redraw()
+        tag_redraw(context)
                 
         return {'FINISHED'}
 
+class ExportJob:
+    """A stepped export driven by a modal operator, one root, stage or tile per timer tick
+
+    Closing the steps early runs the exporters' own cleanup, so cancelling
+    removes splatmap clones, fitted colliders and merged meshes the same way
+    a finished export does. Files already written are kept.
+    """
+
+    INTERVAL = 0.01
+
+    # Viewport navigation stays available, anything that could edit the scene waits for the export
+    NAVIGATION_EVENTS = {
+        'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+        'TRACKPADPAN', 'TRACKPADZOOM', 'NDOF_MOTION',
+    }
+
+    # The running job, shown in the panel
+    current = None
+
+    def __init__(self, steps, label):
+        self.steps = steps
+        self.label = label
+        self.started = time.perf_counter()
+        self.progress = None
+        self.timer = None
+
+    @staticmethod
+    def start(context, operator, steps, label):
+        """Run steps from the operator's modal handler"""
+        if ExportJob.current is not None:
+            steps.close()
+            operator.report({'WARNING'}, "An export is already running")
+            return {'CANCELLED'}
+        job = ExportJob(steps, label)
+        wm = context.window_manager
+        job.timer = wm.event_timer_add(ExportJob.INTERVAL, window=context.window)
+        wm.modal_handler_add(operator)
+        wm.progress_begin(0, 100)
+        ExportJob.current = job
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event, operator):
+        if event.type == 'ESC':
+            self.cancel(context)
+            operator.report({'WARNING'}, f"{self.label} cancelled, temporary objects were removed")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'} if event.type in ExportJob.NAVIGATION_EVENTS else {'RUNNING_MODAL'}
+
+        try:
+            self.progress = next(self.steps)
+        except StopIteration as e:
+            self.end(context)
+            operator.report({'INFO'}, self.get_status())
+            return operator.finish(context, e.value)
+        except Exception as e:
+            # The exporters cleaned up on the way out
+            self.end(context)
+            operator.report({'ERROR'}, f"{self.label} failed: {e}")
+            return {'CANCELLED'}
+
+        context.window_manager.progress_update(int(self.get_factor() * 100))
+        context.workspace.status_text_set(f"{self.get_status()}  (Esc to cancel)")
+        tag_redraw(context)
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        """Stop the export, rolling back its temporary changes"""
+        try:
+            self.steps.close()
+        finally:
+            self.end(context)
+
+    def end(self, context):
+        wm = context.window_manager
+        if self.timer is not None:
+            wm.event_timer_remove(self.timer)
+            self.timer = None
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        ExportJob.current = None
+        tag_redraw(context)
+
+    def get_factor(self):
+        if not self.progress or not self.progress["total"]:
+            return 0.0
+        return self.progress["done"] / self.progress["total"]
+
+    def get_status(self):
+        """Current step with the throughput so far"""
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        progress = self.progress or {"done": 0, "total": 0, "label": "Starting", "objects": 0, "bytes": 0}
+        return (f"{self.label}: {progress['label']} ({progress['done']}/{progress['total']}), "
+                f"{progress['objects'] / elapsed:.1f} objects/s, {progress['bytes'] / (1024 * 1024) / elapsed:.2f} MB/s")
+
 class OBJECT_OT_hyperfy_export_all(Operator):
     """Export entire scene as GLB with custom properties enabled and webp textures"""
     bl_idname = "object.hyperfy_export_all"
@@ -428,67 +6373,68 @@ class OBJECT_OT_hyperfy_export_all(Operator):
     
     @classmethod
     def poll(cls, context):
-        # Export button is always available if there's an active object
-        return context.active_object is not None
+        # Export button is available if there are objects in the scene and no export is running
+        return len(context.scene.objects) > 0 and ExportJob.current is None
     
     def execute(self, context):
-        # Get the current blend file path
-        blend_filepath = bpy.data.filepath
-        
-        # If the file hasn't been saved yet, use the temp directory
-        if not blend_filepath:
-            directory = os.path.join(os.path.expanduser("~"), "Documents")
-            filename = "untitled.glb"
+        settings = context.scene.hyperfy_export
+        filepath = HyperfyExporter.get_export_all_filepath()
+
+        report = HyperfyExporter.export_all(context, filepath, settings)
+        return self.finish(context, report)
+
+    def invoke(self, context, event):
+        # From the UI, export step by step so Blender stays responsive and Esc cancels
+        settings = context.scene.hyperfy_export
+        filepath = HyperfyExporter.get_export_all_filepath()
+        return ExportJob.start(context, self, HyperfyExporter.iter_export_all(context, filepath, settings), "Export All")
+
+    def modal(self, context, event):
+        return ExportJob.current.modal(context, event, self)
+
+    def cancel(self, context):
+        ExportJob.current.cancel(context)
+
+    def finish(self, context, report):
+        settings = context.scene.hyperfy_export
+        for error in report["errors"]:
+            self.report({'ERROR'}, error)
+        for warning in report["warnings"]:
+            self.report({'WARNING'}, warning)
+        for failure in report["failed"]:
+            if failure["error"] not in report["errors"]:
+                self.report({'ERROR'}, failure["error"])
+        if report["failed"]:
+            return {'CANCELLED'}
+
+        if settings.tiled:
+            self.report({'INFO'}, f"Exported {len(report['exported'])} tiles to {report['directory']}")
         else:
-            # Use the same directory as the blend file
-            directory = os.path.dirname(blend_filepath)
-            # Use the blend filename but with .glb extension
-            filename = os.path.splitext(os.path.basename(blend_filepath))[0] + ".glb"
-        
-        filepath = os.path.join(directory, filename)
+            self.report({'INFO'}, f"Exported to {report['exported'][0]['file']}")
+        return {'FINISHED'}
 
-        # Process splatmap objects
-        splatmap_objects = SplatmapProcessor.find_splatmap_objects()
-        splatmap_clones = []
-        
-        try:
-            # Process each splatmap object
-            for splatmap_obj in splatmap_objects:
-                success, result = SplatmapProcessor.process_splatmap_object(splatmap_obj)
-                if not success:
-                    self.report({'ERROR'}, result)
-                    return {'CANCELLED'}
-                splatmap_clones.append((result, splatmap_obj))
-            
-            # Perform the export
-            export_params = {
-                'filepath': filepath,
-                'export_format': 'GLB',
-                'export_image_format': 'WEBP',
-                'export_extras': True, # custom properties
-                'export_apply': True, # apply modifiers
-                'use_selection': False,  # entire scene
-                'use_visible': True  # only visible
-            }
+class OBJECT_OT_hyperfy_check_budgets(Operator):
+    """Measure every visible root object against the performance budgets"""
+    bl_idname = "object.hyperfy_check_budgets"
+    bl_label = "Check Budgets"
+    bl_options = {'REGISTER'}
 
-            try:
-                bpy.ops.export_scene.gltf(**export_params)
-            except TypeError as e:
-                # If there's an error about WebP not being found, try without it
-                if "enum \"WEBP\" not found" in str(e):
-                    del export_params['export_image_format']
-                    bpy.ops.export_scene.gltf(**export_params)
-                else:
-                    # If it's some other error, re-raise it
-                    raise e
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.objects) > 0
 
-            self.report({'INFO'}, f"Exported to {filepath}")
-            
-        finally:
-            # Cleanup splatmap clones
-            for clone_data in splatmap_clones:
-                SplatmapProcessor.cleanup_splatmap_clone(clone_data)
+    def execute(self, context):
+        settings = context.scene.hyperfy_export
+        roots = [obj for obj in HyperfyExporter.get_root_objects(context.scene) if obj.visible_get()]
+        results = BudgetValidator.check(context, settings, roots)
+
+        over = [result for result in results if result["over"]]
+        for result in over:
+            self.report({'WARNING'}, f"'{result['name']}' is over budget: {', '.join(result['over'])}")
+        self.report({'INFO'}, f"{len(results) - len(over)} of {len(results)} root objects within budget")
 
+        for area in context.screen.areas:
+            area.tag_redraw()
         return {'FINISHED'}
 
 class OBJECT_OT_hyperfy_export_individual(Operator):
@@ -499,131 +6445,52 @@ class OBJECT_OT_hyperfy_export_individual(Operator):
     
     @classmethod
     def poll(cls, context):
-        # Export button is always available if there are objects in the scene
-        return len(context.scene.objects) > 0
+        # Export button is available if there are objects in the scene and no export is running
+        return len(context.scene.objects) > 0 and ExportJob.current is None
     
     def execute(self, context):
-        # Get the current blend file path
-        blend_filepath = bpy.data.filepath
-        
-        # Create a directory for exported GLBs
-        if not blend_filepath:
-            base_directory = os.path.join(os.path.expanduser("~"), "Documents")
-        else:
-            base_directory = os.path.dirname(blend_filepath)
-        
-        export_directory = os.path.join(base_directory, "exported_glbs")
-        
-        # Create the directory if it doesn't exist
-        if not os.path.exists(export_directory):
-            os.makedirs(export_directory)
-        
-        # Store original selection
-        original_selection = context.selected_objects.copy()
-        original_active = context.active_object
-        
-        # Deselect all objects
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        # Find all root objects (objects with no parent)
-        root_objects = [obj for obj in context.scene.objects if obj.parent is None]
-        
-        # Counter for exported objects
-        exported_count = 0
-        # Counter for skipped objects
-        skipped_count = 0
-        
-        # For each root object
-        for obj in root_objects:
-            # Skip if the root object is hidden in viewport
-            if obj.hide_get():
-                skipped_count += 1
-                continue
-                
-            # Store the original location
-            original_location = obj.location.copy()
-            
-            # Set object position to 0,0,0
-            obj.location = (0, 0, 0)
-            
-            # Select the object and all its children
-            obj.select_set(True)
-            for child in obj.children_recursive:
-                child.select_set(True)
-            
-            # Set as active object
-            context.view_layer.objects.active = obj
-            
-            # Process splatmap objects in selection
-            splatmap_objects_in_selection = []
-            splatmap_clones = []
-            for selected_obj in context.selected_objects:
-                if selected_obj.type == 'MESH' and "exp_splatmap" in selected_obj and selected_obj["exp_splatmap"] == True:
-                    splatmap_objects_in_selection.append(selected_obj)
-            
-            try:
-                # Process splatmap objects
-                for splatmap_obj in splatmap_objects_in_selection:
-                    success, result = SplatmapProcessor.process_splatmap_object(splatmap_obj)
-                    if not success:
-                        self.report({'ERROR'}, result)
-                        continue
-                    splatmap_clones.append((result, splatmap_obj))
-                    # Add clone to selection, remove original from selection
-                    splatmap_obj.select_set(False)
-                    result.select_set(True)
-                
-                # Define export path
-                filepath = os.path.join(export_directory, f"{obj.name}.glb")
-                
-                export_params = {
-                    'filepath': filepath,
-                    'export_format': 'GLB',
-                    'export_image_format': 'WEBP',
-                    'export_extras': True,  # custom properties
-                    'export_apply': True,   # apply modifiers
-                    'use_selection': True,   # only selected objects
-                    'use_visible': True  # only visible
-                }
-                
-                try:
-                    bpy.ops.export_scene.gltf(**export_params)
-                    exported_count += 1
-                except TypeError as e:
-                    # If there's an error about WebP not being found, try without it
-                    if "enum \"WEBP\" not found" in str(e):
-                        del export_params['export_image_format']
-                        bpy.ops.export_scene.gltf(**export_params)
-                        exported_count += 1
-                    else:
-                        # If it's some other error, re-raise it
-                        raise e
-                
-            finally:
-                # Cleanup splatmap clones
-                for clone_data in splatmap_clones:
-                    SplatmapProcessor.cleanup_splatmap_clone(clone_data)
-                    # Restore original selection state
-                    clone_data[1].select_set(True)
-            
-            # Move object back to original position
-            obj.location = original_location
-            
-            # Deselect all objects for the next iteration
-            bpy.ops.object.select_all(action='DESELECT')
-        
-        # Restore original selection
-        for obj in original_selection:
-            obj.select_set(True)
-        if original_active:
-            context.view_layer.objects.active = original_active
-        
-        # Report with additional info about skipped objects
+        settings = context.scene.hyperfy_export
+        export_directory = HyperfyExporter.get_export_directory()
+
+        report = HyperfyExporter.run_individual(context, export_directory, settings)
+        return self.finish(context, report)
+
+    def invoke(self, context, event):
+        # From the UI, export one root at a time so Blender stays responsive and Esc cancels
+        settings = context.scene.hyperfy_export
+        export_directory = HyperfyExporter.get_export_directory()
+        return ExportJob.start(context, self, HyperfyExporter.iter_run_individual(context, export_directory, settings), "Export Individual")
+
+    def modal(self, context, event):
+        return ExportJob.current.modal(context, event, self)
+
+    def cancel(self, context):
+        ExportJob.current.cancel(context)
+
+    def finish(self, context, report):
+        export_directory = report["directory"]
+        for error in report["errors"]:
+            self.report({'ERROR'}, error)
+        for failure in report["failed"]:
+            self.report({'ERROR'}, f"Failed to export '{failure['name']}': {failure['error']}")
+        for warning in report["warnings"]:
+            self.report({'WARNING'}, warning)
+
+        exported_count = len(report["exported"])
+        skipped_count = len(report["skipped"])
+        unchanged_count = len(report["unchanged"])
+
+        # Report with additional info about skipped and unchanged objects
+        notes = []
         if skipped_count > 0:
-            self.report({'INFO'}, f"Exported {exported_count} objects to {export_directory} (Skipped {skipped_count} hidden root objects)")
+            notes.append(f"Skipped {skipped_count} hidden root objects")
+        if unchanged_count > 0:
+            notes.append(f"{unchanged_count} unchanged")
+        if notes:
+            self.report({'INFO'}, f"Exported {exported_count} objects to {export_directory} ({', '.join(notes)})")
         else:
             self.report({'INFO'}, f"Exported {exported_count} objects to {export_directory}")
-        
+
         return {'FINISHED'}
 
 class VIEW3D_PT_hyperfy_panel(Panel):
@@ -798,15 +6665,45 @@ class VIEW3D_PT_hyperfy_panel(Panel):
                 row = layout.row()
                 op = row.operator("object.mesh_property_toggle", text="Receive Shadow", icon='CHECKBOX_HLT' if receive_shadow else 'CHECKBOX_DEHLT')
                 op.property_name = "receiveShadow"
+
+                # Build a LOD Group from this mesh
+                if not is_lod_child:
+                    row = layout.row()
+                    row.operator("object.hyperfy_generate_lods", icon='MOD_DECIM')
                 
                 # Add Splatmap checkbox
                 # is_splatmap = "exp_splatmap" in obj and obj["exp_splatmap"] == True
                 # row = layout.row()
                 # op = row.operator("object.splatmap_toggle", text="Splatmap (Experimental)", icon='CHECKBOX_HLT' if is_splatmap else 'CHECKBOX_DEHLT')
 
+            # Tag rules, applied to the whole scene or the selection in one go
+            layout.separator()
+            layout.label(text="Tag Rules")
+            rules = context.scene.hyperfy_tag_rules
+            for index, rule in enumerate(rules):
+                box = layout.box()
+                row = box.row(align=True)
+                row.prop(rule, "pattern", text="")
+                row.prop(rule, "action", text="")
+                row.operator("object.hyperfy_tag_rule_remove", text="", icon='X').index = index
+                row = box.row(align=True)
+                row.prop(rule, "collection", text="")
+                if rule.action == 'LOD_CHILD':
+                    row.prop(rule, "distance")
+            row = layout.row(align=True)
+            row.operator("object.hyperfy_tag_rule_add", text="Add Rule", icon='ADD')
+            row.operator("object.hyperfy_tag_rules_apply", text="Scene").selected_only = False
+            row.operator("object.hyperfy_tag_rules_apply", text="Selected").selected_only = True
+
             # Add a separator before the Export button
             layout.separator()
             layout.label(text="Export")
+
+            # Summary of tagged objects, from the index
+            counts = HyperfyIndex.get_counts()
+            counts = ", ".join(f"{count} {node_type}" for node_type, count in sorted(counts.items()) if count)
+            if counts:
+                layout.label(text=f"Tagged: {counts}")
             
             # Add the Export buttons at the bottom of the panel
             box = layout.box()
@@ -823,19 +6720,134 @@ class VIEW3D_PT_hyperfy_panel(Panel):
             
             # "Individual" button on the right
             col2.operator("object.hyperfy_export_individual", text="Individual", icon='FILE_TICK')
+
+            # Progress of the running export
+            job = ExportJob.current
+            if job is not None:
+                if hasattr(box, "progress"):
+                    box.progress(factor=job.get_factor(), type='BAR', text=job.get_status())
+                else:
+                    box.label(text=job.get_status())
+                box.label(text="Press Esc to cancel", icon='CANCEL')
+
+            # Individual export options
+            settings = context.scene.hyperfy_export
+            row = box.row()
+            row.prop(settings, "parallel")
+            sub = row.row()
+            sub.enabled = settings.parallel
+            sub.prop(settings, "parallel_workers")
+            box.prop(settings, "incremental")
+            box.prop(settings, "watch")
+            if settings.watch:
+                box.prop(settings, "watch_directory")
+                box.prop(settings, "watch_delay")
+                if WatchExporter.status:
+                    box.label(text=WatchExporter.status, icon='FILE_REFRESH')
+
+            # Texture options
+            box.prop(settings, "texture_quality")
+            box.prop(settings, "texture_format")
+            box.prop(settings, "texture_tiers")
+            for tier in ExportTiers.TIERS:
+                if tier in settings.texture_tiers:
+                    prefix = f"tier_{tier.lower()}_"
+                    for name in ("texture_size", "texture_quality", "texture_format", "mesh_optimize", "mesh_quantize"):
+                        box.prop(settings, prefix + name)
+            ktx2 = settings.texture_format == 'KTX2' or any(getattr(settings, f"tier_{tier.lower()}_texture_format") == 'KTX2' for tier in settings.texture_tiers)
+            if ktx2:
+                box.prop(settings, "ktx2_encoding")
+                box.prop(settings, "toktx_path")
+            box.prop(settings, "texture_cache")
+            if settings.texture_cache:
+                box.prop(settings, "texture_cache_directory")
+                box.prop(settings, "texture_cache_size")
+            box.prop(settings, "mesh_optimize")
+            box.prop(settings, "mesh_quantize")
+            box.prop(settings, "animation_optimize")
+            if settings.animation_optimize:
+                box.prop(settings, "animation_tolerance")
+                box.prop(settings, "animation_quantize")
+            box.prop(settings, "tiled")
+            if settings.tiled:
+                box.prop(settings, "tile_size")
+            box.prop(settings, "package_format")
+            box.prop(settings, "push")
+            if settings.push:
+                box.prop(settings, "push_url")
+                box.prop(settings, "push_workers")
+            box.prop(settings, "gpu_instancing")
+            box.prop(settings, "merge_meshes")
+            if settings.merge_meshes or settings.avatar_mode:
+                box.prop(settings, "atlas_size")
+            box.prop(settings, "avatar_mode")
+            if settings.avatar_mode:
+                col = box.column(align=True)
+                col.prop(settings, "avatar_bones")
+                col.prop(settings, "avatar_influences")
+                col.prop(settings, "avatar_texture_mb")
+                if not AvatarExporter.is_available():
+                    col.label(text="Needs the VRM add-on", icon='ERROR')
+            box.operator("object.hyperfy_bake_lightmaps", icon='RENDER_STILL')
+            box.prop(settings, "budget_mode")
+            if settings.budget_mode != 'OFF':
+                col = box.column(align=True)
+                col.prop(settings, "budget_triangles")
+                col.prop(settings, "budget_draw_calls")
+                col.prop(settings, "budget_texture_mb")
+                col.prop(settings, "budget_bones")
+                box.operator("object.hyperfy_check_budgets", icon='VIEWZOOM')
+
+                # Roots over budget at the last check or export
+                results = BudgetValidator.last_results
+                if results is not None:
+                    over = [result for result in results if result["over"]]
+                    col = box.column(align=True)
+                    if not over:
+                        col.label(text=f"All {len(results)} roots within budget", icon='CHECKMARK')
+                    for result in over[:5]:
+                        col.label(text=f"{result['name']}: {', '.join(result['over'])}", icon='ERROR')
+                    if len(over) > 5:
+                        col.label(text=f"...and {len(over) - 5} more")
+            box.prop(settings, "collider_primitives")
+            box.prop(settings, "collider_hulls")
+            if settings.collider_hulls > 0:
+                box.prop(settings, "collider_hull_triangles")
+            if settings.collider_primitives or settings.collider_hulls > 0:
+                box.prop(settings, "collider_tolerance")
+
+            # Profile of the last export
+            summary = ExportProfiler.last_summary
+            if summary:
+                col = box.column(align=True)
+                col.label(text=f"Last export: {summary['assets']} files, {ExportProfiler.format_bytes(summary['bytes'])}, {summary['time']:.1f}s")
+                col.label(text=f"Triangles: {summary['triangles']:,}  Textures: {ExportProfiler.format_bytes(summary['texture_bytes'])}")
+                if summary.get("animation_bytes_saved"):
+                    col.label(text=f"Animations: {ExportProfiler.format_bytes(summary['animation_bytes_saved'])} saved")
+                if "slowest" in summary:
+                    col.label(text=f"Slowest: {summary['slowest']['name']} ({summary['slowest']['time']:.2f}s)")
+                    col.label(text=f"Largest: {summary['largest']['name']} ({ExportProfiler.format_bytes(summary['largest']['bytes'])})")
                
         else:
             layout.label(text="No object selected")
 
 # Registration
 classes = (
+    HyperfyExportSettings,
     OBJECT_OT_node_type_set,
     OBJECT_OT_rigidbody_type_set,
     OBJECT_OT_collider_property_toggle,
     OBJECT_OT_mesh_property_toggle,
     OBJECT_OT_lod_property_toggle,
+    OBJECT_OT_hyperfy_generate_lods,
+    OBJECT_OT_hyperfy_bake_lightmaps,
     OBJECT_OT_splatmap_toggle,
+    HyperfyTagRule,
+    OBJECT_OT_hyperfy_tag_rule_add,
+    OBJECT_OT_hyperfy_tag_rule_remove,
+    OBJECT_OT_hyperfy_tag_rules_apply,
     OBJECT_OT_hyperfy_export_all, 
+    OBJECT_OT_hyperfy_check_budgets,
     OBJECT_OT_hyperfy_export_individual, 
     VIEW3D_PT_hyperfy_panel,
 )
@@ -853,8 +6865,51 @@ def set_max_distance(self, value):
         self["maxDistance"] = value
     # tag update so the UI refreshes
     self.update_tag(refresh={'OBJECT'})
-    for area in bpy.context.screen.areas:
-        area.tag_redraw()
+    tag_redraw(bpy.context)
+
+@bpy.app.handlers.persistent
+def hyperfy_index_invalidate(*args):
+    # new file or undo/redo, rebuild the index on next use
+    HyperfyIndex.dirty = True
+
+@bpy.app.handlers.persistent
+def hyperfy_index_depsgraph_update(scene, depsgraph):
+    if HyperfyIndex.dirty:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            HyperfyIndex.update(update.id.original)
+        elif isinstance(update.id, (bpy.types.Collection, bpy.types.Scene)):
+            # objects may have been deleted or renamed
+            HyperfyIndex.stale = True
+
+index_handlers = (
+    (bpy.app.handlers.load_post, hyperfy_index_invalidate),
+    (bpy.app.handlers.undo_post, hyperfy_index_invalidate),
+    (bpy.app.handlers.redo_post, hyperfy_index_invalidate),
+    (bpy.app.handlers.depsgraph_update_post, hyperfy_index_depsgraph_update),
+)
+
+@bpy.app.handlers.persistent
+def hyperfy_watch_save_post(*args):
+    # snapshots written by the exporters fire this too, only react to the artist's saves
+    if bpy.app.background:
+        return
+    if args and isinstance(args[-1], str) and os.path.normpath(args[-1]) != os.path.normpath(bpy.data.filepath):
+        return
+    settings = bpy.context.scene.hyperfy_export
+    if settings.watch:
+        WatchExporter.schedule(settings.watch_delay)
+
+@bpy.app.handlers.persistent
+def hyperfy_watch_load_post(*args):
+    # a pending export belongs to the file that was open before
+    WatchExporter.cancel()
+
+watch_handlers = (
+    (bpy.app.handlers.save_post, hyperfy_watch_save_post),
+    (bpy.app.handlers.load_post, hyperfy_watch_load_post),
+)
 
 def register():
     # register our "proxy" property on all Objects
@@ -866,12 +6921,46 @@ def register():
     )
     for cls in classes:
         bpy.utils.register_class(cls)
+    # scene level export settings
+    bpy.types.Scene.hyperfy_export = PointerProperty(type=HyperfyExportSettings)
+    # scene level tag rules
+    bpy.types.Scene.hyperfy_tag_rules = CollectionProperty(type=HyperfyTagRule)
+    # keep the index of tagged objects up to date and watch for saves
+    for handlers, handler in index_handlers + watch_handlers:
+        if handler not in handlers:
+            handlers.append(handler)
+    HyperfyIndex.dirty = True
 
 def unregister():
+    for handlers, handler in index_handlers + watch_handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+    WatchExporter.cancel()
+    if bpy.app.timers.is_registered(WatchExporter.tick):
+        bpy.app.timers.unregister(WatchExporter.tick)
+    del bpy.types.Scene.hyperfy_tag_rules
+    del bpy.types.Scene.hyperfy_export
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     # clean up our proxy property
     del bpy.types.Object.hyperfy_max_distance
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    # Workers load the artist's preferences, which may have already registered the installed add-on
+    if not hasattr(bpy.types.Scene, "hyperfy_export"):
+        register()
+
+    # Arguments after "--" are meant for us, eg. when exporting from the command line
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if ParallelExporter.ADDON_FLAG in argv:
+        ParallelExporter.enable_addon(argv[argv.index(ParallelExporter.ADDON_FLAG) + 1])
+    if ParallelExporter.WORKER_FLAG in argv:
+        sys.exit(ParallelExporter.run_worker(argv[argv.index(ParallelExporter.WORKER_FLAG) + 1]))
+    elif WatchExporter.WORKER_FLAG in argv:
+        sys.exit(WatchExporter.run_worker(argv[argv.index(WatchExporter.WORKER_FLAG) + 1]))
+    elif HyperfyBenchmark.RUN_FLAG in argv:
+        sys.exit(HyperfyBenchmark.run(argv[argv.index(HyperfyBenchmark.RUN_FLAG) + 1]))
+    elif argv and argv[0] == HyperfyCLI.COMMAND:
+        sys.exit(HyperfyCLI.main(argv[1:]))
+    elif argv and argv[0] == HyperfyBenchmark.COMMAND:
+        sys.exit(HyperfyBenchmark.main(argv[1:]))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""Tests for the GLB animation optimizer of the Blender add-on
+
+The add-on imports bpy, so run them with Blender's Python:
+
+    blender -b --factory-startup --python-exit-code 1 --python docs/extras/tests/test_animation_optimizer.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import importlib.util
+
+import numpy as np
+
+ADDON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "blender-addon.py")
+spec = importlib.util.spec_from_file_location("hyperfy_blender_addon", ADDON_PATH)
+addon = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(addon)
+
+FLOAT = 5126
+UNSIGNED_BYTE = 5121
+
+
+def add_accessor(glb, data, accessor_type, target=None):
+    data = np.ascontiguousarray(data)
+    view = glb.add_view(data.tobytes(), target)
+    glb.gltf.setdefault("accessors", []).append({
+        "bufferView": view,
+        "componentType": FLOAT if data.dtype == np.float32 else UNSIGNED_BYTE,
+        "count": len(data),
+        "type": accessor_type,
+    })
+    return len(glb.gltf["accessors"]) - 1
+
+
+def build_skinned_glb():
+    """Hips with a weighted spine and an unweighted, unanimated leaf bone"""
+    glb = addon.GLBFile({"asset": {"version": "2.0"}})
+    positions = add_accessor(glb, np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], np.float32), "VEC3", addon.MeshOptimizer.ARRAY_BUFFER)
+    joints = add_accessor(glb, np.array([[0, 1, 0, 0]] * 3, np.uint8), "VEC4", addon.MeshOptimizer.ARRAY_BUFFER)
+    weights = add_accessor(glb, np.array([[0.5, 0.5, 0, 0]] * 3, np.float32), "VEC4", addon.MeshOptimizer.ARRAY_BUFFER)
+    matrices = np.tile(np.eye(4, dtype=np.float32).ravel(), (3, 1))
+    matrices[:, 13] = [0.0, -1.0, -2.0]
+    inverse_bind_matrices = add_accessor(glb, matrices, "MAT4")
+    glb.gltf.update({
+        "scenes": [{"nodes": [0, 3]}],
+        "nodes": [
+            {"name": "hips", "children": [1]},
+            {"name": "spine", "translation": [0, 1, 0], "children": [2]},
+            {"name": "leaf", "translation": [0, 1, 0]},
+            {"name": "body", "mesh": 0, "skin": 0},
+        ],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": positions, "JOINTS_0": joints, "WEIGHTS_0": weights}}]}],
+        "skins": [{"joints": [0, 1, 2], "inverseBindMatrices": inverse_bind_matrices}],
+    })
+    return glb
+
+
+class DropUnusedJointsTest(unittest.TestCase):
+
+    def test_removes_unweighted_leaf_bone(self):
+        glb = build_skinned_glb()
+        self.assertEqual(addon.AnimationOptimizer.drop_unused_joints(glb), 1)
+        glb.compact()
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "skinned.glb")
+            glb.save(filepath)
+            glb = addon.GLBFile.load(filepath)
+
+        skin = glb.gltf["skins"][0]
+        self.assertEqual([glb.gltf["nodes"][joint]["name"] for joint in skin["joints"]], ["hips", "spine"])
+        self.assertNotIn("leaf", [node["name"] for node in glb.gltf["nodes"]])
+
+        # Inverse bind matrices stay paired with their joints
+        matrices = addon.MeshOptimizer.read_accessor(glb, skin["inverseBindMatrices"])
+        self.assertEqual(matrices.shape, (2, 16))
+        self.assertEqual(matrices[:, 13].tolist(), [0.0, -1.0])
+
+        body = next(node for node in glb.gltf["nodes"] if node["name"] == "body")
+        attributes = glb.gltf["meshes"][body["mesh"]]["primitives"][0]["attributes"]
+        joints = addon.MeshOptimizer.read_accessor(glb, attributes["JOINTS_0"])
+        self.assertEqual(joints[:, :2].tolist(), [[0, 1]] * 3)
+
+    def test_keeps_weighted_bones(self):
+        glb = build_skinned_glb()
+        attributes = glb.gltf["meshes"][0]["primitives"][0]["attributes"]
+        addon.MeshOptimizer.write_accessor(glb, attributes["JOINTS_0"], np.array([[0, 1, 2, 0]] * 3, np.uint8), addon.MeshOptimizer.ARRAY_BUFFER)
+        addon.MeshOptimizer.write_accessor(glb, attributes["WEIGHTS_0"], np.array([[0.4, 0.3, 0.3, 0]] * 3, np.float32), addon.MeshOptimizer.ARRAY_BUFFER)
+        self.assertEqual(addon.AnimationOptimizer.drop_unused_joints(glb), 0)
+        self.assertEqual(glb.gltf["skins"][0]["joints"], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv=argv, exit=False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -58,6 +58,10 @@ const clientHtmlDest = path.join(rootDir, 'build/public/index.html')
             const physxWasmSrc = path.join(rootDir, 'src/core/physx-js-webidl.wasm')
             const physxWasmDest = path.join(rootDir, 'build/public/physx-js-webidl.wasm')
             await fs.copy(physxWasmSrc, physxWasmDest)
+            // copy basis transcoder to public (ktx2 textures)
+            const basisSrc = path.join(rootDir, 'node_modules/three/examples/jsm/libs/basis')
+            const basisDest = path.join(rootDir, 'build/public/basis')
+            await fs.copy(basisSrc, basisDest)
             // find js output files
             const metafile = result.metafile
             const outputFiles = Object.keys(metafile.outputs)
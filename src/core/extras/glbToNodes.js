@@ -3,6 +3,12 @@ import * as THREE from '../extras/three'
 import CustomShaderMaterial from '../libs/three-custom-shader-material'
 
 const groupTypes = ['Scene', 'Group', 'Object3D']
+const primitiveColliderTypes = ['box', 'sphere', 'capsule']
+
+const _m1 = new THREE.Matrix4()
+const _v1 = new THREE.Vector3()
+const _v2 = new THREE.Vector3()
+const _q1 = new THREE.Quaternion()
 
 export function glbToNodes(glb, world) {
   function registerNode(name, data) {
@@ -69,12 +75,29 @@ export function glbToNodes(glb, world) {
         parentNode.add(node)
         parse(object3d.children, node)
       }
+      // Collider (custom node) fitted to a primitive by the blender addon
+      else if (props.node === 'collider' && primitiveColliderTypes.includes(props.type)) {
+        const node = registerNode('collider', {
+          id: object3d.name,
+          type: props.type,
+          width: props.width,
+          height: props.height,
+          depth: props.depth,
+          radius: props.radius,
+          trigger: props.trigger,
+          layer: props.layer,
+          position: object3d.position.toArray(),
+          quaternion: object3d.quaternion.toArray(),
+          scale: object3d.scale.toArray(),
+        })
+        parentNode.add(node)
+        parse(object3d.children, node)
+      }
       // Collider (custom node)
       else if (props.node === 'collider' && object3d.isMesh) {
         // NOTE: in blender if you export a single object with node:collider but it has multiple materials, it converts this into a Group with one Mesh for each material.
         // but since the Group is the one that has the collider custom property, it won't work as expected. we could hack to fix this, but i think it adds a layer of indirection.
         // colliders should not have materials on them.
-        // console.error('TODO: glbToNodes collider for box/sphere in blender?')
         const node = registerNode('collider', {
           id: object3d.name,
           type: 'geometry',
@@ -89,6 +112,43 @@ export function glbToNodes(glb, world) {
         parentNode.add(node)
         parse(object3d.children, node)
       }
+      // InstancedMesh (EXT_mesh_gpu_instancing)
+      // each instance becomes a linked mesh so the stage batches them back into one draw call
+      else if (object3d.isInstancedMesh) {
+        if (object3d.material.userData.wind) {
+          addWind(object3d, world)
+        }
+        const node = registerNode('group', {
+          id: object3d.name,
+          position: object3d.position.toArray(),
+          quaternion: object3d.quaternion.toArray(),
+          scale: object3d.scale.toArray(),
+        })
+        for (let i = 0; i < object3d.count; i++) {
+          object3d.getMatrixAt(i, _m1)
+          _m1.decompose(_v1, _q1, _v2)
+          const instance = registerNode('mesh', {
+            id: `${object3d.name}_${i}`,
+            type: 'geometry',
+            geometry: object3d.geometry,
+            material: object3d.material,
+            linked: !object3d.material.transparent,
+            castShadow: props.castShadow,
+            receiveShadow: props.receiveShadow,
+            active: props.active,
+            position: _v1.toArray(),
+            quaternion: _q1.toArray(),
+            scale: _v2.toArray(),
+          })
+          node.add(instance)
+        }
+        if (parentNode.name === 'lod' && props.maxDistance) {
+          parentNode.insert(node, props.maxDistance)
+        } else {
+          parentNode.add(node)
+        }
+        parse(object3d.children, node)
+      }
       // Mesh
       else if (object3d.type === 'Mesh') {
         // experimental splatmaps
@@ -99,6 +159,10 @@ export function glbToNodes(glb, world) {
         else if (object3d.material.userData.wind) {
           addWind(object3d, world)
         }
+        // baked lightmap
+        else if (object3d.material.userData.lightMap) {
+          addLightMap(object3d)
+        }
         const hasMorphTargets = object3d.morphTargetDictionary || object3d.morphTargetInfluences?.length > 0
         const node = registerNode('mesh', {
           id: object3d.name,
@@ -216,6 +280,28 @@ function addWind(mesh, world) {
   }
 }
 
+function addLightMap(mesh) {
+  const material = mesh.material
+  if (!material.aoMap || material.hasLightMap) return
+  material.hasLightMap = true
+  // the blender addon bakes occlusion into the red channel (used as the aoMap, which only darkens
+  // indirect light) and shadows from lights into green, which darkens direct light instead of shadow maps
+  material.onBeforeCompile = shader => {
+    shader.fragmentShader = shader.fragmentShader.replace(
+      '#include <aomap_fragment>',
+      `
+      #include <aomap_fragment>
+
+      #ifdef USE_AOMAP
+        float bakedShadow = texture2D(aoMap, vAoMapUv).g;
+        reflectedLight.directDiffuse *= bakedShadow;
+        reflectedLight.directSpecular *= bakedShadow;
+      #endif
+      `
+    )
+  }
+}
+
 const snoise = `
   //	Simplex 3D Noise 
   //	by Ian McEwan, Stefan Gustavson (https://github.com/stegu/webgl-noise)
@@ -24,8 +24,12 @@ const defaults = {
 const _v1 = new THREE.Vector3()
 const _v2 = new THREE.Vector3()
 const _q1 = new THREE.Quaternion()
+const _q2 = new THREE.Quaternion()
 
-const types = ['box', 'sphere', 'geometry']
+// physx capsules lie along the x axis, ours stand up along y
+const capsuleRotation = new THREE.Quaternion().setFromAxisAngle(new THREE.Vector3(0, 0, 1), Math.PI / 2)
+
+const types = ['box', 'sphere', 'capsule', 'geometry']
 const layers = ['environment', 'prop', 'player', 'tool']
 
 export class Collider extends Node {
@@ -54,6 +58,10 @@ export class Collider extends Node {
       geometry = new PHYSX.PxBoxGeometry(this._width / 2, this._height / 2, this._depth / 2)
     } else if (this._type === 'sphere') {
       geometry = new PHYSX.PxSphereGeometry(this._radius)
+    } else if (this._type === 'capsule') {
+      // height is the total height including both caps
+      const halfHeight = Math.max(this._height / 2 - this._radius, 0)
+      geometry = new PHYSX.PxCapsuleGeometry(this._radius, halfHeight)
     } else if (this._type === 'geometry') {
       // note: triggers MUST be convex according to PhysX/Unity
       const isConvex = this._trigger || this._convex
@@ -106,7 +114,11 @@ export class Collider extends Node {
     const position = _v1.copy(this.position).multiply(this.parent.scale)
     const pose = new PHYSX.PxTransform()
     position.toPxTransform(pose)
-    this.quaternion.toPxTransform(pose)
+    if (this._type === 'capsule') {
+      _q2.copy(this.quaternion).multiply(capsuleRotation).toPxTransform(pose)
+    } else {
+      this.quaternion.toPxTransform(pose)
+    }
     this.shape.setLocalPose(pose)
     this.parent?.addShape?.(this.shape)
     // console.log('geometry', geometry)
@@ -192,7 +204,7 @@ export class Collider extends Node {
       throw new Error('[collider] height not a number')
     }
     this._height = value
-    if (this.shape && this._type === 'box') {
+    if (this.shape && (this._type === 'box' || this._type === 'capsule')) {
       this.needsRebuild = true
       this.setDirty()
     }
@@ -228,7 +240,7 @@ export class Collider extends Node {
       throw new Error('[collider] radius not a number')
     }
     this._radius = value
-    if (this.shape && this._type === 'sphere') {
+    if (this.shape && (this._type === 'sphere' || this._type === 'capsule')) {
       this.needsRebuild = true
       this.setDirty()
     }
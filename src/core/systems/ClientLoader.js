@@ -1,6 +1,7 @@
 import * as THREE from '../extras/three'
 import { RGBELoader } from 'three/examples/jsm/loaders/RGBELoader.js'
 import { GLTFLoader } from 'three/examples/jsm/loaders/GLTFLoader.js'
+import { KTX2Loader } from 'three/examples/jsm/loaders/KTX2Loader.js'
 import { VRMLoaderPlugin } from '@pixiv/three-vrm'
 
 import { System } from './System'
@@ -32,10 +33,17 @@ export class ClientLoader extends System {
     this.texLoader = new TextureLoader()
     this.gltfLoader = new GLTFLoader()
     this.gltfLoader.register(parser => new VRMLoaderPlugin(parser))
+    this.ktx2Loader = new KTX2Loader()
+    this.ktx2Loader.setTranscoderPath('/basis/')
     this.preloadItems = []
   }
 
   start() {
+    // gpu compressed textures (KHR_texture_basisu) need the renderer to pick a transcode target
+    if (this.world.graphics?.renderer) {
+      this.ktx2Loader.detectSupport(this.world.graphics.renderer)
+      this.gltfLoader.setKTX2Loader(this.ktx2Loader)
+    }
     this.vrmHooks = {
       camera: this.world.camera,
       scene: this.world.stage.scene,